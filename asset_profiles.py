@@ -0,0 +1,112 @@
+# asset_profiles.py
+# Asset-class profiles: what to list and what to extract for each kind of fund.
+#
+# A profile bundles the listing query (screener dataView + Asset class filter
+# label), a sanity bound on the listing size, the metric schema (column ->
+# regexes over the detail page text) and where its files go. The scraper,
+# exporter and shard merge take a profile instead of assuming fixed income:
+#
+#   python ishares_fixed_income_scraper.py --asset-class equity
+#   python batch_export_json.py --asset-class equity      # -> public/funds_equity.json
+#
+# "fixed_income" is the default and keeps the original file names, columns and
+# public/funds.json; other profiles write under data/<key>/. "all" lists the
+# whole iShares universe unfiltered with the union schema (a fund just has
+# nulls for metrics its asset class does not report); at several thousand
+# detail pages a night, run it sharded (sharding.py) with --time-budget.
+#
+# Standard library only (imported by the scraper at startup).
+
+from ishares_extract import METRIC_PATTERNS
+from fund_record import RecordSchema
+
+# "P/E Ratio as of Oct 17, 2026 27.40": skip the date so it is not the match
+_AS_OF = r"(?:\s+as\s+of\s+[a-z]{3,9}\.?\s+\d{1,2},?\s+\d{4})?"
+
+EQUITY_PATTERNS = {
+    "Closing Price": METRIC_PATTERNS["Closing Price"],
+    "Expense Ratio": [
+        r"\bnet\s+expense\s+ratio\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bexpense\s+ratio\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+    ],
+    "Dividend Yield": [
+        r"\b12m\s+trailing\s+yield\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bdistribution\s+yield\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bdividend\s+yield\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+    ],
+    "P/E Ratio": [
+        r"\bp/e\s+ratio\b" + _AS_OF + r"\s*[:\-]?\s*([0-9][0-9,]*(?:\.[0-9]+)?)\b",
+    ],
+    "P/B Ratio": [
+        r"\bp/b\s+ratio\b" + _AS_OF + r"\s*[:\-]?\s*([0-9][0-9,]*(?:\.[0-9]+)?)\b",
+    ],
+}
+
+class AssetClassProfile:
+    def __init__(self, key, filter_label, data_view, metric_patterns, stem,
+                 max_funds=None, late_metrics=(), log_fields=None, subdir="", json_name=None):
+        self.key = key
+        self.filter_label = filter_label        # Asset class checkbox text; None = no filter
+        self.data_view = data_view              # screener dataView in the listing URL hash
+        self.metric_patterns = metric_patterns
+        self.metric_columns = list(metric_patterns)
+        self.schema = RecordSchema(self.metric_columns)   # CSV / JSON columns (fund_record.py)
+        self.stem = stem                        # file names: <stem>_<run_id>.csv, <stem>_metrics_...
+        self.max_funds = max_funds              # more rows than this = the filter did not apply
+        self.late_metrics = tuple(late_metrics) # re-read once if missing (render late)
+        # (label, column, unit) for the per-fund progress line
+        self.log_fields = log_fields or [(c, c, "") for c in self.metric_columns[:4]]
+        self.subdir = subdir                    # under the data dir
+        self.json_name = json_name or f"funds_{key}.json"
+
+    @property
+    def csv_columns(self):
+        return self.schema.csv_columns
+
+    def subset(self, columns):
+        """Same profile reading only `columns` (e.g. the refresh daemon's price job)."""
+        return AssetClassProfile(
+            self.key, self.filter_label, self.data_view,
+            {c: self.metric_patterns[c] for c in self.metric_columns if c in columns}, self.stem,
+            max_funds=self.max_funds,
+            late_metrics=[c for c in self.late_metrics if c in columns],
+            log_fields=[f for f in self.log_fields if f[1] in columns] or None,
+            subdir=self.subdir, json_name=self.json_name,
+        )
+
+    def __repr__(self):
+        return f"AssetClassProfile({self.key!r})"
+
+FIXED_INCOME = AssetClassProfile(
+    "fixed_income", "Fixed Income", "fixedIncomeView", METRIC_PATTERNS, "ishares_fixed_income",
+    max_funds=300,
+    late_metrics=("Effective Duration",),
+    log_fields=[("Close", "Closing Price", ""), ("EffDur", "Effective Duration", " yrs"),
+                ("YTM", "Average Yield to Maturity", "%"), ("OAS", "Option Adjusted Spread", " bps")],
+    json_name="funds.json",
+)
+
+EQUITY = AssetClassProfile(
+    "equity", "Equity", "keyFacts", EQUITY_PATTERNS, "ishares_equity",
+    late_metrics=("P/E Ratio",),
+    log_fields=[("Close", "Closing Price", ""), ("ER", "Expense Ratio", "%"),
+                ("Yield", "Dividend Yield", "%"), ("P/E", "P/E Ratio", "")],
+    subdir="equity",
+)
+
+ALL_FUNDS = AssetClassProfile(
+    "all", None, "keyFacts", {**EQUITY_PATTERNS, **METRIC_PATTERNS}, "ishares_all",
+    late_metrics=("Effective Duration", "P/E Ratio"),
+    log_fields=EQUITY.log_fields,
+    subdir="all",
+)
+
+PROFILES = {p.key: p for p in (FIXED_INCOME, EQUITY, ALL_FUNDS)}
+
+def get_profile(key) -> AssetClassProfile:
+    if isinstance(key, AssetClassProfile):
+        return key
+    try:
+        return PROFILES[(key or "fixed_income").replace("-", "_")]
+    except KeyError:
+        raise ValueError(f"unknown asset class {key!r} (choose from {', '.join(PROFILES)})") from None
@@ -1,54 +1,225 @@
 # batch_export_json.py
 # Reads the newest CSV from ./data and writes ./public/funds.json as a FLAT ARRAY.
+# "Newest" is the latest successful run in data/runs_manifest.json (see run_manifest.py).
+#
+# The output is canonical (sorted by ticker, floats rounded to FLOAT_DECIMALS),
+# so an unchanged day produces byte-identical JSON. Its sha256 is kept in
+# data/export_manifest.json and the write is skipped when nothing changed.
+# On GitHub Actions, `changed=true|false` is appended to $GITHUB_OUTPUT.
+# Other asset classes (asset_profiles.py): `--asset-class equity` reads
+# data/equity/ and writes public/funds_equity.json with that profile's columns.
+# Health gate (health_gate.py): if the new records are much emptier or shorter
+# than the funds.json they would replace, nothing is written and the exit code
+# is 1; `--force` publishes anyway. When the only run in data/ failed the gate
+# (a fresh CI checkout), the published file is left as it is (exit 0).
 
-import csv, json, sys, pathlib
+import hashlib, json, os, sys, pathlib
+from datetime import datetime, timezone
+
+from ishares_extract import METRIC_COLUMNS
+from asset_profiles import PROFILES, get_profile
+from fund_record import FundMetrics, RecordSchema
+import run_manifest
+import health_gate
+from run_report import RunStats
 
 METRICS_DIR = pathlib.Path("data")                 # where the scraper saves CSVs
 OUT_PATH    = pathlib.Path("public/funds.json")    # app reads this file
+MANIFEST_PATH = METRICS_DIR / "export_manifest.json"
+FLOAT_DECIMALS = 4
 
-def _num(s):
-    if s is None: return None
-    s = str(s).strip()
-    if s == "": return None
-    try: return float(s)
-    except: return None
-
-def find_latest_csv():
-    # prefer ./data; fall back to repo root in case the CSV landed there
-    cands = sorted(METRICS_DIR.glob("ishares_fixed_income_metrics_*.csv"))
-    if not cands:
-        cands = sorted(pathlib.Path(".").glob("ishares_fixed_income_metrics_*.csv"))
+def find_latest_csv(metrics_dir: pathlib.Path = METRICS_DIR):
+    # latest successful run from the scraper's manifest (no directory scan)
+    p = run_manifest.latest_file(metrics_dir, "metrics")
+    if p or run_manifest.load(metrics_dir)["runs"]:
+        # runs but none ok: the CSVs here failed the health gate, don't guess
+        return p
+    # no manifest yet: prefer ./data; fall back to repo root in case the CSV landed there
+    # (shard outputs are partial; only sharding.py's merged CSV counts)
+    def _metrics_csvs(d):
+        return sorted(p for p in d.glob("ishares_*_metrics_*.csv") if ".shard" not in p.name)
+    cands = _metrics_csvs(metrics_dir) or _metrics_csvs(pathlib.Path("."))
     return cands[-1] if cands else None
 
-def convert(csv_path: pathlib.Path):
-    rows = []
-    with csv_path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for rec in r:
-            rows.append({
-                "Ticker": rec.get("Ticker",""),
-                "Fund Name": rec.get("Fund Name",""),
-                "Closing Price": _num(rec.get("Closing Price")),
-                "Average Yield to Maturity": _num(rec.get("Average Yield to Maturity")),
-                "Weighted Avg Coupon": _num(rec.get("Weighted Avg Coupon")),
-                "Effective Duration": _num(rec.get("Effective Duration")),
-                "Weighted Avg Maturity": _num(rec.get("Weighted Avg Maturity")),
-                "Option Adjusted Spread": _num(rec.get("Option Adjusted Spread")),
-                "Detail": rec.get("Detail URL") or rec.get("Detail",""),
-            })
-    return rows
-
-def main():
-    csv_path = find_latest_csv()
+def convert(csv_path: pathlib.Path, metric_columns=METRIC_COLUMNS):
+    # pandas is only paid for when there is something to convert
+    import pandas as pd
+    from normalize import normalize_column, to_optional_floats
+
+    # Whole-column parse: each metric goes through normalize_column once
+    # instead of a float() per cell.
+    # Let the C parser type the metric columns; blanks become NaN there only.
+    df = pd.read_csv(
+        csv_path,
+        dtype={"Ticker": str, "Fund Name": str, "Detail URL": str, "Detail": str, "Stale": str,
+               "Failure Reason": str},
+        keep_default_na=False,
+        na_values={c: [""] for c in metric_columns},
+        encoding="utf-8",
+    )
+    n = len(df)
+
+    def text(col):
+        return df[col].fillna("").tolist() if col in df.columns else [""] * n
+
+    metrics = {}
+    for col in metric_columns:
+        if col in df.columns:
+            metrics[col] = to_optional_floats(*normalize_column(df[col]))
+        else:
+            metrics[col] = [None] * n
+
+    if "Detail URL" in df.columns:
+        detail = [u or d for u, d in zip(text("Detail URL"), text("Detail"))]
+    else:
+        detail = text("Detail")
+
+    # Stale = values carried over from an earlier snapshot after repeated failures
+    stale = [v == "True" for v in text("Stale")]
+    # not in funds.json, but the health gate counts funds left with nothing
+    reasons = text("Failure Reason")
+
+    # one FundMetrics per row; dicts only get built by canonical_json
+    schema = RecordSchema(metric_columns)
+    values = zip(*(metrics[c] for c in metric_columns))
+    return [FundMetrics(schema, t, name, v, s, r, url=d)
+            for t, name, v, d, s, r in zip(text("Ticker"), text("Fund Name"), values, detail, stale, reasons)]
+
+def canonical_json(records) -> bytes:
+    """Sorted by ticker, fixed float rounding, stable key order (schema.json_keys)."""
+    rows = sorted(records, key=lambda r: (r.ticker, r.name))
+    return json.dumps([r.as_json(FLOAT_DECIMALS) for r in rows], ensure_ascii=False).encode("utf-8")
+
+def _sha256(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+def load_manifest(path: pathlib.Path = MANIFEST_PATH):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def previous_hash(out_path: pathlib.Path = OUT_PATH, manifest_path: pathlib.Path = MANIFEST_PATH):
+    """Hash of what is currently published, or None if there is nothing.
+
+    Trust the manifest while the output file still has the size/mtime it
+    recorded; otherwise (fresh checkout, hand edit) hash the file itself.
+    """
+    if not out_path.exists():
+        return None
+    st = out_path.stat()
+    m = load_manifest(manifest_path)
+    if m.get("sha256") and m.get("size") == st.st_size and m.get("mtime_ns") == st.st_mtime_ns:
+        return m["sha256"]
+    return _sha256(out_path.read_bytes())
+
+def write_if_changed(payload: bytes, source: pathlib.Path,
+                     out_path: pathlib.Path = OUT_PATH, manifest_path: pathlib.Path = MANIFEST_PATH) -> bool:
+    digest = _sha256(payload)
+    if digest == previous_hash(out_path, manifest_path):
+        return False
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, out_path)
+
+    st = out_path.stat()
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps({
+        "sha256": digest,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "source": str(source),
+        "written_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }, indent=2), encoding="utf-8")
+    return True
+
+def load_published(out_path: pathlib.Path = OUT_PATH):
+    try:
+        return json.loads(out_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+def _set_github_output(name, value):
+    gh_out = os.getenv("GITHUB_OUTPUT")
+    if gh_out:
+        with open(gh_out, "a", encoding="utf-8") as f:
+            f.write(f"{name}={value}\n")
+
+def _add_to_run_report(stats: RunStats, metrics_dir: pathlib.Path, run):
+    # Attach the export timings to the report of the run whose CSV was
+    # exported (or refused; the latest run when nothing was exported)
+    p = run_manifest.run_file(metrics_dir, run, "report")
+    if not p:
+        return
+    try:
+        report = json.loads(p.read_text(encoding="utf-8"))
+        report["export"] = stats.summary()
+        p.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    except Exception as e:
+        print(f"Could not update run report {p}: {e}", file=sys.stderr)
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Export the latest metrics CSV to public/*.json")
+    ap.add_argument("--asset-class", type=get_profile, default="fixed_income", metavar="|".join(PROFILES))
+    ap.add_argument("--force", action="store_true", help="publish even if the health gate fails")
+    args = ap.parse_args(argv)
+    profile = args.asset_class
+    metrics_dir = METRICS_DIR / profile.subdir
+    out_path = OUT_PATH.with_name(profile.json_name)
+    manifest_path = metrics_dir / "export_manifest.json"
+
+    stats = RunStats()
+    csv_path = find_latest_csv(metrics_dir)
+    runs = run_manifest.load(metrics_dir)["runs"]
+    last = runs[-1] if runs else None
+    run = run_manifest.latest_ok(metrics_dir) if csv_path else None   # the run being exported
+    unhealthy = last is not None and last["status"] == "unhealthy"
+    if not csv_path and unhealthy:
+        if not args.force:
+            # nothing healthy in data/: what is published stays published
+            stats.incr("export.skipped_unhealthy")
+            _add_to_run_report(stats, metrics_dir, last)
+            _set_github_output("changed", "false")
+            print(f"Latest run {last['run_id']} failed the health gate and there is no earlier ok run; "
+                  f"left {out_path} untouched")
+            return
+        csv_path = run_manifest.run_file(metrics_dir, last, "metrics")
+        run = last
     if not csv_path:
         print("No metrics CSV found. Make sure the scraper step ran.", file=sys.stderr)
         sys.exit(1)
 
-    OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    data = convert(csv_path)
-    with OUT_PATH.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False)
-    print(f"Wrote {len(data)} records to {OUT_PATH}")
+    if unhealthy:
+        print(f"Latest run {last['run_id']} failed the health gate; exporting {csv_path.name}")
+
+    with stats.phase("export.convert"):
+        data = convert(csv_path, profile.metric_columns)
+    if health_gate.enabled() and not args.force:
+        published = load_published(out_path)
+        health = health_gate.check(
+            health_gate.records_stats(data, profile.metric_columns),
+            health_gate.records_stats(published, profile.metric_columns) if published else None,
+        )
+        if not health["ok"]:
+            stats.incr("export.refused")
+            _add_to_run_report(stats, metrics_dir, run)
+            _set_github_output("changed", "false")
+            print(f"Health gate failed for {csv_path}: " + "; ".join(health["problems"]), file=sys.stderr)
+            print(f"Left {out_path} untouched (use --force to publish anyway)", file=sys.stderr)
+            sys.exit(1)
+    with stats.phase("export.write"):
+        changed = write_if_changed(canonical_json(data), csv_path, out_path, manifest_path)
+    stats.incr("export.records", len(data))
+    stats.incr("export.changed" if changed else "export.unchanged")
+    _add_to_run_report(stats, metrics_dir, run)
+    _set_github_output("changed", "true" if changed else "false")
+    if changed:
+        print(f"Wrote {len(data)} records to {out_path}")
+    else:
+        print(f"No changes in {len(data)} records; left {out_path} untouched")
 
 if __name__ == "__main__":
     main()
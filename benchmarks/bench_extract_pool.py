@@ -0,0 +1,84 @@
+# benchmarks/bench_extract_pool.py
+# Extraction throughput (pages/s) against worker count, CPU only.
+#
+# Synthesizes detail pages with the mock site's templates and extracts them:
+#   serial   extract_metrics_from_body_text in this process
+#   pickled  ProcessPoolExecutor.map over the page strings (each text pickled to a worker)
+#   mmap     extract_pool.ExtractPool (pages handed over via mmapped archive segments)
+# for each worker count, checking every result against the serial one.
+# Pool timings include worker start-up, as a nightly run would pay it.
+#
+# Usage:
+#   python benchmarks/bench_extract_pool.py --pages 4000 --page-kb 128
+#   python benchmarks/bench_extract_pool.py --workers 1,2,4,8 --json bench_extract_pool.json
+
+import argparse, json, os, pathlib, sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from benchutil import PeakRSS, Stopwatch                  # noqa: E402
+import mock_ishares                                       # noqa: E402
+from bench_offline import page_text                       # noqa: E402
+from extract_pool import ExtractPool                      # noqa: E402
+from ishares_extract import extract_metrics_from_body_text  # noqa: E402
+
+def run(label, fn, n_pages, expected):
+    with PeakRSS() as rss, Stopwatch() as sw:
+        got = fn()
+    assert got == expected, f"{label}: results differ from serial extraction"
+    return {
+        "seconds": round(sw.seconds, 3),
+        "pages_per_s": round(n_pages / sw.seconds, 1),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=2000)
+    ap.add_argument("--page-kb", type=int, default=64, help="filler size of each detail page")
+    ap.add_argument("--workers", default=None, help="comma-separated counts (default 1,2,4,… up to the core count)")
+    ap.add_argument("--chunk-pages", type=int, default=32)
+    ap.add_argument("--json", type=pathlib.Path, help="also write the report here")
+    args = ap.parse_args()
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(x) for x in args.workers.split(",")]
+    else:
+        counts, n = [], 1
+        while n < cores:
+            counts.append(n)
+            n *= 2
+        counts.append(cores)
+
+    funds = [f for f in mock_ishares.synthesize_funds(args.pages) if f["assetClass"] == "Fixed Income"]
+    site = mock_ishares.MockSite(funds, page_kb=args.page_kb)
+    texts = [page_text(site.detail_html(f)) for f in funds]
+    report = {
+        "config": {"pages": len(texts), "avg_page_kb": round(sum(map(len, texts)) / len(texts) / 1024, 1),
+                   "cores": cores, "chunk_pages": args.chunk_pages},
+    }
+
+    expected = [extract_metrics_from_body_text(t) for t in texts]
+    report["serial"] = run("serial", lambda: [extract_metrics_from_body_text(t) for t in texts],
+                           len(texts), expected)
+    base = report["serial"]["pages_per_s"]
+
+    for w in counts:
+        with ProcessPoolExecutor(w) as ex:
+            pickled = run("pickled", lambda: list(ex.map(extract_metrics_from_body_text, texts,
+                                                         chunksize=args.chunk_pages)),
+                          len(texts), expected)
+        with ExtractPool(workers=w, chunk_pages=args.chunk_pages) as pool:
+            mapped = run("mmap", lambda: list(pool.imap(texts)), len(texts), expected)
+        for r in (pickled, mapped):
+            r["speedup_vs_serial"] = round(r["pages_per_s"] / base, 2)
+        report[f"workers_{w}"] = {"pickled": pickled, "mmap": mapped}
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
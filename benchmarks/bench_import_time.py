@@ -0,0 +1,57 @@
+# benchmarks/bench_import_time.py
+# Guards CLI startup: measures `python -X importtime` for the light modules and
+# fails if they pull in selenium / pandas / numpy / webdriver_manager or blow
+# the time budget.
+#
+# Usage:
+#   python benchmarks/bench_import_time.py            # exit 1 on regression
+#   python benchmarks/bench_import_time.py --budget-ms 150
+
+import argparse, pathlib, re, subprocess, sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+MODULES = ["ishares_extract", "ishares_fixed_income_scraper", "batch_export_json", "run_manifest"]
+HEAVY = ("selenium", "pandas", "numpy", "webdriver_manager")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def import_profile(module: str):
+    """Return (cumulative_us of `module`, set of every module it imported)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    cumulative, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        name = m.group(4)
+        loaded.add(name)
+        if name == module:
+            cumulative = int(m.group(2))
+    return cumulative or 0, loaded
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget-ms", type=float, default=100.0,
+                    help="max cumulative import time per module")
+    ap.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = ap.parse_args()
+
+    failed = False
+    for mod in MODULES:
+        runs = [import_profile(mod) for _ in range(args.repeat)]
+        best_us = min(us for us, _ in runs)
+        heavy = sorted({n for n in runs[0][1] if n.split(".")[0] in HEAVY})
+        ok = best_us / 1000 <= args.budget_ms and not heavy
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {mod:<32} {best_us / 1000:8.1f} ms"
+              + (f"  heavy: {', '.join(heavy[:5])}" if heavy else ""))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_normalize.py
+# Row-by-row vs vectorized number normalization on a synthetic metrics CSV.
+#
+# Usage:
+#   python benchmarks/bench_normalize.py            # 1,000,000 rows
+#   python benchmarks/bench_normalize.py --rows 200000
+#
+# Before timing anything it checks that normalize_column and
+# ishares_extract._parse_number agree on a set of awkward inputs (units,
+# "$", separators, no-break spaces); a mismatch exits with an AssertionError.
+
+import argparse, csv, pathlib, random, sys, tempfile, time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import batch_export_json                                   # noqa: E402
+from ishares_extract import _parse_number                   # noqa: E402
+from normalize import METRIC_COLUMNS, normalize_column, to_optional_floats  # noqa: E402
+
+HEADERS = ["Ticker", "Fund Name", *METRIC_COLUMNS]
+
+# Same number from both parsers, or None from both
+PARITY_INPUTS = [
+    "1.25", " 7 ", "$1,234.50", "$ 12.00", "4.5%", "4.5 %", "12bps", "12 bp", "3.1\u00a0%",
+    "\u00a05.5", "1\u00a0234", "1,234\u00a0bps", "n/a", "", "-", "--0.5", "-0.75", "1e3", "$-3.00",
+]
+
+def check_parsers_agree(values=PARITY_INPUTS):
+    expected = [_parse_number(v) for v in values]
+    got = to_optional_floats(*normalize_column(values))
+    diff = [(v, a, b) for v, a, b in zip(values, expected, got) if a != b]
+    assert not diff, f"normalize_column and _parse_number disagree: {diff}"
+    print(f"parsers agree on {len(values)} edge-case inputs")
+
+def _num(s):
+    # the pre-vectorization exporter's per-cell parser (was batch_export_json._num)
+    if s is None: return None
+    s = str(s).strip()
+    if s == "": return None
+    try: return float(s)
+    except: return None
+
+def write_synthetic_csv(path: pathlib.Path, n_rows: int, seed: int = 7):
+    rnd = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(HEADERS)
+        for i in range(n_rows):
+            row = [f"T{i:06d}", f"Synthetic Bond ETF {i}"]
+            for _ in METRIC_COLUMNS:
+                # ~5% blanks, like funds with a missing metric
+                row.append("" if rnd.random() < 0.05 else f"{rnd.uniform(0, 120):.2f}")
+            w.writerow(row)
+
+def rowwise_convert(path: pathlib.Path):
+    # The pre-vectorization exporter: csv.DictReader + _num per cell
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for rec in csv.DictReader(f):
+            out = {"Ticker": rec.get("Ticker", ""), "Fund Name": rec.get("Fund Name", "")}
+            for col in METRIC_COLUMNS:
+                out[col] = _num(rec.get(col))
+            out["Detail"] = rec.get("Detail URL") or rec.get("Detail", "")
+            out["Stale"] = rec.get("Stale") == "True"
+            rows.append(out)
+    return rows
+
+def timed(label, fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    dt = time.perf_counter() - t0
+    print(f"{label:<34} {dt:8.3f}s")
+    return out, dt
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    check_parsers_agree()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "ishares_fixed_income_metrics_bench.csv"
+        print(f"Writing {args.rows:,} synthetic rows…")
+        write_synthetic_csv(path, args.rows)
+
+        a, t_row = timed("exporter: row-wise _num", rowwise_convert, path)
+        b, t_vec = timed("exporter: vectorized convert", batch_export_json.convert, path)
+        assert a == [r.as_json() for r in b], "vectorized export differs from row-wise export"
+        print(f"{'speed-up':<34} {t_row / t_vec:8.1f}x")
+
+    # Scraper-style raw strings: mostly plain numbers, ~10% carrying units
+    rnd = random.Random(11)
+    units = ["$1,{:03d}.25", "{}.45 %", "{}bps", "{} bp", "n/a"]
+    raw = [rnd.choice(units).format(rnd.randint(0, 999)) if rnd.random() < 0.1
+           else f"{rnd.uniform(0, 120):.2f}" for _ in range(args.rows)]
+    a, t_row = timed("scraper: _parse_number per value", lambda: [_parse_number(x) for x in raw])
+    (vals, valid), t_vec = timed("scraper: normalize_column", normalize_column, raw)
+    assert a == to_optional_floats(vals, valid), "normalize_column differs from _parse_number"
+    print(f"{'speed-up':<34} {t_row / t_vec:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/bench_offline.py
+# Offline scraper benchmark against the local mock site (no network needed).
+#
+# Runs, against synthesized fixture pages served from 127.0.0.1:
+#   1) scrape_fixed_income_list      (headless Chrome; listing of --funds funds)
+#   2) scrape_details_for_funds      (headless Chrome; first --details funds)
+#   3) extract_metrics_from_body_text over every synthesized detail page (CPU only)
+#   4) batch_export_json.convert     on a metrics CSV with one row per fund
+# and reports throughput, latency percentiles and peak RSS (process tree).
+#
+# Usage (Linux, headless Chrome installed; no internet needed if CHROMEDRIVER is set):
+#   CHROMEDRIVER=/usr/bin/chromedriver python benchmarks/bench_offline.py --funds 5000
+#   python benchmarks/bench_offline.py --funds 5000 --skip-browser     # 3) and 4) only
+#   python benchmarks/bench_offline.py --json bench_offline.json
+#   python benchmarks/bench_offline.py --browser selenium,cdp   # 2) once per backend (cdp_driver.py)
+
+import argparse, csv, json, pathlib, re, sys, tempfile
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from benchutil import PeakRSS, Stopwatch, percentiles   # noqa: E402
+import mock_ishares                                       # noqa: E402
+
+import batch_export_json                                  # noqa: E402
+import ishares_fixed_income_scraper as scraper            # noqa: E402
+from ishares_extract import METRIC_COLUMNS, extract_metrics_from_body_text  # noqa: E402
+from rate_limit import AdaptiveRateLimiter                # noqa: E402
+from run_report import STATS                              # noqa: E402
+
+_TAG = re.compile(r"<script.*?</script>|<style.*?</style>|<[^>]+>", re.S)
+
+def page_text(html: str) -> str:
+    # rough stand-in for WebElement.text of <body>
+    return " ".join(_TAG.sub(" ", html).split())
+
+def phase_summary(name):
+    return STATS.summary()["phases"].get(name)
+
+def bench_listing(n_expected, headless):
+    STATS.reset()
+    with PeakRSS() as rss, Stopwatch() as sw:
+        funds = scraper.scrape_fixed_income_list(headless=headless)
+    return funds, {
+        "funds": len(funds),
+        "expected": n_expected,
+        "seconds": round(sw.seconds, 2),
+        "funds_per_s": round(len(funds) / sw.seconds, 1) if sw.seconds else None,
+        "webdriver_calls": STATS.summary()["counters"].get("webdriver.calls", 0),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+def bench_details(funds, truth, headless):
+    STATS.reset()
+    with PeakRSS() as rss, Stopwatch() as sw:
+        # no pacing: measure the scraper, not the politeness policy
+        unlimited = AdaptiveRateLimiter(start_per_min=1e6, min_per_min=1e6, max_per_min=1e6)
+        rows = scraper.scrape_details_for_funds(funds, headless=headless, limiter=unlimited)
+    filled = sum(r[c] is not None for r in rows for c in METRIC_COLUMNS)
+    correct = sum(
+        r[c] is not None and abs(r[c] - truth[r["Ticker"]][c]) < 1e-9
+        for r in rows for c in METRIC_COLUMNS
+    )
+    cells = len(rows) * len(METRIC_COLUMNS) or 1
+    return {
+        "pages": len(rows),
+        "seconds": round(sw.seconds, 2),
+        "pages_per_s": round(len(rows) / sw.seconds, 2) if sw.seconds else None,
+        "fill_rate": round(filled / cells, 4),
+        "accuracy": round(correct / cells, 4),
+        "detail.get": phase_summary("detail.get"),
+        "wait.body": phase_summary("wait.body"),
+        "get_closing_price_dom": phase_summary("get_closing_price_dom"),
+        "webdriver_calls": STATS.summary()["counters"].get("webdriver.calls", 0),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+def bench_extract(site, funds):
+    texts = [page_text(site.detail_html(f)) for f in funds]
+    latencies = []
+    with PeakRSS() as rss, Stopwatch() as sw:
+        for t in texts:
+            with Stopwatch() as one:
+                extract_metrics_from_body_text(t)
+            latencies.append(one.seconds)
+    return {
+        "pages": len(texts),
+        "avg_page_kb": round(sum(map(len, texts)) / len(texts) / 1024, 1),
+        "seconds": round(sw.seconds, 3),
+        "pages_per_s": round(len(texts) / sw.seconds, 1),
+        "latency_s": {k: round(v, 6) for k, v in percentiles(latencies).items()},
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+def bench_convert(funds, truth):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "ishares_fixed_income_metrics_bench.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["Ticker", "Fund Name", *METRIC_COLUMNS])
+            for fund in funds:
+                w.writerow([fund["ticker"], fund["name"], *(truth[fund["ticker"]][c] for c in METRIC_COLUMNS)])
+        with PeakRSS() as rss, Stopwatch() as sw:
+            rows = batch_export_json.convert(path)
+    return {
+        "rows": len(rows),
+        "seconds": round(sw.seconds, 3),
+        "rows_per_s": round(len(rows) / sw.seconds, 1),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+def expected_metrics(fund):
+    m = fund["metrics"]
+    return dict(zip(METRIC_COLUMNS, map(float, (
+        m["closing_price"], m["ytm"], m["coupon"], m["duration"], m["maturity"], m["oas"],
+    ))))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--funds", type=int, default=5000, help="synthesized fixed-income funds")
+    ap.add_argument("--details", type=int, default=100, help="detail pages to scrape through Chrome")
+    ap.add_argument("--page-kb", type=int, default=64, help="filler size of each detail page")
+    ap.add_argument("--skip-browser", action="store_true", help="only the CPU benchmarks")
+    ap.add_argument("--headed", action="store_true")
+    ap.add_argument("--browser", default="selenium",
+                    help="comma-separated browser backends for 1) and 2): selenium, cdp")
+    ap.add_argument("--json", type=pathlib.Path, help="also write the report here")
+    args = ap.parse_args()
+
+    all_funds = mock_ishares.synthesize_funds(args.funds)
+    fixed = [f for f in all_funds if f["assetClass"] == "Fixed Income"]
+    truth = {f["ticker"]: expected_metrics(f) for f in fixed}
+    report = {"config": vars(args) | {"json": str(args.json) if args.json else None}}
+
+    server, base = mock_ishares.start_server(all_funds, page_kb=args.page_kb)
+    try:
+        if not args.skip_browser:
+            mock_ishares.point_scraper_at(base)
+            for backend in args.browser.split(","):
+                scraper.BROWSER_BACKEND = backend
+                key = "" if backend == "selenium" else f"_{backend}"
+                listed, report[f"listing{key}"] = bench_listing(len(fixed), headless=not args.headed)
+                report[f"details{key}"] = bench_details(listed[:args.details], truth,
+                                                        headless=not args.headed)
+        report["extract"] = bench_extract(server.site, fixed)
+        report["convert"] = bench_convert(fixed, truth)
+    finally:
+        server.shutdown()
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
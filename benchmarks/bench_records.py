@@ -0,0 +1,128 @@
+# benchmarks/bench_records.py
+# Dict-per-fund records against fund_record.FundMetrics at scale.
+#
+# Builds --records synthetic scrape results both ways and measures
+#   memory   bytes held by the records (tracemalloc, after the build)
+#   build    records/s for turning extractor output into records
+#   csv      records/s writing the metrics CSV rows (in memory)
+#   json     records/s for canonical funds.json (sort + round + dumps)
+# The dict side is what iter_fund_metrics / canonical_json did before:
+# a nine-key dict per fund, a list per CSV row, a fresh dict per JSON row.
+#
+# Usage:
+#   python benchmarks/bench_records.py                 # 100,000 records
+#   python benchmarks/bench_records.py --records 20000 --json bench_records.json
+
+import argparse, csv, gc, io, json, pathlib, random, sys, time, tracemalloc
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import batch_export_json                                  # noqa: E402
+from asset_profiles import FIXED_INCOME                   # noqa: E402
+
+SCHEMA = FIXED_INCOME.schema
+COLUMNS = SCHEMA.metric_columns
+
+def synthesize(n, seed=5):
+    rnd = random.Random(seed)
+    return [
+        (f"T{i:06d}", f"Synthetic Bond ETF {i}", f"https://example.test/us/products/{i}/etf",
+         [None if rnd.random() < 0.05 else round(rnd.uniform(0, 120), 6) for _ in COLUMNS])
+        for i in range(n)
+    ]
+
+# ---- before: dicts ----
+def dict_build(raw):
+    out = []
+    for ticker, name, url, values in raw:
+        m = dict(zip(COLUMNS, values))      # extractor output
+        out.append({"Ticker": ticker, "Fund Name": name, **{c: m.get(c) for c in COLUMNS},
+                    "Stale": False, "Failure Reason": "", "As Of": "", "Detail URL": url})
+    return out
+
+def dict_csv(records, f):
+    w = csv.writer(f)
+    w.writerow(SCHEMA.csv_columns)
+    for rec in records:
+        w.writerow([rec[c] for c in SCHEMA.csv_columns])
+
+def dict_json(records):
+    def fix(v):
+        return round(v, batch_export_json.FLOAT_DECIMALS) if isinstance(v, float) else v
+    keys = SCHEMA.json_keys
+    rows = [dict(zip(keys, (rec["Ticker"], rec["Fund Name"], *(rec[c] for c in COLUMNS),
+                            rec["Detail URL"], rec["Stale"]))) for rec in records]
+    rows = sorted(rows, key=lambda r: (r.get("Ticker", ""), r.get("Fund Name", "")))
+    rows = [{k: fix(v) for k, v in r.items()} for r in rows]
+    return json.dumps(rows, ensure_ascii=False).encode("utf-8")
+
+# ---- after: FundMetrics ----
+def record_build(raw):
+    return [SCHEMA.record(ticker, name, values, url=url) for ticker, name, url, values in raw]
+
+def record_csv(records, f):
+    w = csv.writer(f)
+    w.writerow(SCHEMA.csv_columns)
+    for rec in records:
+        w.writerow(rec.csv_row())
+
+def record_json(records):
+    return batch_export_json.canonical_json(records)
+
+def held_bytes(build, raw):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    records = build(raw)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return records, used
+
+def rate(fn, n):
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    return out, dt, round(n / dt) if dt else None
+
+def measure(build, write_csv, to_json, raw):
+    n = len(raw)
+    records, used = held_bytes(build, raw)
+    _, build_s, build_rate = rate(lambda: build(raw), n)
+    buf = io.StringIO()
+    _, csv_s, csv_rate = rate(lambda: write_csv(records, buf), n)
+    payload, json_s, json_rate = rate(lambda: to_json(records), n)
+    return {
+        "held_mb": round(used / 1e6, 1),
+        "bytes_per_record": round(used / n),
+        "build_per_s": build_rate,
+        "csv_per_s": csv_rate,
+        "json_per_s": json_rate,
+        "seconds": round(build_s + csv_s + json_s, 3),
+    }, buf.getvalue(), payload
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=100_000)
+    ap.add_argument("--json", type=pathlib.Path, help="also write the report here")
+    args = ap.parse_args()
+
+    raw = synthesize(args.records)
+    before, csv_a, json_a = measure(dict_build, dict_csv, dict_json, raw)
+    after, csv_b, json_b = measure(record_build, record_csv, record_json, raw)
+    assert csv_a == csv_b, "CSV output differs"
+    assert json_a == json_b, "funds.json output differs"
+    report = {
+        "records": args.records,
+        "dicts": before,
+        "fund_metrics": after,
+        "memory_ratio": round(before["held_mb"] / after["held_mb"], 2) if after["held_mb"] else None,
+        "speedup": round(before["seconds"] / after["seconds"], 2) if after["seconds"] else None,
+    }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
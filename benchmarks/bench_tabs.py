@@ -0,0 +1,103 @@
+# benchmarks/bench_tabs.py
+# Detail-page concurrency: N tabs in one Chrome against N separate Chromes.
+#
+# Scrapes the same --pages detail pages from the local mock site (with
+# latency, so there is waiting to overlap) for each concurrency level N:
+#   tabs      iter_fund_metrics(..., tabs=N): one Chrome, N tabs (tab_pool.py)
+#   browsers  N threads, each iter_fund_metrics over its share with its own Chrome
+# and reports pages/s, peak RSS of the whole process tree (chromedriver +
+# Chrome) and how many metric cells match the synthesized truth. Pacing is
+# off: this measures the browsers, not the politeness policy.
+#
+# Usage (Linux, headless Chrome installed):
+#   CHROMEDRIVER=/usr/bin/chromedriver python benchmarks/bench_tabs.py --pages 120 --levels 1,2,4,8
+#   python benchmarks/bench_tabs.py --latency-ms 400 --json bench_tabs.json
+
+import argparse, json, pathlib, sys, threading
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from benchutil import PeakRSS, Stopwatch                  # noqa: E402
+import mock_ishares                                       # noqa: E402
+from bench_offline import expected_metrics                # noqa: E402
+
+import ishares_fixed_income_scraper as scraper            # noqa: E402
+from ishares_extract import METRIC_COLUMNS                # noqa: E402
+from rate_limit import AdaptiveRateLimiter                # noqa: E402
+from run_report import STATS                              # noqa: E402
+
+def unlimited():
+    return AdaptiveRateLimiter(start_per_min=1e6, min_per_min=1e6, max_per_min=1e6)
+
+def run_tabs(rows, n, headless):
+    return list(scraper.iter_fund_metrics(rows, headless=headless, limiter=unlimited(), tabs=n))
+
+def run_browsers(rows, n, headless):
+    out, limiter = [], unlimited()
+
+    def worker(part):
+        got = list(scraper.iter_fund_metrics(part, headless=headless, limiter=limiter))
+        with lock:
+            out.extend(got)
+
+    lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(rows[i::n],)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+def measure(fn, rows, n, headless, truth):
+    STATS.reset()
+    with PeakRSS() as rss, Stopwatch() as sw:
+        got = fn(rows, n, headless)
+    correct = sum(
+        r[c] is not None and abs(r[c] - truth[r["Ticker"]][c]) < 1e-9
+        for r in got for c in METRIC_COLUMNS
+    )
+    return {
+        "pages": len(got),
+        "seconds": round(sw.seconds, 2),
+        "pages_per_s": round(len(got) / sw.seconds, 2) if sw.seconds else None,
+        "accuracy": round(correct / (len(rows) * len(METRIC_COLUMNS) or 1), 4),
+        "failures": sum(1 for r in got if r["Failure Reason"]),
+        "webdriver_calls": STATS.summary()["counters"].get("webdriver.calls", 0),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=80, help="detail pages per configuration")
+    ap.add_argument("--levels", default="1,2,4", help="comma-separated concurrency levels")
+    ap.add_argument("--latency-ms", type=int, default=250, help="mock server latency per page")
+    ap.add_argument("--jitter-ms", type=int, default=100)
+    ap.add_argument("--page-kb", type=int, default=64)
+    ap.add_argument("--headed", action="store_true")
+    ap.add_argument("--json", type=pathlib.Path, help="also write the report here")
+    args = ap.parse_args()
+
+    funds = [f for f in mock_ishares.synthesize_funds(args.pages) if f["assetClass"] == "Fixed Income"]
+    truth = {f["ticker"]: expected_metrics(f) for f in funds}
+    server, base = mock_ishares.start_server(funds, latency_ms=args.latency_ms,
+                                             jitter_ms=args.jitter_ms, page_kb=args.page_kb)
+    rows = [{"ticker": f["ticker"], "name": f["name"], "url": base + f["href"]} for f in funds]
+    report = {"config": vars(args) | {"json": str(args.json) if args.json else None}}
+    try:
+        for n in (int(x) for x in args.levels.split(",")):
+            tabs = measure(run_tabs, rows, n, not args.headed, truth)
+            browsers = measure(run_browsers, rows, n, not args.headed, truth)
+            report[f"concurrency_{n}"] = {
+                "tabs": tabs,
+                "browsers": browsers,
+                "rss_saved_mb": round(browsers["peak_rss_mb"] - tabs["peak_rss_mb"], 1),
+            }
+    finally:
+        server.shutdown()
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/benchutil.py
+# Small helpers shared by the benchmark scripts (Linux: reads /proc).
+
+import os, pathlib, sys, threading, time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+def _children_map():
+    kids = {}
+    for d in pathlib.Path("/proc").iterdir():
+        if not d.name.isdigit():
+            continue
+        try:
+            stat = (d / "stat").read_text()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except Exception:
+            continue
+        kids.setdefault(ppid, []).append(int(d.name))
+    return kids
+
+def _rss_kb(pid):
+    try:
+        for line in pathlib.Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except Exception:
+        pass
+    return 0
+
+def tree_rss_kb(root_pid=None):
+    """Total RSS of a process and all its descendants (chromedriver, Chrome…)."""
+    root_pid = root_pid or os.getpid()
+    kids = _children_map()
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += _rss_kb(pid)
+        stack.extend(kids.get(pid, []))
+    return total
+
+class PeakRSS:
+    """Samples tree RSS in a background thread; `with PeakRSS() as p: ...; p.peak_mb`."""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, tree_rss_kb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, tree_rss_kb())
+
+    @property
+    def peak_mb(self):
+        return self.peak_kb / 1024.0
+
+def percentiles(values, qs=(50, 95, 99)):
+    from run_report import percentile
+    vals = sorted(values)
+    return {f"p{q}": percentile(vals, q) for q in qs}
+
+class Stopwatch:
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.t0
@@ -0,0 +1,302 @@
+# benchmarks/mock_ishares.py
+# Local stand-in for ishares.com built from the fixture pages in benchmarks/fixtures.
+#
+# Serves the product screener at /us/products/etf-investments (show-all and
+# the Asset class filter behave like the real page) and one detail page per
+# synthesized fund at /us/products/<id>/<slug> (bond metrics, plus P/E, P/B and
+# yield key facts for equity funds), so the scraper can be run, load-tested
+# and benchmarked with no network. Faults are injectable: latency + jitter,
+# 500/503 error rate, random or rate-based 429s (with Retry-After), slow
+# client-side rendering and bot-wall interstitials (random, or a whole outage).
+# Request counts by status are served as JSON at /__mock/stats.
+#
+# In-process:
+#   funds = synthesize_funds(5000)
+#   server, base = start_server(funds, latency_ms=150, jitter_ms=50)
+#   point_scraper_at(base)                       # HOME / FAST_URL -> mock
+#   ...
+#   server.shutdown()
+#
+# Standalone, then run the real scraper end-to-end against it:
+#   python benchmarks/mock_ishares.py --funds 300 --port 8765 --latency-ms 200 \
+#       --jitter-ms 100 --error-rate 0.02 --max-per-min 120 --slow-js-ms 1500
+#   python benchmarks/mock_ishares.py --outage-s 600    # bot wall for 10 min (circuit breaker)
+#   ISHARES_HOME=http://127.0.0.1:8765/us/products/etf-investments \
+#       python ishares_fixed_income_scraper.py
+
+import argparse, json, pathlib, random, threading, time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = pathlib.Path(__file__).resolve().parent / "fixtures"
+LISTING_PATH = "/us/products/etf-investments"
+
+def _ticker(i: int) -> str:
+    # 4 upper-case letters, unique per index (26**4 > 400k funds)
+    out = ""
+    for _ in range(4):
+        i, r = divmod(i, 26)
+        out = chr(ord("A") + r) + out
+    return out
+
+def synthesize_funds(n_fixed_income: int, n_other: int = None, seed: int = 42):
+    """Fixed-income funds plus some equity funds, sorted by net assets (desc)."""
+    rnd = random.Random(seed)
+    rnd_facts = random.Random(seed + 1)     # key facts drawn apart: bond metrics stay as before
+    if n_other is None:
+        n_other = n_fixed_income // 2
+    funds = []
+    for i in range(n_fixed_income + n_other):
+        fixed = i < n_fixed_income
+        product_id = 200000 + i
+        ticker = _ticker(i)
+        name = f"iShares Synthetic {'Bond' if fixed else 'Equity'} ETF {ticker}"
+        slug = name.lower().replace(" ", "-")
+        funds.append({
+            "id": product_id,
+            "ticker": ticker,
+            "name": name,
+            "href": f"/us/products/{product_id}/{slug}",
+            "assetClass": "Fixed Income" if fixed else "Equity",
+            "netAssetsRaw": rnd.uniform(5e7, 1.2e11),
+            "metrics": {
+                "closing_price": f"{rnd.uniform(20, 140):.2f}",
+                "ytm": f"{rnd.uniform(0.5, 9):.2f}",
+                "coupon": f"{rnd.uniform(0.5, 7):.2f}",
+                "duration": f"{rnd.uniform(0.05, 18):.2f}",
+                "maturity": f"{rnd.uniform(0.05, 27):.2f}",
+                "oas": f"{rnd.uniform(1, 450):.2f}",
+            },
+        })
+        facts = {"expense": f"{rnd_facts.uniform(0.03, 0.75):.2f}"}
+        if not fixed:
+            facts.update(
+                dist_yield=f"{rnd_facts.uniform(0, 6):.2f}",
+                pe=f"{rnd_facts.uniform(6, 45):.2f}",
+                pb=f"{rnd_facts.uniform(0.8, 12):.2f}",
+            )
+        funds[-1]["key_facts"] = facts
+    funds.sort(key=lambda f: -f["netAssetsRaw"])
+    for f in funds:
+        f["netAssets"] = f"${f['netAssetsRaw'] / 1e9:,.2f}B"
+    return funds
+
+def _fill(template: str, values: dict) -> str:
+    for k, v in values.items():
+        template = template.replace("{{" + k + "}}", str(v))
+    return template
+
+# key_facts -> (caption, unit) on the detail page, in page order
+_KEY_FACTS = [
+    ("expense", "Net Expense Ratio", "%"),
+    ("dist_yield", "12m Trailing Yield", "%"),
+    ("pe", "P/E Ratio", ""),
+    ("pb", "P/B Ratio", ""),
+]
+
+_ERROR_PAGE = "<html><head><title>{title}</title></head><body><h1>{title}</h1></body></html>"
+# bot-challenge interstitial, served with status 200 like the real ones
+_WALL_PAGE = ("<html><head><title>Pardon Our Interruption</title></head><body>"
+              "<h1>Pardon Our Interruption</h1><p>Something about your browser made us think you "
+              "were a bot. Please verify you are human to continue.</p></body></html>")
+
+class MockSite:
+    """Renders listing/detail pages for a fixed set of synthesized funds.
+
+    Fault knobs (all off by default): latency_ms/jitter_ms delay every
+    response; error_rate answers 500/503; throttle_rate answers 429 at random;
+    max_per_min answers 429 once the sliding one-minute window is full;
+    slow_js_ms attaches a detail page's characteristics only after a timer;
+    wall_rate serves a bot-challenge page with status 200 instead of a detail
+    page (outage_s: to every detail request for the first outage_s seconds).
+    """
+
+    def __init__(self, funds, fixtures_dir: pathlib.Path = FIXTURES_DIR,
+                 page_kb: int = 64, render_delay_ms: int = 50, as_of: str = "Oct 17, 2026",
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, max_per_min: int = 0, slow_js_ms: int = 0,
+                 wall_rate: float = 0.0, outage_s: float = 0.0, seed: int = 1):
+        self.funds = funds
+        self.by_id = {str(f["id"]): f for f in funds}
+        self.listing_tpl = (fixtures_dir / "listing.html").read_text(encoding="utf-8")
+        self.detail_tpl = (fixtures_dir / "detail.html").read_text(encoding="utf-8")
+        self.render_delay_ms = render_delay_ms
+        self.as_of = as_of
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_per_min = max_per_min
+        self.slow_js_ms = slow_js_ms
+        self.wall_rate = wall_rate
+        self.outage_until = time.monotonic() + outage_s
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()          # request times within the last minute
+        self.stats = Counter()
+        row = "<tr><td>US912828ZQ64</td><td>TREASURY NOTE</td><td>Fixed Income</td><td>0.62%</td></tr>\n"
+        self.filler = "<table class='holdings'>\n" + row * max(1, page_kb * 1024 // len(row)) + "</table>"
+
+    def listing_html(self) -> str:
+        public = [{k: f[k] for k in ("ticker", "name", "href", "assetClass", "netAssets")} for f in self.funds]
+        return _fill(self.listing_tpl, {
+            "funds_json": json.dumps(public),
+            "render_delay_ms": self.render_delay_ms,
+        })
+
+    def detail_html(self, fund) -> str:
+        deferred = {"deferred_open": "", "deferred_close": "", "deferred_script": ""}
+        if self.slow_js_ms:
+            deferred = {
+                "deferred_open": '<template id="deferred-facts">',
+                "deferred_close": "</template>",
+                "deferred_script": (
+                    "<script>setTimeout(function () {"
+                    "var t = document.getElementById('deferred-facts');"
+                    "t.parentNode.appendChild(t.content.cloneNode(true));"
+                    f"}}, {int(self.slow_js_ms)});</script>"
+                ),
+            }
+        facts = fund.get("key_facts", {})
+        key_facts = "\n  ".join(
+            f'<div class="float-left in-left"><span class="caption">{caption} as of {self.as_of}</span>'
+            f'<span class="data">{facts[k]}{unit}</span></div>'
+            for k, caption, unit in _KEY_FACTS if k in facts
+        )
+        return _fill(self.detail_tpl, {
+            "name": fund["name"],
+            "ticker": fund["ticker"],
+            "as_of": self.as_of,
+            "net_assets": fund["netAssets"],
+            "filler": self.filler,
+            "key_facts": key_facts,
+            **deferred,
+            **fund["metrics"],
+        })
+
+    def _delay_s(self):
+        with self._lock:
+            jitter = self._rnd.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def _fault(self):
+        """(status, title, headers) for an injected failure, or None."""
+        now = time.monotonic()
+        with self._lock:
+            if self.max_per_min:
+                while self._window and now - self._window[0] > 60.0:
+                    self._window.popleft()
+                if len(self._window) >= self.max_per_min:
+                    retry_after = max(1, int(60.0 - (now - self._window[0])) + 1)
+                    return 429, "Too Many Requests", {"Retry-After": str(retry_after)}
+                self._window.append(now)
+            roll = self._rnd.random()
+        if roll < self.throttle_rate:
+            return 429, "Too Many Requests", {"Retry-After": "5"}
+        if roll < self.throttle_rate + self.error_rate:
+            if roll < self.throttle_rate + self.error_rate / 2:
+                return 500, "Internal Server Error", {}
+            return 503, "Service Unavailable", {}
+        return None
+
+    def route(self, path: str):
+        """Return (status, html, headers) for a request path (query/fragment stripped)."""
+        path = path.split("?", 1)[0].split("#", 1)[0]
+        if path == "/__mock/stats":
+            with self._lock:
+                return 200, json.dumps(dict(self.stats)), {"Content-Type": "application/json"}
+        fault = self._fault()
+        if fault:
+            status, title, headers = fault
+            return status, _ERROR_PAGE.format(title=f"{status} {title}"), headers
+        if path.rstrip("/") == LISTING_PATH:
+            return 200, self.listing_html(), {}
+        parts = path.strip("/").split("/")
+        if len(parts) >= 3 and parts[:2] == ["us", "products"] and parts[2] in self.by_id:
+            with self._lock:
+                walled = time.monotonic() < self.outage_until or (
+                    self.wall_rate and self._rnd.random() < self.wall_rate)
+            if walled:
+                return 200, _WALL_PAGE, {}
+            return 200, self.detail_html(self.by_id[parts[2]]), {}
+        return 404, _ERROR_PAGE.format(title="Page not found"), {}
+
+def _make_handler(site: MockSite):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            delay = site._delay_s()
+            if delay:
+                time.sleep(delay)
+            status, html, headers = site.route(self.path)
+            with site._lock:
+                site.stats[str(status)] += 1
+            body = html.encode("utf-8")
+            self.send_response(status)
+            headers = {"Content-Type": "text/html; charset=utf-8", **headers}
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+    return Handler
+
+def start_server(funds, host: str = "127.0.0.1", port: int = 0, **site_kwargs):
+    """Start the mock site in a daemon thread; returns (server, base_url)."""
+    site = MockSite(funds, **site_kwargs)
+    server = ThreadingHTTPServer((host, port), _make_handler(site))
+    server.daemon_threads = True
+    server.site = site
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def point_scraper_at(base_url: str):
+    """Re-point the scraper's HOME / FAST_URL at the mock site."""
+    import ishares_fixed_income_scraper as scraper
+    scraper.HOME = base_url + LISTING_PATH
+    scraper.FAST_URL = (
+        scraper.HOME
+        + "#/?productView=etf&dataView=fixedIncomeView"
+          "&sortColumn=totalNetAssets&sortDirection=desc"
+    )
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve a mock ishares.com for offline scraper runs")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--funds", type=int, default=300, help="fixed-income funds to synthesize")
+    ap.add_argument("--other-funds", type=int, default=None, help="non-fixed-income funds (default funds/2)")
+    ap.add_argument("--page-kb", type=int, default=64)
+    ap.add_argument("--render-delay-ms", type=int, default=50, help="listing re-render delay")
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--jitter-ms", type=float, default=0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500/503 responses")
+    ap.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of random 429s")
+    ap.add_argument("--max-per-min", type=int, default=0, help="429 above this request rate (0 = off)")
+    ap.add_argument("--slow-js-ms", type=int, default=0, help="delay before detail metrics render")
+    ap.add_argument("--wall-rate", type=float, default=0.0, help="fraction of detail pages answered by a bot wall")
+    ap.add_argument("--outage-s", type=float, default=0.0, help="bot wall on every detail page for this long")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    funds = synthesize_funds(args.funds, args.other_funds)
+    server, base = start_server(
+        funds, host=args.host, port=args.port,
+        page_kb=args.page_kb, render_delay_ms=args.render_delay_ms,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, max_per_min=args.max_per_min,
+        slow_js_ms=args.slow_js_ms, wall_rate=args.wall_rate, outage_s=args.outage_s, seed=args.seed,
+    )
+    print(f"Mock iShares serving {len(funds)} funds at {base}{LISTING_PATH}")
+    print(f"  ISHARES_HOME={base}{LISTING_PATH}")
+    print(f"  stats: {base}/__mock/stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# browser_profile.py
+# Reusable Chrome user-data directory: consent cookie, warm HTTP disk cache and
+# service workers carried over between runs.
+#
+# There is one master profile on disk (ISHARES_CHROME_PROFILE or
+# --chrome-profile). Chrome never runs on the master itself: each driver gets
+# its own copy (so parallel drivers, tabs or shard processes never share a
+# live profile), and when a driver finishes cleanly its copy can be promoted
+# back to become the new master. Promotion takes a lock file and is skipped
+# when another process holds it. A master that makes Chrome fail to start is
+# reset (deleted) and the run continues with a fresh profile;
+# --reset-chrome-profile does the same by hand.
+#
+#   copy = worker_copy(master, "details")     # fresh temp dir (empty if no master yet)
+#   ... Chrome with --user-data-dir=copy ...
+#   promote(copy, master); discard(copy)
+
+import os, pathlib, shutil, tempfile, time
+
+PROFILE_ENV = "ISHARES_CHROME_PROFILE"
+DISK_CACHE_BYTES = 200 * 1024 * 1024
+
+# Runtime files of a live Chrome that must not be copied into another instance
+_SKIP = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "*.tmp", "Crashpad", "BrowserMetrics*", "DevToolsActivePort",
+)
+
+def master_from_env():
+    p = os.getenv(PROFILE_ENV)
+    return pathlib.Path(p) if p else None
+
+def worker_copy(master, tag="driver") -> pathlib.Path:
+    """Private copy of the master profile for one Chrome instance."""
+    copy = pathlib.Path(tempfile.mkdtemp(prefix=f"ishares_chrome_{tag}_"))
+    master = pathlib.Path(master)
+    if master.is_dir():
+        try:
+            shutil.copytree(master, copy, ignore=_SKIP, dirs_exist_ok=True)
+        except (OSError, shutil.Error):
+            # unreadable master: start this driver fresh rather than fail
+            shutil.rmtree(copy, ignore_errors=True)
+            copy.mkdir()
+    return copy
+
+def promote(copy, master, lock_timeout=0.0) -> bool:
+    """Make `copy` the new master (after its Chrome has quit). False if skipped."""
+    master = pathlib.Path(master)
+    master.parent.mkdir(parents=True, exist_ok=True)
+    lock = master.with_name(master.name + ".lock")
+    end = time.monotonic() + lock_timeout
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            # a stale lock (crashed run) older than 10 minutes is broken
+            try:
+                if time.time() - lock.stat().st_mtime > 600:
+                    lock.unlink()
+                    continue
+            except OSError:
+                pass
+            if time.monotonic() >= end:
+                return False
+            time.sleep(0.2)
+    try:
+        os.close(fd)
+        staged = master.with_name(master.name + ".new")
+        old = master.with_name(master.name + ".old")
+        shutil.rmtree(staged, ignore_errors=True)
+        shutil.copytree(copy, staged, ignore=_SKIP)
+        shutil.rmtree(old, ignore_errors=True)
+        if master.exists():
+            os.replace(master, old)
+        os.replace(staged, master)
+        shutil.rmtree(old, ignore_errors=True)
+        return True
+    except (OSError, shutil.Error):
+        return False
+    finally:
+        try:
+            lock.unlink()
+        except OSError:
+            pass
+
+def reset(master):
+    shutil.rmtree(pathlib.Path(master), ignore_errors=True)
+
+def discard(copy):
+    # Chrome can hold files for a moment after quit() on Windows
+    for _ in range(5):
+        shutil.rmtree(copy, ignore_errors=True)
+        if not pathlib.Path(copy).exists():
+            return
+        time.sleep(0.5)
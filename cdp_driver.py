@@ -0,0 +1,348 @@
+# cdp_driver.py
+# Chrome driven over the DevTools protocol directly, no chromedriver.
+#
+# With Selenium every find_element, .text and execute_script is an HTTP
+# request to chromedriver, which turns it into DevTools messages to Chrome.
+# CDPDriver launches Chrome with --remote-debugging-port, connects to the
+# page's websocket and sends those messages itself (Page.navigate,
+# Runtime.evaluate / callFunctionOn), saving the extra hop on each call.
+# It implements the part of the WebDriver interface the scraper uses: get(),
+# title, page_source, execute_script(), find_element(s)() and elements with
+# .text, .get_attribute(), .click(), is_displayed(), is_enabled(), plus
+# get_cookies() and execute_cdp_cmd(), and response_headers: the headers of
+# the document response the last get() loaded (which Selenium cannot give
+# without the performance log). Failures raise Selenium's exception
+# types, so the scraper's retry logic and error classes (and WebDriverWait)
+# behave the same with either backend. One tab only: --tabs needs Selenium.
+#
+#   driver = CDPDriver.launch(headless=True, args=["--window-size=1400,900"])
+#   driver.get(url)                              # waits for DOMContentLoaded
+#   body = driver.find_element("tag name", "body").text
+#   driver.quit()
+#
+# get() waits for DOMContentLoaded by default, like the "eager" page load
+# strategy on the Selenium side; wait_until="load" or "networkidle" wait longer.
+# Needs websocket-client (installed with selenium).
+
+import itertools, json, os, pathlib, shutil, subprocess, tempfile, time, urllib.request
+from collections import deque
+
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, TimeoutException, WebDriverException,
+)
+
+# Where Chrome usually is when CHROME_BINARY is not set
+CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+# callFunctionOn on an objectId whose document is gone
+STALE_OBJECT_ERRORS = ("Cannot find context with specified id", "Could not find object with given id")
+
+LIFECYCLE = {"domcontentloaded": "DOMContentLoaded", "load": "load", "networkidle": "networkIdle"}
+
+# arguments: by, selector, root element (or null = document), first only
+FIND_JS = """
+const by = arguments[0], sel = arguments[1], root = arguments[2] || document, first = arguments[3];
+if (by === "xpath") {
+  const r = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const out = [];
+  for (let j = 0; j < r.snapshotLength && !(first && out.length); j++) out.push(r.snapshotItem(j));
+  return out;
+}
+let css = sel;                          // "css selector", "tag name"
+if (by === "id") css = "#" + CSS.escape(sel);
+else if (by === "class name") css = "." + CSS.escape(sel);
+else if (by === "name") css = "[name=\\"" + CSS.escape(sel) + "\\"]";
+if (first) { const e = root.querySelector(css); return e ? [e] : []; }
+return Array.from(root.querySelectorAll(css));
+"""
+
+def find_chrome():
+    path = os.getenv("CHROME_BINARY")
+    if path:
+        return path
+    for c in CHROME_CANDIDATES:
+        found = shutil.which(c) or (c if os.path.isfile(c) else None)
+        if found:
+            return found
+    raise WebDriverException("Chrome not found; set CHROME_BINARY")
+
+class CDPElement:
+    def __init__(self, driver, object_id):
+        self.parent = driver            # as WebElement.parent: the driver
+        self.object_id = object_id
+
+    def _call(self, fn, *args):
+        return self.parent.execute_script(f"return ({fn}).apply(arguments[0], Array.from(arguments).slice(1));",
+                                          self, *args)
+
+    @property
+    def text(self):
+        return self._call("function () { return this.innerText || ''; }")
+
+    def get_attribute(self, name):
+        # like Selenium: the property when there is one (href -> absolute URL)
+        return self._call("function (n) { const v = this[n];"
+                          " return (v !== undefined && v !== null && typeof v !== 'object')"
+                          " ? String(v) : this.getAttribute(n); }", name)
+
+    def is_displayed(self):
+        return bool(self._call("function () { return this.getClientRects().length > 0; }"))
+
+    def is_enabled(self):
+        return bool(self._call("function () { return !this.disabled; }"))
+
+    def click(self):
+        self._call("function () { this.scrollIntoView({block: 'center'}); this.click(); }")
+
+    def find_elements(self, by, value):
+        return self.parent._find(by, value, root=self)
+
+    def find_element(self, by, value):
+        return self.parent._find(by, value, root=self, first=True)
+
+class CDPDriver:
+    def __init__(self, ws, proc=None, profile_dir=None, own_profile=False, page_load_timeout=30.0):
+        self._ws = ws
+        self._proc = proc
+        self._profile_dir = profile_dir
+        self._own_profile = own_profile
+        self._ids = itertools.count(1)
+        self._events = deque(maxlen=500)
+        self._global_id = None          # objectId of globalThis in the current document
+        self._documents = {}            # loaderId -> headers of its document response
+        self.response_headers = {}
+        self.page_load_timeout = page_load_timeout
+        self.command_timeout = 60.0
+        self.execute("Page.enable")
+        self.execute("Page.setLifecycleEventsEnabled", {"enabled": True})
+        # for response_headers; bodies are never fetched, so Chrome buffers none
+        self.execute("Network.enable", {"maxTotalBufferSize": 0, "maxResourceBufferSize": 0})
+
+    @classmethod
+    def launch(cls, headless=True, args=(), user_data_dir=None, binary=None, start_timeout=20.0):
+        """Start Chrome and connect to its first tab."""
+        import websocket
+        own = user_data_dir is None
+        profile = pathlib.Path(user_data_dir or tempfile.mkdtemp(prefix="ishares_cdp_"))
+        port_file = profile / "DevToolsActivePort"
+        try:
+            port_file.unlink()
+        except OSError:
+            pass
+        cmd = [binary or find_chrome(), "--remote-debugging-port=0", f"--user-data-dir={profile}",
+               "--no-first-run", "--no-default-browser-check", *args]
+        if headless:
+            cmd.append("--headless=new")
+        cmd.append("about:blank")
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            end = time.monotonic() + start_timeout
+            while True:
+                try:
+                    port = int(port_file.read_text().split()[0])
+                    break
+                except (OSError, ValueError, IndexError):
+                    pass
+                if proc.poll() is not None:
+                    raise WebDriverException(f"Chrome exited at startup (code {proc.returncode})")
+                if time.monotonic() >= end:
+                    raise WebDriverException("Chrome did not open its DevTools port")
+                time.sleep(0.05)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=10) as resp:
+                targets = json.load(resp)
+            page = next((t for t in targets if t.get("type") == "page"), None)
+            if page is None:
+                raise WebDriverException("Chrome has no page target to attach to")
+            # no Origin header: Chrome 111+ refuses websocket origins it was not told about
+            ws = websocket.create_connection(page["webSocketDebuggerUrl"], timeout=10,
+                                             suppress_origin=True)
+            return cls(ws, proc, profile, own)
+        except Exception:
+            proc.kill()
+            if own:
+                shutil.rmtree(profile, ignore_errors=True)
+            raise
+
+    # --- protocol ---
+    def _recv(self, timeout):
+        import websocket
+        self._ws.settimeout(max(0.01, timeout))
+        try:
+            return json.loads(self._ws.recv())
+        except websocket.WebSocketTimeoutException:
+            return None
+        except (websocket.WebSocketException, OSError) as e:
+            raise WebDriverException(f"disconnected: {e}") from None
+
+    def execute(self, method, params=None):
+        """Send one DevTools command and return its result (events seen meanwhile are kept)."""
+        msg_id = next(self._ids)
+        try:
+            self._ws.send(json.dumps({"id": msg_id, "method": method, "params": params or {}}))
+        except Exception as e:
+            raise WebDriverException(f"disconnected: {e}") from None
+        end = time.monotonic() + self.command_timeout
+        while True:
+            left = end - time.monotonic()
+            msg = self._recv(left) if left > 0 else None
+            if msg is None:
+                raise TimeoutException(f"{method}: no reply in {self.command_timeout:.0f}s")
+            if msg.get("id") == msg_id:
+                if "error" in msg:
+                    raise WebDriverException(f"{method}: {msg['error'].get('message')}")
+                return msg.get("result", {})
+            if "method" in msg:
+                self._event(msg)
+
+    def _event(self, msg):
+        # Network events only matter for the document response; keeping the
+        # rest would push lifecycle events out of the buffer
+        if msg["method"].startswith("Network."):
+            params = msg.get("params", {})
+            if msg["method"] == "Network.responseReceived" and params.get("type") == "Document":
+                self._documents[params.get("loaderId")] = params.get("response", {}).get("headers") or {}
+            return
+        self._events.append(msg)
+
+    def execute_cdp_cmd(self, cmd, cmd_args=None):
+        return self.execute(cmd, cmd_args)
+
+    def _wait_event(self, match, timeout):
+        end = time.monotonic() + timeout
+        while True:
+            for ev in list(self._events):
+                if match(ev):
+                    self._events.remove(ev)
+                    return ev
+            self._events.clear()
+            left = end - time.monotonic()
+            if left <= 0:
+                return None
+            msg = self._recv(left)
+            if msg is not None and "method" in msg:
+                self._event(msg)
+
+    # --- WebDriver subset ---
+    def get(self, url, wait_until="domcontentloaded"):
+        self._events.clear()
+        self._documents.clear()
+        self._global_id = None
+        self.response_headers = {}
+        res = self.execute("Page.navigate", {"url": url})
+        if res.get("errorText"):
+            raise WebDriverException(f"unknown error: {res['errorText']}")
+        loader = res.get("loaderId")
+        if not loader:
+            return          # same-document navigation (#fragment)
+        name = LIFECYCLE[wait_until]
+        ev = self._wait_event(lambda e: e["method"] == "Page.lifecycleEvent"
+                              and e["params"].get("loaderId") == loader
+                              and e["params"].get("name") == name,
+                              self.page_load_timeout)
+        self.response_headers = self._documents.get(loader, {})
+        if ev is None:
+            raise TimeoutException(f"timeout: {name} not fired within {self.page_load_timeout:.0f}s")
+
+    def _arg(self, v):
+        if isinstance(v, CDPElement):
+            return {"objectId": v.object_id}
+        return {"value": v}
+
+    def _value(self, obj):
+        if obj.get("subtype") == "node":
+            return CDPElement(self, obj["objectId"])
+        if obj.get("subtype") == "array":
+            props = self.execute("Runtime.getProperties", {"objectId": obj["objectId"], "ownProperties": True})
+            items = sorted((int(p["name"]), p["value"]) for p in props["result"]
+                           if p["name"].isdigit() and "value" in p)
+            return [self._value(v) for _, v in items]
+        if obj.get("type") == "undefined" or obj.get("subtype") == "null":
+            return None
+        if "objectId" in obj:
+            res = self.execute("Runtime.callFunctionOn", {
+                "functionDeclaration": "function () { return this; }",
+                "objectId": obj["objectId"], "returnByValue": True,
+            })
+            return res["result"].get("value")
+        return obj.get("value")
+
+    def _global(self):
+        # one handle per document, so a script is one round trip, not two
+        if self._global_id is None:
+            self._global_id = self.execute("Runtime.evaluate", {"expression": "globalThis"})["result"]["objectId"]
+        return self._global_id
+
+    def execute_script(self, script, *args):
+        """Run `script` as a function body (arguments[i] = args[i]), like Selenium."""
+        params = {
+            "functionDeclaration": f"function () {{\n{script}\n}}",
+            "arguments": [self._arg(a) for a in args],
+            "awaitPromise": True,
+        }
+        try:
+            res = self.execute("Runtime.callFunctionOn", {**params, "objectId": self._global()})
+        except WebDriverException as e:
+            # the page navigated on its own (click, redirect): its old globalThis is gone
+            if not any(m in str(e) for m in STALE_OBJECT_ERRORS):
+                raise
+            self._global_id = None
+            res = self.execute("Runtime.callFunctionOn", {**params, "objectId": self._global()})
+        if "exceptionDetails" in res:
+            d = res["exceptionDetails"]
+            raise JavascriptException((d.get("exception") or {}).get("description") or d.get("text"))
+        return self._value(res["result"])
+
+    def _find(self, by, value, root=None, first=False):
+        els = self.execute_script(FIND_JS, by, value, root, first) or []
+        if first:
+            if not els:
+                raise NoSuchElementException(f"no element for {by}={value!r}")
+            return els[0]
+        return els
+
+    def find_elements(self, by, value):
+        return self._find(by, value)
+
+    def find_element(self, by, value):
+        return self._find(by, value, first=True)
+
+    @property
+    def title(self):
+        return self.execute_script("return document.title;")
+
+    @property
+    def current_url(self):
+        return self.execute_script("return location.href;")
+
+    @property
+    def page_source(self):
+        return self.execute_script("return document.documentElement.outerHTML;")
+
+    def get_cookies(self):
+        return self.execute("Network.getCookies").get("cookies", [])
+
+    def quit(self):
+        try:
+            self.execute("Browser.close")
+        except Exception:
+            pass
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.terminate()
+                try:
+                    self._proc.wait(timeout=3)
+                except subprocess.TimeoutExpired:
+                    self._proc.kill()
+        if self._own_profile and self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
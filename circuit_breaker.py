@@ -0,0 +1,149 @@
+# circuit_breaker.py
+# Pauses the whole detail phase when the site keeps refusing us.
+#
+# The rate limiter slows down on a bad response but keeps sending. During
+# an outage or a block that means hundreds of pointless page loads. The
+# breaker counts consecutive "refused" outcomes across all workers (bot wall,
+# consent wall, error page, HTTP error, timeout). At `threshold` in a row it
+# opens: nobody starts a page for `cooldown_s`. Then one probe request goes
+# through (half-open). A good page closes the breaker again. Another refusal
+# reopens it with the cooldown doubled (capped). After `max_trips` openings
+# with no good page in between, or when a pause would run past the run's
+# deadline, allow() returns False and the run stops dispatching; unreached
+# funds keep their previous values.
+#
+#   breaker = CircuitBreaker.from_env(log=log)
+#   if not breaker.allow(deadline):      # blocks while open
+#       ... stop ...
+#   breaker.record(refused=reason in REFUSED_REASONS)
+#   breaker.release()      # instead of record() when the attempt says nothing
+#                          # about the site (no URL, browser crashed, no work)
+#
+# Config (env): ISHARES_BREAKER_THRESHOLD (default 5, 0 = off),
+#               ISHARES_BREAKER_COOLDOWN (seconds, default 300),
+#               ISHARES_BREAKER_MAX_TRIPS (default 3)
+
+import os, threading, time
+
+# FetchError reasons that say "the site is not serving us" rather than "this page is odd"
+REFUSED_REASONS = {"bot_wall", "consent_wall", "error_page", "http_error", "timeout", "navigation_error"}
+
+class CircuitBreaker:
+    def __init__(self, threshold=5, cooldown_s=300.0, max_cooldown_s=1800.0, max_trips=3,
+                 log=None, clock=time.monotonic):
+        self.threshold = int(threshold)
+        self.cooldown_s = float(cooldown_s)
+        self.max_cooldown_s = float(max_cooldown_s)
+        self.max_trips = int(max_trips)
+        self.log = log
+        self._clock = clock
+        self._cond = threading.Condition()
+        self.state = "closed"               # closed | open | half_open
+        self.consecutive = 0
+        self.trips = 0                      # openings in this run
+        self._streak = 0                    # openings since the last good page
+        self.paused_s = 0.0
+        self.gave_up = False
+        self._reopen_at = 0.0
+        self._next_cooldown = self.cooldown_s
+        self._probe_out = False
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        return cls(
+            threshold=int(os.getenv("ISHARES_BREAKER_THRESHOLD", "5")),
+            cooldown_s=float(os.getenv("ISHARES_BREAKER_COOLDOWN", "300")),
+            max_trips=int(os.getenv("ISHARES_BREAKER_MAX_TRIPS", "3")),
+            **kwargs,
+        )
+
+    def _say(self, msg):
+        if self.log:
+            self.log(msg)
+
+    def allow(self, deadline=None) -> bool:
+        """Wait until a request may start. False: stop the run (gave up / past the deadline)."""
+        if self.threshold <= 0:
+            return True
+        with self._cond:
+            while True:
+                if self.gave_up:
+                    return False
+                if self.state == "closed":
+                    return True
+                now = self._clock()
+                if self.state == "open":
+                    if deadline is not None and self._reopen_at >= deadline:
+                        self._say("Circuit breaker: pause would run past the time budget; stopping.")
+                        self.gave_up = True
+                        self._cond.notify_all()
+                        return False
+                    if now >= self._reopen_at:
+                        self.state = "half_open"
+                        self._probe_out = False
+                        self._say("Circuit breaker: half-open, sending one probe request.")
+                        continue
+                    t0 = time.monotonic()
+                    self._cond.wait(self._reopen_at - now)
+                    self.paused_s += time.monotonic() - t0
+                    continue
+                # half_open: one probe at a time, the rest wait for its verdict
+                if not self._probe_out:
+                    self._probe_out = True
+                    return True
+                if deadline is not None and now >= deadline:
+                    return False
+                self._cond.wait(1.0 if deadline is None else min(1.0, deadline - now))
+
+    def release(self):
+        """An attempt started after allow() ended without a verdict on the site;
+        if it was the half-open probe, let the next caller probe instead."""
+        if self.threshold <= 0:
+            return
+        with self._cond:
+            if self.state == "half_open" and self._probe_out:
+                self._probe_out = False
+                self._cond.notify_all()
+
+    def record(self, refused: bool):
+        """Outcome of one request started after allow()."""
+        if self.threshold <= 0:
+            return
+        with self._cond:
+            if self.gave_up:
+                return
+            if not refused:
+                if self.state != "closed":
+                    self._say("Circuit breaker: site is answering again; closed.")
+                self.state = "closed"
+                self.consecutive = 0
+                self._streak = 0
+                self._next_cooldown = self.cooldown_s
+                self._cond.notify_all()
+                return
+            self.consecutive += 1
+            if self.state == "half_open" or (self.state == "closed" and self.consecutive >= self.threshold):
+                self._trip()
+
+    def _trip(self):
+        self.trips += 1
+        self._streak += 1
+        if self.max_trips and self._streak > self.max_trips:
+            self._say(f"Circuit breaker: still refused after {self.max_trips} pauses; giving up.")
+            self.gave_up = True
+        else:
+            cooldown = self._next_cooldown
+            self._next_cooldown = min(self.max_cooldown_s, cooldown * 2)
+            self.state = "open"
+            self._reopen_at = self._clock() + cooldown
+            self._say(f"Circuit breaker: {self.consecutive} refused pages in a row; "
+                      f"pausing all requests for {cooldown:.0f}s.")
+        self._cond.notify_all()
+
+    def summary(self) -> dict:
+        with self._cond:
+            return {
+                "state": "gave_up" if self.gave_up else self.state,
+                "trips": self.trips,
+                "paused_s": round(self.paused_s, 1),
+            }
@@ -0,0 +1,142 @@
+# extract_pool.py
+# Metric extraction in a pool of worker processes, pages passed through
+# memory-mapped page archives instead of pickled strings.
+#
+# The regexes in extract_metrics_from_body_text run under the GIL, so once
+# detail pages arrive from several browsers at once a single process becomes
+# the bottleneck on 100 KB+ page texts. ExtractPool writes each chunk of pages
+# back to back (UTF-8) into an archive segment file (on tmpfs /dev/shm when
+# there is one, so it never touches disk) and sends a worker only the segment
+# path and an offset table; the worker mmaps the segment read-only, runs the
+# extraction, and sends back the small metrics dicts. Results come back in
+# input order as each chunk finishes, with a bounded number of chunks in
+# flight, so pages can be fed from a generator while fetching continues.
+#
+#   with ExtractPool(workers=4, patterns=profile.metric_patterns) as pool:
+#       for metrics in pool.imap(pages):     # pages: body text, or (body, closing-price DOM text)
+#           ...
+#
+# workers=0 extracts inline (no processes); see benchmarks/bench_extract_pool.py
+# for pages/s against worker count.
+
+import mmap, os, pathlib, tempfile
+from collections import deque
+
+from ishares_extract import _extract_price_like, _parse_number, extract_metrics_from_body_text
+
+ARCHIVE_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+_PATTERNS = None    # per worker process, set by _init_worker
+
+def _init_worker(patterns):
+    global _PATTERNS
+    _PATTERNS = patterns
+
+def _split(page):
+    if isinstance(page, tuple):
+        body, price_text = page
+        return body or "", price_text or ""
+    return page or "", ""
+
+def _extract_one(body, price_text, patterns):
+    metrics = extract_metrics_from_body_text(body, patterns)
+    # same rule as fetch_fund_metrics: a closing price read from the DOM wins
+    if price_text and "Closing Price" in metrics:
+        price = _extract_price_like(price_text)
+        if price:
+            metrics["Closing Price"] = _parse_number(price)
+    return metrics
+
+def _extract_segment(path, index):
+    """Worker side: extract every page of one archive segment."""
+    out = []
+    if os.path.getsize(path) == 0:
+        # every page in the chunk is empty, and an empty file cannot be mmapped
+        return [_extract_one("", "", _PATTERNS) for _ in index]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for off, n, price_n in index:
+            body = mm[off:off + n].decode("utf-8")
+            price_text = mm[off + n:off + n + price_n].decode("utf-8") if price_n else ""
+            out.append(_extract_one(body, price_text, _PATTERNS))
+    return out
+
+def write_segment(pages, dir_path=ARCHIVE_DIR):
+    """Write pages to a new archive segment; returns (path, [(offset, body_len, price_len), ...])."""
+    fd, path = tempfile.mkstemp(prefix="ishares_pages_", suffix=".bin", dir=dir_path)
+    index, off = [], 0
+    with os.fdopen(fd, "wb") as f:
+        for page in pages:
+            body, price_text = (s.encode("utf-8") for s in _split(page))
+            f.write(body)
+            f.write(price_text)
+            index.append((off, len(body), len(price_text)))
+            off += len(body) + len(price_text)
+    return path, index
+
+class ExtractPool:
+    def __init__(self, workers=None, patterns=None, chunk_pages=32, max_chunks_in_flight=None,
+                 archive_dir=ARCHIVE_DIR):
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, int(workers))
+        self.patterns = patterns
+        self.chunk_pages = max(1, chunk_pages)
+        self.max_in_flight = max_chunks_in_flight or 2 * max(1, self.workers)
+        self.archive_dir = archive_dir
+        self._ex = None
+        self._segments = set()
+
+    def __enter__(self):
+        if self.workers:
+            from concurrent.futures import ProcessPoolExecutor
+            self._ex = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                           initargs=(self.patterns,))
+        return self
+
+    def __exit__(self, *exc):
+        if self._ex is not None:
+            self._ex.shutdown(cancel_futures=True)
+            self._ex = None
+        for path in list(self._segments):
+            self._drop(path)
+
+    def _drop(self, path):
+        self._segments.discard(path)
+        try:
+            pathlib.Path(path).unlink()
+        except OSError:
+            pass
+
+    def _collect(self, item):
+        path, fut = item
+        try:
+            return fut.result()
+        finally:
+            self._drop(path)
+
+    def imap(self, pages):
+        """Metrics dict per page, in input order."""
+        if self._ex is None:
+            for page in pages:
+                yield _extract_one(*_split(page), self.patterns)
+            return
+        pending, chunk = deque(), []
+
+        def submit():
+            path, index = write_segment(chunk, self.archive_dir)
+            self._segments.add(path)
+            pending.append((path, self._ex.submit(_extract_segment, path, index)))
+
+        for page in pages:
+            chunk.append(page)
+            if len(chunk) >= self.chunk_pages:
+                submit()
+                chunk = []
+                while len(pending) >= self.max_in_flight:
+                    yield from self._collect(pending.popleft())
+        if chunk:
+            submit()
+        while pending:
+            yield from self._collect(pending.popleft())
+
+def extract_many(pages, workers=None, patterns=None, chunk_pages=32):
+    with ExtractPool(workers=workers, patterns=patterns, chunk_pages=chunk_pages) as pool:
+        return list(pool.imap(pages))
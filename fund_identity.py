@@ -0,0 +1,112 @@
+# fund_identity.py
+# Stable identity for a fund: its iShares product ID, across links and runs.
+#
+# The listing deduped on (ticker, name), but the same fund can show up with
+# a different query string or fragment on its link (?switchLocale=y,
+# #tabsAll) or a slightly different name, and then its detail page got
+# scraped twice. Every detail page lives at /<locale>/products/<id>/<slug>,
+# so the number is the key: canonical_url() drops query, fragment, trailing
+# slash and anything after the slug, product_id() pulls out the ID, and
+# IdentityIndex keeps ticker -> product ID -> canonical URL in a small JSON
+# file next to the CSVs, so the mapping carries over between runs:
+#   - a listing row whose product ID was seen already is a duplicate
+#   - a row without a usable link gets the URL the index knows for its ticker
+#   - a ticker that moves to another product ID is counted (and remembered)
+#
+#   index = IdentityIndex(data_dir / "fund_identity.json")
+#   pid, url = index.resolve(ticker, name, href)
+#   index.save(); index.summary()
+#
+# Standard library only.
+
+import json, os, pathlib, re, threading
+from datetime import date
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+PRODUCT_RE = re.compile(r"/products/(\d+)(?:/[^/]+)?", re.IGNORECASE)
+
+def canonical_url(url, base=None):
+    """scheme://host/path of a link, lower-cased up to the product slug ("" if no link)."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    p = urlsplit(urljoin(base, url) if base else url)
+    path = re.sub(r"/{2,}", "/", p.path).rstrip("/") or "/"
+    m = PRODUCT_RE.search(path)
+    if m:
+        path = path[:m.end()].lower()
+    return urlunsplit((p.scheme.lower(), p.netloc.lower(), path, "", ""))
+
+def product_id(url):
+    """iShares product ID in a detail-page link, or None."""
+    m = PRODUCT_RE.search(urlsplit(url or "").path)
+    return m.group(1) if m else None
+
+class IdentityIndex:
+    def __init__(self, path=None):
+        self.path = pathlib.Path(path) if path else None
+        self._data = None               # {"products": {pid: {...}}, "tickers": {ticker: pid}}, lazy
+        self._dirty = False
+        self._stats = {"resolved": 0, "new": 0, "url_from_index": 0, "ticker_moved": 0, "no_id": 0}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self._data = {}
+            self._data.setdefault("products", {})
+            self._data.setdefault("tickers", {})
+        return self._data
+
+    def lookup(self, ticker):
+        """(product ID, canonical URL) last seen for a ticker, or (None, "")."""
+        with self._lock:
+            d = self._load()
+            pid = d["tickers"].get(ticker)
+            return pid, d["products"].get(pid, {}).get("url", "") if pid else ""
+
+    def resolve(self, ticker, name, url):
+        """(product ID or None, canonical URL) for a listing row; updates the index."""
+        canon = canonical_url(url)
+        pid = product_id(canon)
+        with self._lock:
+            d = self._load()
+            st = self._stats
+            st["resolved"] += 1
+            known = d["tickers"].get(ticker)
+            if pid is None:
+                if known is None:
+                    st["no_id"] += 1
+                    return None, canon
+                # no link, or not a product page: last run's URL for this ticker
+                pid = known
+                canon = d["products"][known]["url"]
+                st["url_from_index"] += 1
+            elif known is not None and known != pid:
+                st["ticker_moved"] += 1
+            entry = d["products"].get(pid)
+            if entry is None:
+                st["new"] += 1
+                entry = d["products"][pid] = {"first_seen": date.today().isoformat()}
+            entry.update(ticker=ticker, name=name, url=canon or entry.get("url", ""),
+                         last_seen=date.today().isoformat())
+            d["tickers"][ticker] = pid
+            self._dirty = True
+            return pid, canon
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # per process: shard workers on one host save the same file side by side
+            tmp = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self._data, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {**self._stats, "products": len(self._data["products"]) if self._data else None}
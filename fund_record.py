@@ -0,0 +1,88 @@
+# fund_record.py
+# One record type for a fund's metrics, from the detail page to the CSV and funds.json.
+#
+# A scraped fund used to be a dict with a string key per column, built again
+# at each step (extraction, iter_fund_metrics, the exporter, canonical_json).
+# FundMetrics is a __slots__ object: the fixed fields as attributes and the
+# metrics as one list in the column order of a RecordSchema. The schema (one
+# per asset-class profile: profile.schema) is the only place that says which
+# columns the metrics CSV and funds.json have, and in what order.
+#
+#   schema = profile.schema
+#   rec = schema.record("AGG", "iShares Core US Aggregate Bond ETF", values, url=url)
+#   rec["Effective Duration"]           # lookups by column name still work
+#   writer.writerow(rec.csv_row())      # schema.csv_columns order
+#   rec.as_json(4)                      # schema.json_keys -> values (floats rounded)
+#   schema.columns(records)             # column -> list, for DataFrames / columnar writers
+#
+# Standard library only.
+
+# CSV / JSON column -> record attribute (metrics live in .values)
+FIELDS = {"Ticker": "ticker", "Fund Name": "name", "Stale": "stale", "Failure Reason": "reason",
+          "As Of": "as_of", "Detail URL": "url", "Detail": "url"}
+
+class RecordSchema:
+    def __init__(self, metric_columns):
+        self.metric_columns = list(metric_columns)
+        self.index = {c: i for i, c in enumerate(self.metric_columns)}
+        # metrics CSV (what batch_export_json.py reads)
+        self.csv_columns = ["Ticker", "Fund Name", *self.metric_columns, "Stale", "Failure Reason", "As Of"]
+        # funds.json (the app's file); the detail link is "Detail" there
+        self.json_keys = ["Ticker", "Fund Name", *self.metric_columns, "Detail", "Stale"]
+
+    def record(self, ticker, name, values=None, stale=False, reason="", as_of="", url=""):
+        return FundMetrics(self, ticker, name, values, stale, reason, as_of, url)
+
+    def from_mapping(self, ticker, name, m, **fields):
+        """Record from a column -> value mapping (previous snapshot, extractor output)."""
+        return FundMetrics(self, ticker, name, [m.get(c) for c in self.metric_columns], **fields)
+
+    def columns(self, records, keys=None):
+        """Column -> list of values over `records` (keys: csv_columns by default)."""
+        keys = keys or self.csv_columns
+        return {k: [r[k] for r in records] for k in keys}
+
+class FundMetrics:
+    __slots__ = ("schema", "ticker", "name", "values", "stale", "reason", "as_of", "url")
+
+    def __init__(self, schema, ticker, name, values=None, stale=False, reason="", as_of="", url=""):
+        self.schema = schema
+        self.ticker = ticker
+        self.name = name
+        self.values = list(values) if values is not None else [None] * len(schema.metric_columns)
+        self.stale = stale
+        self.reason = reason
+        self.as_of = as_of
+        self.url = url
+
+    def __getitem__(self, key):
+        i = self.schema.index.get(key)
+        if i is not None:
+            return self.values[i]
+        try:
+            return getattr(self, FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    @property
+    def metrics(self):
+        """Metric column -> value (a fresh dict)."""
+        return dict(zip(self.schema.metric_columns, self.values))
+
+    def csv_row(self):
+        return [self.ticker, self.name, *self.values, self.stale, self.reason, self.as_of]
+
+    def as_json(self, decimals=None):
+        vals = self.values
+        if decimals is not None:
+            vals = [round(v, decimals) if isinstance(v, float) else v for v in vals]
+        return dict(zip(self.schema.json_keys, [self.ticker, self.name, *vals, self.url, self.stale]))
+
+    def __repr__(self):
+        return f"FundMetrics({self.ticker!r}, {self.metrics!r}, stale={self.stale!r}, reason={self.reason!r})"
@@ -0,0 +1,128 @@
+# health_gate.py
+# Run-level quality check before a snapshot is published.
+#
+# Without it a run where most detail pages failed still ends "ok": the
+# metrics CSV is mostly blanks, the exporter picks it as the latest snapshot
+# and the workflow commits a funds.json full of nulls. The gate summarizes a
+# result set (row count, per-metric fill rate, share of freshly scraped rows)
+# and compares it with the snapshot it would replace:
+#   - fewer than MIN_ROWS_RATIO of the previous row count
+#   - any metric's fill rate down by more than MAX_FILL_DROP (absolute)
+#   - overall fill below MIN_FILL (also on the first run, with nothing to compare)
+#   - more than MAX_MISSING of the rows with no values at all: funds that
+#     failed or were skipped (time budget, breaker) and had no previous
+#     values to fall back on
+# The scraper then finishes the run as "unhealthy" instead of "ok", so
+# latest_ok (run_manifest.py) keeps pointing at the previous good run and the
+# exporter keeps publishing that. The exporter runs the same check against
+# the funds.json it would overwrite and refuses (exit 1) unless --force.
+#
+#   cur = csv_stats(details_file, profile.metric_columns)
+#   prev = previous_stats(run_manifest.latest_file(save_dir, "metrics"), published, profile.metric_columns)
+#   health = check(cur, prev)        # {"ok": bool, "problems": [...], ...}
+# previous_stats() falls back to the published funds.json rows when data/
+# has no ok run (a fresh CI checkout), so the comparison still happens there.
+# Rows carried over from the previous snapshot (Stale: time budget, breaker,
+# failures) are acceptable; the share refreshed is reported, not gated.
+#
+# Stats are computed a column at a time (list.count over the transposed
+# rows), not cell by cell. Standard library only.
+#
+# Config (env): ISHARES_HEALTH_MIN_ROWS_RATIO (default 0.9),
+#               ISHARES_HEALTH_MAX_FILL_DROP (default 0.2),
+#               ISHARES_HEALTH_MIN_FILL (default 0.5),
+#               ISHARES_HEALTH_MAX_MISSING (default 0.05),
+#               ISHARES_HEALTH=off to skip the gate
+
+import csv, os
+
+def limits_from_env():
+    return {
+        "min_rows_ratio": float(os.getenv("ISHARES_HEALTH_MIN_ROWS_RATIO", "0.9")),
+        "max_fill_drop": float(os.getenv("ISHARES_HEALTH_MAX_FILL_DROP", "0.2")),
+        "min_fill": float(os.getenv("ISHARES_HEALTH_MIN_FILL", "0.5")),
+        "max_missing": float(os.getenv("ISHARES_HEALTH_MAX_MISSING", "0.05")),
+    }
+
+def enabled():
+    return os.getenv("ISHARES_HEALTH", "on").lower() not in ("0", "off", "false", "no")
+
+def _share(k, n):
+    return None if k is None else (round(k / n, 4) if n else 0.0)
+
+def _stats(n, filled, fresh=None, missing=None):
+    fill = {c: round(k / n, 4) if n else 0.0 for c, k in filled.items()}
+    return {
+        "rows": n,
+        "fill": fill,
+        "overall_fill": round(sum(filled.values()) / (n * len(filled)), 4) if n and filled else 0.0,
+        "fresh": _share(fresh, n),
+        "missing": _share(missing, n),
+    }
+
+def _fresh_missing(reasons, stale):
+    # no Failure Reason: refreshed this run; a reason and not Stale: nothing to fall back on
+    if reasons is None:
+        return None, None
+    return reasons.count(""), sum(1 for r, s in zip(reasons, stale) if r and not s)
+
+def csv_stats(path, metric_columns):
+    """Row count and fill rates of a metrics CSV (None if there is no file)."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = [r for r in reader if r and r[0]]
+    n = len(rows)
+    cols = dict(zip(header, zip(*rows))) if n else {}
+    empty = ("",) * n
+    filled = {c: n - cols.get(c, empty).count("") for c in metric_columns}
+    reasons = cols.get("Failure Reason") if n and "Failure Reason" in header else None
+    stale = [s == "True" for s in cols.get("Stale", empty)]
+    return _stats(n, filled, *_fresh_missing(list(reasons) if reasons is not None else None, stale))
+
+def records_stats(records, metric_columns):
+    """Same for records (FundMetrics or funds.json rows: None = missing)."""
+    n = len(records)
+    filled = {c: n - [r.get(c) for r in records].count(None) for c in metric_columns}
+    # funds.json rows have no Failure Reason: fresh / missing unknown
+    reasons = [r.get("Failure Reason") for r in records]
+    if None in reasons:
+        reasons = None
+    return _stats(n, filled, *_fresh_missing(reasons, [bool(r.get("Stale")) for r in records]))
+
+def previous_stats(metrics_csv, published, metric_columns):
+    """Stats of the snapshot a run replaces: the last ok metrics CSV, else the
+    published funds.json rows (None if neither exists)."""
+    return csv_stats(metrics_csv, metric_columns) or (
+        records_stats(published, metric_columns) if published else None)
+
+def check(current, previous=None, limits=None):
+    """Compare a result set with the one it replaces; {"ok", "problems", ...}."""
+    limits = limits or limits_from_env()
+    problems = []
+    if current is None or current["rows"] == 0:
+        problems.append("no rows")
+    else:
+        if current["overall_fill"] < limits["min_fill"]:
+            problems.append(f"overall fill {current['overall_fill']:.0%} < {limits['min_fill']:.0%}")
+        if current.get("missing") is not None and current["missing"] > limits["max_missing"]:
+            problems.append(f"{current['missing']:.0%} of funds have no values, fresh or previous "
+                            f"(> {limits['max_missing']:.0%})")
+        if previous and previous["rows"]:
+            ratio = current["rows"] / previous["rows"]
+            if ratio < limits["min_rows_ratio"]:
+                problems.append(f"rows {current['rows']} vs {previous['rows']} before "
+                                f"({ratio:.0%} < {limits['min_rows_ratio']:.0%})")
+            for c, was in previous["fill"].items():
+                now = current["fill"].get(c, 0.0)
+                if was - now > limits["max_fill_drop"]:
+                    problems.append(f"{c} fill {was:.0%} -> {now:.0%}")
+    return {
+        "ok": not problems,
+        "problems": problems,
+        "current": current,
+        "previous": previous,
+        "limits": limits,
+    }
@@ -0,0 +1,87 @@
+# ishares_extract.py
+# Parsing/extraction core of the scraper: metric regexes and number parsing.
+#
+# Standard library only, so tools that just need METRIC_PATTERNS or
+# extract_metrics_from_body_text import it in milliseconds. The scraper
+# re-exports everything here, so `from ishares_fixed_income_scraper import ...`
+# keeps working.
+
+import re
+
+# --------- Metric extraction (per fund page) ---------
+# NOTE: "Convexity" removed per your request.
+METRIC_PATTERNS = {
+    "Closing Price": [
+        r"\bclosing\s+price\b.*?(\$?\d{1,3}(?:,\d{3})*\.\d{2})",
+        r"\bmarket\s+price\b.*?(\$?\d{1,3}(?:,\d{3})*\.\d{2})",
+        r"\blast\s+price\b.*?(\$?\d{1,3}(?:,\d{3})*\.\d{2})",
+    ],
+    "Average Yield to Maturity": [
+        r"\byield\s+to\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bavg(?:\.|erage)?\s+ytm\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bytms?\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\byield\s+to\s+worst\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bytws?\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+    ],
+    "Weighted Avg Coupon": [
+        r"\bweighted\s+avg(?:erage)?\s+coupon\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\baverage\s+coupon\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+        r"\bavg(?:\.|erage)?\s+coupon\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
+    ],
+    "Effective Duration": [
+        r"\beffective\s+duration\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
+        r"\beffective\s+duration\s*[:\-]?\s*([0-9]+(?:\.[0-9]+)?)\b",
+    ],
+    "Weighted Avg Maturity": [
+        r"\bweighted\s+avg(?:erage)?\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
+        r"\baverage\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
+        r"\bavg(?:\.|erage)?\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
+    ],
+    "Option Adjusted Spread": [
+        r"\boption\s+adjusted\s+spread\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:bp|bps)\b",
+        r"\boas\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:bp|bps)\b",
+        r"\boas\b.*?([0-9]+(?:\.[0-9]+)?)\b",
+    ],
+}
+
+# Column order of the metrics CSV / funds.json
+METRIC_COLUMNS = list(METRIC_PATTERNS)
+
+def _parse_number(s):
+    if s is None:
+        return None
+    t = s.strip().replace(",", "").replace("\u00A0", " ")
+    t = re.sub(r"^\$", "", t)
+    t = t.replace("bps", "").replace("bp", "")
+    t = t.replace("%", "")
+    try:
+        return float(t)
+    except Exception:
+        return None
+
+def _extract_price_like(text):
+    if not text:
+        return None
+    m = re.search(r"\$?\d{1,3}(?:,\d{3})*\.\d{2}", text)
+    return m.group(0) if m else None
+
+def extract_metric_values(text, patterns=None):
+    # patterns: column -> regexes (an asset-class profile's schema); fixed income by default.
+    # Values come back as a list in column order (what FundMetrics.values holds).
+    patterns = patterns or METRIC_PATTERNS
+    out = [None] * len(patterns)
+    if not text:
+        return out
+    low = text.lower()
+    for i, pats in enumerate(patterns.values()):
+        for pat in pats:
+            m = re.search(pat, low, flags=re.DOTALL)
+            if m:
+                out[i] = _parse_number(m.group(1))
+                break
+    return out
+
+def extract_metrics_from_body_text(text, patterns=None):
+    # same, as column -> value
+    patterns = patterns or METRIC_PATTERNS
+    return dict(zip(patterns, extract_metric_values(text, patterns)))
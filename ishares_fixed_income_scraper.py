@@ -7,33 +7,79 @@
 #     - In GitHub Actions:   $GITHUB_WORKSPACE/data
 #     - Locally:             ./data
 #     - Or override with env OUTPUT_DIR=/absolute/or/relative/path
+# - Site URLs can be overridden with env ISHARES_HOME / ISHARES_FAST_URL
 #
 # Usage:
 #   python ishares_fixed_income_scraper.py
 #   # CSVs will be in ./data (or as above)
-#   # batch_export_json.py can then read the latest *metrics_*.csv
+#   # batch_export_json.py then reads the latest *metrics_*.csv via data/runs_manifest.json
+#   # In Spyder (%runfile) or with ISHARES_DATAFRAME=1, a DataFrame `df` is built too
+#   # detail pages start as soon as the listing yields its first funds (the base CSV
+#   # is written alongside), queued by priority as they arrive (scheduling.py);
+#   # --no-pipeline reads the whole listing first, then sorts it by priority
+#   python ishares_fixed_income_scraper.py --time-budget 45m
+#   # stops starting new detail pages ~1 min before the budget runs out; funds not
+#   # reached keep their previous values (Stale) and the run report lists which
+#   # funds were refreshed. Also settable with env ISHARES_TIME_BUDGET.
+#   python ishares_fixed_income_scraper.py --list-only
+#   python ishares_fixed_income_scraper.py --base-csv data/ishares_fixed_income_<run_id>.csv --shard 0/4
+#   # one shard of a shared fund list per process / CI job; see sharding.py for the merge
+#   python ishares_fixed_income_scraper.py --asset-class equity   # or all; see asset_profiles.py
+#   python ishares_fixed_income_scraper.py --tabs 4      # 4 detail pages at once, one Chrome
+#   python ishares_fixed_income_scraper.py --browser cdp   # DevTools directly, no chromedriver (cdp_driver.py)
+#   python ishares_fixed_income_scraper.py --chrome-profile data/chrome_profile
+#   # reuses consent cookie + disk cache between runs (browser_profile.py);
+#   # --reset-chrome-profile starts it over
+#   # A run whose metrics CSV is much emptier (or shorter) than the last good one
+#   # ends "unhealthy" and the previous snapshot stays published (health_gate.py)
+#   python refresh_daemon.py      # service mode: warm Chrome, scheduled refreshes, /status
 
-import os
-import time, re, pathlib, csv
-from datetime import datetime
+import os, sys
+import time, re, pathlib, csv, hashlib, json, threading
+from datetime import datetime, timezone
 
-import pandas as pd
+# Heavy deps load lazily: selenium/webdriver-manager inside the browser
+# functions, pandas only where the DataFrame is built. Importing this module
+# (e.g. for METRIC_PATTERNS) costs about as much as importing ishares_extract.
+from ishares_extract import (
+    METRIC_COLUMNS, METRIC_PATTERNS, _parse_number, _extract_price_like,
+    extract_metric_values, extract_metrics_from_body_text,
+)
+import run_manifest
+from run_report import STATS, count_webdriver_calls
+from rate_limit import THROTTLE_STATUSES, AdaptiveRateLimiter, parse_retry_after
+from retry_queue import RetryScheduler
+from scheduling import order_by_priority, priority_key
+from sharding import parse_shard_spec, run_id_from_path, select_shard, shard_of, shard_suffix
+from asset_profiles import FIXED_INCOME, PROFILES, get_profile
+from selector_cache import RACE_ENABLED, SelectorCache, race_find
+import browser_profile
+from tab_pool import TabPool
+from pipeline import FundFeed
+from page_classifier import PROBE_JS, classify_page
+from circuit_breaker import REFUSED_REASONS, CircuitBreaker
+from fund_identity import IdentityIndex
+import health_gate
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+# The extraction core is re-exported: `from ishares_fixed_income_scraper import
+# METRIC_PATTERNS` (and `import *`) keep working as before the split.
+__all__ = ["METRIC_COLUMNS", "METRIC_PATTERNS", "extract_metrics_from_body_text"]
 
-HOME = "https://www.ishares.com/us/products/etf-investments"
-FAST_URL = (
+# Override with ISHARES_HOME (and optionally ISHARES_FAST_URL) to run the whole
+# scraper against a stand-in site, e.g. benchmarks/mock_ishares.py
+HOME = os.getenv("ISHARES_HOME", "https://www.ishares.com/us/products/etf-investments")
+FAST_URL = os.getenv("ISHARES_FAST_URL") or (
     HOME
     + "#/?productView=etf&dataView=fixedIncomeView"
       "&sortColumn=totalNetAssets&sortDirection=desc"
 )
 
+def listing_url(profile=FIXED_INCOME):
+    # FAST_URL (and its env override) is the fixed-income view
+    if profile is FIXED_INCOME:
+        return FAST_URL
+    return HOME + f"#/?productView=etf&dataView={profile.data_view}&sortColumn=totalNetAssets&sortDirection=desc"
+
 # --------- Preferred directory (repo-local) ----------
 # 1) OUTPUT_DIR (if you want to override explicitly)
 # 2) GITHUB_WORKSPACE/data (on Actions)
@@ -55,10 +101,32 @@ def _detect_default_dir() -> pathlib.Path:
 
 PREFERRED_DIR = _detect_default_dir()
 
+# Which fallback selector worked at each call site, kept between runs
+SELECTORS = SelectorCache(PREFERRED_DIR / "selector_cache.json")
+# ticker -> product ID -> canonical detail URL, kept between runs (fund_identity.py)
+IDENTITY = IdentityIndex(PREFERRED_DIR / "fund_identity.json")
+CACHED_TIMEOUT = 1.5    # sequential mode: how long the remembered winner gets
+
+# Master Chrome profile reused between runs (None = fresh profile per driver);
+# see browser_profile.py. Set by --chrome-profile or ISHARES_CHROME_PROFILE.
+CHROME_PROFILE = browser_profile.master_from_env()
+
+# "selenium" (chromedriver) or "cdp" (cdp_driver.py: DevTools websocket, no
+# chromedriver hop). Set by --browser or ISHARES_BROWSER.
+BROWSER_BACKEND = os.getenv("ISHARES_BROWSER", "selenium")
+
 def log(msg):
     print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
 
-def make_driver(headless=True):
+# Chrome user agent for both backends
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
+
+def _launch_selenium(headless, tabs, profile_dir):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from webdriver_manager.chrome import ChromeDriverManager
     opts = Options()
     if headless:
         # newer headless for Chrome 109+
@@ -74,20 +142,66 @@ def make_driver(headless=True):
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
     opts.page_load_strategy = "eager"
+    if tabs > 1:
+        # TabPool navigates without waiting and polls each tab itself; background
+        # tabs must not be throttled while they load
+        opts.page_load_strategy = "none"
+        opts.add_argument("--disable-background-timer-throttling")
+        opts.add_argument("--disable-backgrounding-occluded-windows")
+        opts.add_argument("--disable-renderer-backgrounding")
 
     # Anti-bot hardening
     opts.add_argument("--disable-blink-features=AutomationControlled")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
-    opts.add_argument(
-        "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
-    )
+    opts.add_argument(f"--user-agent={USER_AGENT}")
+    # network events only, for the Retry-After of throttled pages (_navigation_headers)
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+    # Offline / pinned setups: CHROME_BINARY and CHROMEDRIVER skip the
+    # webdriver-manager download (which needs network)
+    if os.getenv("CHROME_BINARY"):
+        opts.binary_location = os.getenv("CHROME_BINARY")
+    if profile_dir:
+        opts.add_argument(f"--user-data-dir={profile_dir}")
+        opts.add_argument(f"--disk-cache-size={browser_profile.DISK_CACHE_BYTES}")
+    driver_path = os.getenv("CHROMEDRIVER") or ChromeDriverManager().install()
+    return webdriver.Chrome(
+        service=Service(driver_path),
         options=opts
     )
+
+def _launch_cdp(headless, tabs, profile_dir):
+    # same switches as the Selenium path; no chromedriver in between
+    from cdp_driver import CDPDriver
+    args = ["--window-size=1400,900", "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage",
+            "--disable-blink-features=AutomationControlled", f"--user-agent={USER_AGENT}"]
+    if headless:
+        args += ["--blink-settings=imagesEnabled=false", "--disable-notifications"]
+    if profile_dir:
+        args.append(f"--disk-cache-size={browser_profile.DISK_CACHE_BYTES}")
+    return CDPDriver.launch(headless=headless, args=args, user_data_dir=profile_dir)
+
+def make_driver(headless=True, tag="driver", tabs=1):
+    launch = _launch_cdp if BROWSER_BACKEND == "cdp" else _launch_selenium
+    # Persistent profile: this driver runs on its own copy of the master
+    copy = browser_profile.worker_copy(CHROME_PROFILE, tag) if CHROME_PROFILE else None
+    with STATS.phase("make_driver"):
+        try:
+            driver = launch(headless, tabs, copy)
+        except Exception as e:
+            if copy is None:
+                raise
+            # a profile Chrome cannot start with has gone bad: drop it, go fresh
+            log(f"Chrome failed to start with the saved profile ({str(e).splitlines()[0]}); resetting it.")
+            STATS.incr("profile.resets")
+            browser_profile.reset(CHROME_PROFILE)
+            browser_profile.discard(copy)
+            copy = browser_profile.worker_copy(CHROME_PROFILE, tag)
+            driver = launch(headless, tabs, copy)
+    driver._profile_copy = copy
+    count_webdriver_calls(driver)
     try:
         driver.execute_cdp_cmd(
             "Page.addScriptToEvaluateOnNewDocument",
@@ -97,48 +211,151 @@ def make_driver(headless=True):
         pass
     return driver
 
-def safe_click(driver, candidates, timeout=10):
-    for tup in candidates:
-        if len(tup) == 3:
-            by, sel, desc = tup
-        elif len(tup) == 2:
-            by, sel = tup; desc = sel
+def close_driver(driver, promote=False):
+    """Quit Chrome; with a persistent profile, optionally keep this driver's copy as the new master."""
+    copy = getattr(driver, "_profile_copy", None)
+    try:
+        driver.quit()
+    except Exception:
+        promote = False
+    if copy is not None:
+        if promote and browser_profile.promote(copy, CHROME_PROFILE):
+            STATS.incr("profile.promoted")
+        browser_profile.discard(copy)
+
+class BrowserSession:
+    """One Chrome kept open across scrapes (service mode, refresh_daemon.py).
+
+    Pass it as `session=` to iter_fund_list / iter_fund_metrics and they use
+    its driver instead of starting and quitting their own. The driver starts
+    on first use; a lost browser is replaced in place (restart()).
+    """
+    def __init__(self, headless=True, tag="driver", tabs=1):
+        self.headless = headless
+        self.tag = tag
+        self.tabs = tabs
+        self.starts = 0
+        self._driver = None
+        self._pool = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = make_driver(headless=self.headless, tag=self.tag, tabs=self.tabs)
+            self.starts += 1
+        return self._driver
+
+    def tab_pool(self):
+        # the tabs stay open with the browser
+        if self._pool is None or self._pool.driver is not self.driver:
+            self._pool = TabPool(self.driver, self.tabs)
+        return self._pool
+
+    def restart(self):
+        self.close()
+        return self.driver
+
+    def close(self, promote=False):
+        if self._driver is not None:
+            close_driver(self._driver, promote=promote)
+        self._driver = self._pool = None
+
+def safe_click(driver, candidates, timeout=10, site=None):
+    """Click the first candidate that is (or becomes) clickable within `timeout`.
+
+    Race mode (default) polls all candidates in one script per poll, in the
+    order given; otherwise they are waited on one by one, the candidate that
+    won at this `site` last time first.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    cands = [t if len(t) == 3 else (t[0], t[1], t[1]) for t in candidates if len(t) in (2, 3)]
+    site = site or cands[0][2]
+    ordered = SELECTORS.order(site, cands, race=RACE_ENABLED)
+    t0 = time.perf_counter()
+    el = won = None
+    with STATS.phase("wait.safe_click"):
+        if RACE_ENABLED:
+            end = time.monotonic() + timeout
+            while True:
+                hit = race_find(driver, ordered, visible_only=True)
+                if hit:
+                    won, el = ordered[hit[0]], hit[1][0]
+                    break
+                if time.monotonic() >= end:
+                    break
+                time.sleep(0.2)
         else:
-            continue
-        try:
-            el = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((by, sel)))
-            driver.execute_script("arguments[0].click()", el)
-            return True, desc
-        except Exception:
-            continue
-    return False, None
+            remembered = SELECTORS.winner(site, cands) is not None
+            for i, (by, sel, desc) in enumerate(ordered):
+                try:
+                    wait = CACHED_TIMEOUT if i == 0 and remembered else timeout
+                    el = WebDriverWait(driver, wait).until(EC.element_to_be_clickable((by, sel)))
+                    won = ordered[i]
+                    break
+                except Exception:
+                    STATS.incr("safe_click.misses")
+    SELECTORS.record(site, cands, won, time.perf_counter() - t0, miss_cost_s=timeout)
+    if el is None:
+        STATS.incr("safe_click.failures")
+        return False, None
+    try:
+        driver.execute_script("arguments[0].click()", el)
+    except Exception:
+        return False, None
+    return True, won[2]
+
+# OneTrust's "consent given" cookie; set once the banner has been accepted
+CONSENT_COOKIES = {"OptanonAlertBoxClosed"}
 
 def accept_cookies_if_present(driver):
+    from selenium.webdriver.common.by import By
+    # a reused profile already has the consent cookie: no banner to wait for
+    try:
+        if any(c.get("name") in CONSENT_COOKIES for c in driver.get_cookies()):
+            STATS.incr("consent.preaccepted")
+            return
+    except Exception:
+        pass
     safe_click(driver, [
         (By.ID, "onetrust-accept-btn-handler", "OneTrust accept"),
         (By.CSS_SELECTOR, "button[aria-label*='Accept' i]", "aria accept"),
         (By.XPATH, "//button[contains(translate(.,'ACCEPT','accept'),'accept')]", "generic accept"),
-    ], timeout=4)
+    ], timeout=4, site="cookies")
 
 def open_filters_panel(driver):
+    from selenium.webdriver.common.by import By
     safe_click(driver, [
         (By.XPATH, "//button[contains(translate(.,'FILTER','filter'),'filter')]"),
         (By.CSS_SELECTOR, "button[data-automation-id*='filter']"),
         (By.XPATH, "//span[contains(translate(.,'FILTER','filter'),'filter')]/ancestor::button"),
-    ], timeout=6)
+    ], timeout=6, site="filters_panel")
+
+def _ci_contains(expr, text):
+    # XPath 1.0 case-insensitive contains(expr, text)
+    up, low = text.upper(), text.lower()
+    return f"contains(translate({expr},'{up}','{low}'),'{low}')"
 
 def apply_asset_class_fixed_income(driver, expect_less_than=None):
+    return apply_asset_class_filter(driver, FIXED_INCOME.filter_label, expect_less_than)
+
+def apply_asset_class_filter(driver, label, expect_less_than=None):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     open_filters_panel(driver)
     safe_click(driver, [
         (By.XPATH, "//button[contains(translate(.,'ASSET CLASS','asset class'),'asset class')]"),
         (By.XPATH, "//div[contains(., 'Asset class')]/descendant::button[1]"),
         (By.CSS_SELECTOR, "[data-automation-id*='assetClass'] button"),
-    ], timeout=6)
+    ], timeout=6, site="asset_class_facet")
+    up, low = label.upper(), label.lower()
+    words = " and ".join(_ci_contains(".", w) for w in label.split())
     clicked, _ = safe_click(driver, [
-        (By.XPATH, "//label[.//span[contains(translate(.,'FIXED INCOME','fixed income'),'fixed income')]]"),
-        (By.XPATH, "//input[@type='checkbox' and (translate(@value,'FIXED INCOME','fixed income')='fixed income' or translate(@aria-label,'FIXED INCOME','fixed income')='fixed income')]/ancestor::label"),
-        (By.XPATH, "//span[contains(translate(.,'FIXED','fixed'),'fixed') and contains(translate(.,'INCOME','income'),'income')]/ancestor::label"),
-    ], timeout=8)
+        (By.XPATH, f"//label[.//span[{_ci_contains('.', label)}]]"),
+        (By.XPATH, f"//input[@type='checkbox' and (translate(@value,'{up}','{low}')='{low}' or translate(@aria-label,'{up}','{low}')='{low}')]/ancestor::label"),
+        (By.XPATH, f"//span[{words}]/ancestor::label"),
+    ], timeout=8, site=f"asset_class_option.{low}")
     if not clicked:
         return False
 
@@ -152,11 +369,12 @@ def apply_asset_class_fixed_income(driver, expect_less_than=None):
     target = expect_less_than if expect_less_than is not None else max(200, int(before * 0.7))
 
     try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-            By.XPATH,
-            "//div[contains(@class,'chip') or contains(@data-automation-id,'chip')]"
-            "[contains(translate(.,'FIXED','fixed'),'fixed') and contains(translate(.,'INCOME','income'),'income')]"
-        )))
+        with STATS.phase("wait.filter_chip"):
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((
+                By.XPATH,
+                "//div[contains(@class,'chip') or contains(@data-automation-id,'chip')]"
+                f"[{words}]"
+            )))
         chip_ok = True
     except Exception:
         chip_ok = False
@@ -172,57 +390,122 @@ def apply_asset_class_fixed_income(driver, expect_less_than=None):
     return (after <= target) or chip_ok
 
 def click_show_all(driver):
+    from selenium.webdriver.common.by import By
     ok, _ = safe_click(driver, [
         (By.CSS_SELECTOR, "button[data-automation-id*='showAll']"),
         (By.CSS_SELECTOR, "a[data-automation-id*='showAll']"),
         (By.XPATH, "//button[contains(translate(.,'SHOW ALL','show all'),'show all')]"),
         (By.XPATH, "//a[contains(translate(.,'SHOW ALL','show all'),'show all')]"),
-    ], timeout=5)
+    ], timeout=5, site="show_all")
     if ok:
         log("Clicked Show all.")
     return ok
 
+# listing rows, most specific first (By.CSS_SELECTOR == "css selector")
+ROW_CANDIDATES = [
+    ("css selector", "[data-automation-id*='productRow'], [data-automation-id*='fund-row']"),
+    ("css selector", "table tbody tr"),
+    ("css selector", "[data-automation-id*='fund']"),
+]
+
+def _first_present(driver_or_el, candidates):
+    # sequential fallback for race_find: one find_elements per candidate
+    for i, (by, sel, *_) in enumerate(candidates):
+        try:
+            els = driver_or_el.find_elements(by, sel)
+        except Exception:
+            continue
+        if els:
+            return i, els
+    return None
+
 def wait_for_some_rows(driver, min_rows=50, max_wait=12):
     log(f"Waiting for at least {min_rows} rows…")
     t0 = time.time()
     rows = []
-    while time.time() - t0 < max_wait and len(rows) < min_rows:
-        rows = driver.find_elements(By.CSS_SELECTOR, "[data-automation-id*='productRow'], [data-automation-id*='fund-row']")
-        if not rows:
-            rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
-        if not rows:
-            rows = driver.find_elements(By.CSS_SELECTOR, "[data-automation-id*='fund']")
-        if len(rows) >= min_rows:
-            break
-        time.sleep(0.2)
+    cands = SELECTORS.order("rows", ROW_CANDIDATES, race=RACE_ENABLED)
+    won = None
+    with STATS.phase("wait.rows"):
+        while time.time() - t0 < max_wait and len(rows) < min_rows:
+            t1 = time.perf_counter()
+            hit = race_find(driver, cands) if RACE_ENABLED else _first_present(driver, cands)
+            if hit:
+                won, rows = cands[hit[0]], hit[1]
+            if len(rows) >= min_rows:
+                break
+            time.sleep(0.2)
+    if won is not None:
+        SELECTORS.record("rows", ROW_CANDIDATES, won, time.perf_counter() - t1)
     log(f"Detected {len(rows)} candidate rows.")
     return rows
 
+_NET_ASSETS_RE = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*([KMB])\b")
+_NET_ASSETS_MULT = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+def _parse_net_assets(text):
+    m = _NET_ASSETS_RE.search(text or "")
+    if not m:
+        return None
+    return float(m.group(1).replace(",", "")) * _NET_ASSETS_MULT[m.group(2)]
+
+NAME_CANDIDATES = [
+    ("css selector", "[data-automation-id*='fundName'] a"),
+    ("xpath", ".//a[contains(@href,'/us/products/')]"),
+    ("xpath", ".//a[contains(@href,'/products/')]"),
+]
+TICKER_CANDIDATES = [
+    ("css selector", "[data-automation-id*='ticker']"),
+    ("css selector", ".fund-ticker, .ticker"),
+    ("xpath", ".//*[contains(@class,'ticker') or contains(@data-automation-id,'ticker')]"),
+    ("xpath", ".//td[1]"),
+]
+
 def scrape_rows(rows):
-    """Return list of dicts: [{"ticker":..., "name":..., "url":...}, ...]"""
+    """Return list of dicts: [{"ticker":..., "name":..., "url":..., ...}, ...]"""
+    return list(iter_rows(rows))
+
+def listing_signature(ticker, name, url):
+    """Short hash of what identifies a fund in the listing: ticker, name, product link.
+
+    The row text also carries NAV, yields and net assets, which move every
+    day; hashing those made nearly every fund look "changed" on every run.
+    """
+    return hashlib.sha1(f"{ticker}\x1f{name}\x1f{url}".encode("utf-8")).hexdigest()[:12]
+
+def iter_rows(rows):
+    """Yield each fund ({"ticker":..., "name":..., "url":..., ...}) as soon as its row is read.
+
+    Also keeps the listing rank, net assets (when the row shows them) and a
+    short signature of the fund's stable fields (listing_signature), used to
+    prioritize the detail phase.
+    The URL is the canonical one from IDENTITY; a fund is yielded once per
+    product ID even if its link or name differs between rows.
+    """
+    from selenium.webdriver.common.by import By
     def clean(s): return " ".join((s or "").split())
     BLOCKLIST = {"ETF","ETFs","USD","NAV","US","U.S.","NEW","FIXED","INCOME","BOND",
                  "BONDS","TBILL","UCITS","ISHARES","ISHARE","FUND","FUNDS","USA"}
-    data, seen = [], set()
+    seen = set()
 
     for r in rows:
+        fund = None
         try:
-            # NAME + URL
+            try:
+                row_text = clean(r.text)
+            except Exception:
+                row_text = ""
+
+            # NAME + URL (all candidates in one round trip in race mode)
             name, url = "", ""
-            for by, sel in [
-                (By.CSS_SELECTOR, "[data-automation-id*='fundName'] a"),
-                (By.XPATH, ".//a[contains(@href,'/us/products/')]"),
-                (By.XPATH, ".//a[contains(@href,'/products/')]"),
-            ]:
-                try:
-                    candidates = r.find_elements(by, sel)
-                    if candidates:
-                        link = max(candidates, key=lambda el: len(clean(el.text)))
-                        name = clean(link.text)
-                        url = link.get_attribute("href") or ""
-                        break
-                except Exception:
-                    continue
+            t1 = time.perf_counter()
+            cands = SELECTORS.order("row.name", NAME_CANDIDATES, race=RACE_ENABLED)
+            hit = race_find(r.parent, cands, root=r) if RACE_ENABLED else _first_present(r, cands)
+            SELECTORS.record("row.name", NAME_CANDIDATES, cands[hit[0]] if hit else None,
+                             time.perf_counter() - t1)
+            if hit:
+                link = max(hit[1], key=lambda el: len(clean(el.text)))
+                name = clean(link.text)
+                url = link.get_attribute("href") or ""
 
             if not name:
                 for by, sel in [
@@ -237,27 +520,24 @@ def scrape_rows(rows):
                     except Exception:
                         pass
 
-            # TICKER
-            ticker = ""
-            for by, sel in [
-                (By.CSS_SELECTOR, "[data-automation-id*='ticker']"),
-                (By.CSS_SELECTOR, ".fund-ticker, .ticker"),
-                (By.XPATH, ".//*[contains(@class,'ticker') or contains(@data-automation-id,'ticker')]"),
-                (By.XPATH, ".//td[1]"),
-            ]:
+            # TICKER (needs a text check, so candidates go one by one, last winner first)
+            ticker, won, tries = "", None, 0
+            t1 = time.perf_counter()
+            for by, sel in SELECTORS.order("row.ticker", TICKER_CANDIDATES):
+                tries += 1
                 try:
                     el = r.find_element(by, sel)
                     t = clean(el.text)
                     if 2 <= len(t) <= 5 and t.isupper():
-                        ticker = t
+                        ticker, won = t, (by, sel)
                         break
                 except Exception:
                     pass
+            SELECTORS.record("row.ticker", TICKER_CANDIDATES, won, (time.perf_counter() - t1) / tries)
 
             if not ticker:
                 try:
-                    txt = clean(r.text)
-                    for m in re.finditer(r"\b[A-Z]{2,5}\b", txt):
+                    for m in re.finditer(r"\b[A-Z]{2,5}\b", row_text):
                         t = m.group(0)
                         if t not in BLOCKLIST:
                             ticker = t
@@ -266,13 +546,22 @@ def scrape_rows(rows):
                     pass
 
             if ticker and name:
-                key = (ticker, name)
-                if key not in seen:
-                    data.append({"ticker": ticker, "name": name, "url": url})
+                pid, url = IDENTITY.resolve(ticker, name, url)
+                key = ("id", pid) if pid else ("url", url) if url else ("row", ticker, name)
+                if key in seen:
+                    STATS.incr("listing.duplicates")
+                else:
+                    fund = {
+                        "ticker": ticker, "name": name, "url": url, "product_id": pid or "",
+                        "rank": len(seen),
+                        "net_assets": _parse_net_assets(row_text),
+                        "signature": listing_signature(ticker, name, url),
+                    }
                     seen.add(key)
         except Exception:
             continue
-    return data
+        if fund is not None:
+            yield fund
 
 def save_html(driver, path="ishares_fixed_income_debug.html"):
     try:
@@ -284,105 +573,79 @@ def save_html(driver, path="ishares_fixed_income_debug.html"):
         log(f"Failed to save HTML: {e}")
 
 def scrape_fixed_income_list(headless=True):
+    return scrape_fund_list(FIXED_INCOME, headless=headless)
+
+def scrape_fund_list(profile=FIXED_INCOME, headless=True, session=None):
+    """Listing rows for one asset-class profile (no filter for profile "all")."""
+    return list(iter_fund_list(profile, headless=headless, session=session))
+
+def iter_fund_list(profile=FIXED_INCOME, headless=True, session=None):
+    """Yield listing rows one by one as they are read (see scrape_fund_list).
+
+    The filter is checked on the raw row count before the first fund is
+    yielded, so a consumer never sees funds from an unfiltered listing.
+    With a BrowserSession, its (warm) driver is used and left open.
+    """
     t_start = time.time()
-    driver = make_driver(headless=headless)
+    driver = session.driver if session is not None else make_driver(headless=headless, tag="listing")
+    label = profile.filter_label
+    n = 0
     try:
-        log("Navigating to fixed-income ETFs view…")
-        driver.get(FAST_URL)
+        log(f"Navigating to {label or 'all'} ETFs view…")
+        with STATS.phase("listing.get"):
+            driver.get(listing_url(profile))
         accept_cookies_if_present(driver)
         click_show_all(driver)
 
-        applied = apply_asset_class_fixed_income(driver, expect_less_than=300)
+        applied = apply_asset_class_filter(driver, label, expect_less_than=profile.max_funds) if label else True
         if not applied:
             log("Filter didn’t register—retrying from base ETFs page…")
-            driver.get(HOME + "#/?productView=etf&sortColumn=totalNetAssets&sortDirection=desc")
+            STATS.incr("listing.retries")
+            with STATS.phase("listing.get"):
+                driver.get(HOME + "#/?productView=etf&sortColumn=totalNetAssets&sortDirection=desc")
             accept_cookies_if_present(driver)
             click_show_all(driver)
-            apply_asset_class_fixed_income(driver, expect_less_than=300)
+            apply_asset_class_filter(driver, label, expect_less_than=profile.max_funds)
 
         rows = wait_for_some_rows(driver, min_rows=50, max_wait=12)
-        data = scrape_rows(rows)
-
-        if not data:
-            save_html(driver)
-
-        if len(data) > 300:
-            log(f"Row count {len(data)} still high—reapplying Fixed income filter…")
-            apply_asset_class_fixed_income(driver, expect_less_than=300)
+        if label and profile.max_funds and len(rows) > profile.max_funds:
+            log(f"Row count {len(rows)} still high—reapplying {label} filter…")
+            STATS.incr("listing.retries")
+            apply_asset_class_filter(driver, label, expect_less_than=profile.max_funds)
             rows = wait_for_some_rows(driver, min_rows=50, max_wait=8)
-            data = scrape_rows(rows)
 
-        log(f"Collected {len(data)} funds in {time.time() - t_start:.1f}s.")
-        return data
-    finally:
-        driver.quit()
+        t_rows = time.perf_counter()
+        for fund in iter_rows(rows):
+            # time in row reading only, not in whoever consumes the funds
+            STATS.add("listing.scrape_rows", time.perf_counter() - t_rows)
+            n += 1
+            yield fund
+            t_rows = time.perf_counter()
 
-# --------- Metric extraction (per fund page) ---------
-# NOTE: "Convexity" removed per your request.
-METRIC_PATTERNS = {
-    "Closing Price": [
-        r"\bclosing\s+price\b.*?(\$?\d{1,3}(?:,\d{3})*\.\d{2})",
-        r"\bmarket\s+price\b.*?(\$?\d{1,3}(?:,\d{3})*\.\d{2})",
-        r"\blast\s+price\b.*?(\$?\d{1,3}(?:,\d{3})*\.\d{2})",
-    ],
-    "Average Yield to Maturity": [
-        r"\byield\s+to\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-        r"\bavg(?:\.|erage)?\s+ytm\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-        r"\bytms?\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-        r"\byield\s+to\s+worst\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-        r"\bytws?\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-    ],
-    "Weighted Avg Coupon": [
-        r"\bweighted\s+avg(?:erage)?\s+coupon\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-        r"\baverage\s+coupon\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-        r"\bavg(?:\.|erage)?\s+coupon\b.*?([0-9]+(?:\.[0-9]+)?)\s*%",
-    ],
-    "Effective Duration": [
-        r"\beffective\s+duration\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
-        r"\beffective\s+duration\s*[:\-]?\s*([0-9]+(?:\.[0-9]+)?)\b",
-    ],
-    "Weighted Avg Maturity": [
-        r"\bweighted\s+avg(?:erage)?\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
-        r"\baverage\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
-        r"\bavg(?:\.|erage)?\s+maturity\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)\b",
-    ],
-    "Option Adjusted Spread": [
-        r"\boption\s+adjusted\s+spread\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:bp|bps)\b",
-        r"\boas\b.*?([0-9]+(?:\.[0-9]+)?)\s*(?:bp|bps)\b",
-        r"\boas\b.*?([0-9]+(?:\.[0-9]+)?)\b",
-    ],
-}
-
-def _parse_number(s):
-    if s is None:
-        return None
-    t = s.strip().replace(",", "").replace("\u00A0", " ")
-    t = re.sub(r"^\$", "", t)
-    t = t.replace("bp", "").replace("bps", "")
-    t = t.replace("%", "")
-    try:
-        return float(t)
-    except Exception:
-        return None
+        if not n:
+            save_html(driver)
+        log(f"Collected {n} funds in {time.time() - t_start:.1f}s.")
+    finally:
+        if session is None:
+            close_driver(driver, promote=True)
 
-def _extract_price_like(text):
-    if not text:
-        return None
-    m = re.search(r"\$?\d{1,3}(?:,\d{3})*\.\d{2}", text)
-    return m.group(0) if m else None
+CLOSING_PRICE_CANDIDATES = [
+    ("css selector", "[class*='closingPrice']"),
+    ("css selector", "[data-automation-id*='closingPrice']"),
+    ("css selector", "#fundamentalsAndRisk .col-closingPrice"),
+    ("css selector", ".col-closingPrice"),
+    ("css selector", "[class*='marketPrice']"),
+    ("css selector", "[data-automation-id*='marketPrice']"),
+]
 
 def get_closing_price_dom(driver):
-    candidates = [
-        "[class*='closingPrice']",
-        "[data-automation-id*='closingPrice']",
-        "#fundamentalsAndRisk .col-closingPrice",
-        ".col-closingPrice",
-        "[class*='marketPrice']",
-        "[data-automation-id*='marketPrice']",
-    ]
-    for sel in candidates:
+    from selenium.webdriver.common.by import By
+    # one by one (each needs a price check), last winner first
+    t0, tries = time.perf_counter(), 0
+    for by, sel in SELECTORS.order("closing_price", CLOSING_PRICE_CANDIDATES):
+        tries += 1
         try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
+            el = driver.find_element(by, sel)
             txt = el.text.strip()
             price = _extract_price_like(txt)
             if not price:
@@ -390,9 +653,12 @@ def get_closing_price_dom(driver):
                 txt2 = child.text.strip()
                 price = _extract_price_like(txt2)
             if price:
+                SELECTORS.record("closing_price", CLOSING_PRICE_CANDIDATES, (by, sel),
+                                 (time.perf_counter() - t0) / tries)
                 return price
         except Exception:
             pass
+    SELECTORS.record("closing_price", CLOSING_PRICE_CANDIDATES, None, time.perf_counter() - t0)
 
     try:
         el = driver.find_element(By.XPATH, "//*[contains(translate(.,'CLOSING PRICE','closing price'),'closing price')]")
@@ -413,84 +679,448 @@ def get_closing_price_dom(driver):
 
     return None
 
-def extract_metrics_from_body_text(text):
-    out = {k: None for k in METRIC_PATTERNS.keys()}
-    if not text:
-        return out
-    low = text.lower()
-    for key, pats in METRIC_PATTERNS.items():
-        for pat in pats:
-            m = re.search(pat, low, flags=re.DOTALL)
-            if m:
-                out[key] = _parse_number(m.group(1))
-                break
-    return out
+class FetchError(Exception):
+    """A detail page that gave nothing usable; `reason` says why.
+
+    Reasons: timeout, navigation_error, http_error, bot_wall, consent_wall,
+    error_page, empty_metrics, driver_crash, no_url.
+    """
+    def __init__(self, reason, detail=""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+
+def _classify_webdriver_error(e):
+    from selenium.common.exceptions import TimeoutException
+    if isinstance(e, TimeoutException):
+        return "timeout"
+    msg = str(e).lower()
+    if "invalid session id" in msg or "chrome not reachable" in msg or "disconnected" in msg:
+        return "driver_crash"
+    return "navigation_error"
 
-def scrape_fund_metrics(driver, url, wait_secs=15):
+# Headers of the navigation response, for Retry-After. CDPDriver records them
+# itself; with Selenium they come from chromedriver's performance log, which
+# is drained after every page (so it cannot grow) into the last few documents
+# by URL (with --tabs one drain can hold another tab's page).
+NAV_HEADERS_KEPT = 32
+
+def _navigation_headers(driver, url):
+    headers = getattr(driver, "response_headers", None)
+    if isinstance(headers, dict):
+        return headers
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return {}
+    kept = getattr(driver, "_nav_headers", None)
+    if kept is None:
+        kept = driver._nav_headers = {}
+    for entry in entries:
+        msg = entry.get("message", "")
+        if '"Network.responseReceived"' not in msg or '"Document"' not in msg:
+            continue
+        try:
+            params = json.loads(msg)["message"]["params"]
+        except (ValueError, KeyError, TypeError):
+            continue
+        if params.get("type") == "Document":
+            response = params.get("response") or {}
+            kept.pop(response.get("url"), None)
+            kept[response.get("url")] = response.get("headers") or {}
+    while len(kept) > NAV_HEADERS_KEPT:
+        kept.pop(next(iter(kept)))
+    return kept.get((url or "").split("#")[0], {})
+
+def _retry_after(headers):
+    # header names keep the server's case over HTTP/1.1
+    return parse_retry_after(next((v for k, v in headers.items() if k.lower() == "retry-after"), None))
+
+def fetch_fund_metrics(driver, url, wait_secs=15, limiter=None, profile=FIXED_INCOME):
+    """Scrape one detail page: metric values in profile column order.
+    Raises FetchError instead of returning all-None."""
+    from selenium.common.exceptions import WebDriverException
     if not url:
-        return {k: None for k in METRIC_PATTERNS.keys()}
+        raise FetchError("no_url")
+    t0 = time.perf_counter()
+    try:
+        with STATS.phase("detail.get"):
+            driver.get(url)
+    except WebDriverException as e:
+        if limiter is not None:
+            limiter.feedback(error=True)
+        raise FetchError(_classify_webdriver_error(e), str(e).splitlines()[0] if str(e) else "")
+    return read_loaded_page(driver, time.perf_counter() - t0, wait_secs, limiter, profile)
+
+def read_loaded_page(driver, latency, wait_secs=15, limiter=None, profile=FIXED_INCOME):
+    """Metrics of the detail page the driver has just loaded (also used by the tab pool)."""
+    patterns = profile.metric_patterns
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import WebDriverException
+    # walls and error pages fail here, before any waiting or extraction
     try:
-        driver.get(url)
-        WebDriverWait(driver, wait_secs).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        with STATS.phase("detail.classify"):
+            status, title, url, text, n = driver.execute_script(PROBE_JS, 2000)
+    except WebDriverException as e:
+        raise FetchError(_classify_webdriver_error(e))
+    status = int(status or 0)
+    kind, detail = classify_page(status, title, url, text, n)
+    headers = _navigation_headers(driver, url)
+    if limiter is not None:
+        retry_after = _retry_after(headers) if status in THROTTLE_STATUSES else None
+        if retry_after is not None:
+            STATS.incr("detail.retry_after")
+        limiter.feedback(latency=latency, status=status, retry_after=retry_after,
+                         blocked=kind in ("bot_wall", "consent_wall"))
+    if kind != "ok":
+        raise FetchError(kind, detail)
+
+    try:
+        with STATS.phase("wait.body"):
+            WebDriverWait(driver, wait_secs).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         time.sleep(0.7)
         body = driver.find_element(By.TAG_NAME, "body").text
 
-        metrics = extract_metrics_from_body_text(body)
+        values = _timed_extract(body, patterns)
+        idx = profile.schema.index
 
-        closing_price_str = get_closing_price_dom(driver)
-        if closing_price_str:
-            metrics["Closing Price"] = _parse_number(closing_price_str)
-        elif metrics.get("Closing Price") is None:
-            time.sleep(0.6)
-            body = driver.find_element(By.TAG_NAME, "body").text
-            fall = extract_metrics_from_body_text(body)
-            if fall.get("Closing Price") is not None:
-                metrics["Closing Price"] = fall["Closing Price"]
+        if "Closing Price" in idx:
+            i = idx["Closing Price"]
+            with STATS.phase("get_closing_price_dom"):
+                closing_price_str = get_closing_price_dom(driver)
+            if closing_price_str:
+                values[i] = _parse_number(closing_price_str)
+            elif values[i] is None:
+                STATS.incr("detail.retries")
+                time.sleep(0.6)
+                body = driver.find_element(By.TAG_NAME, "body").text
+                fall = _timed_extract(body, patterns)
+                if fall[i] is not None:
+                    values[i] = fall[i]
 
-        if metrics.get("Effective Duration") is None:
+        # metrics that tend to render late get one more look
+        late = [idx[c] for c in profile.late_metrics if c in idx and values[idx[c]] is None]
+        if late:
+            STATS.incr("detail.retries")
             time.sleep(0.4)
             body = driver.find_element(By.TAG_NAME, "body").text
-            bump = extract_metrics_from_body_text(body)
-            if bump.get("Effective Duration") is not None:
-                metrics["Effective Duration"] = bump["Effective Duration"]
+            bump = _timed_extract(body, patterns)
+            for i in late:
+                if bump[i] is not None:
+                    values[i] = bump[i]
+    except WebDriverException as e:
+        raise FetchError(_classify_webdriver_error(e))
 
-        return metrics
-    except Exception:
-        return {k: None for k in METRIC_PATTERNS.keys()}
+    if all(v is None for v in values):
+        raise FetchError("empty_metrics")
+    return values
 
-def scrape_details_for_funds(fund_rows, headless=True, max_per_min=40):
-    driver = make_driver(headless=headless)
-    results = []
-    per_req_sleep = max(0.0, 60.0 / max_per_min)
+# Kept for callers of the original one-page API; the scraper itself uses
+# fetch_fund_metrics, whose FetchError says why a page failed.
+def scrape_fund_metrics(driver, url, wait_secs=15, limiter=None, profile=FIXED_INCOME):
     try:
-        for i, row in enumerate(fund_rows, 1):
-            url = row.get("url", "")
-            ticker = row["ticker"]; name = row["name"]
-            m = scrape_fund_metrics(driver, url)
-            rec = {
-                "Ticker": ticker,
-                "Fund Name": name,
-                "Closing Price": m["Closing Price"],
-                "Average Yield to Maturity": m["Average Yield to Maturity"],
-                "Weighted Avg Coupon": m["Weighted Avg Coupon"],
-                "Effective Duration": m["Effective Duration"],
-                "Weighted Avg Maturity": m["Weighted Avg Maturity"],
-                "Option Adjusted Spread": m["Option Adjusted Spread"],
-                "Detail URL": url,
+        values = fetch_fund_metrics(driver, url, wait_secs=wait_secs, limiter=limiter, profile=profile)
+    except Exception:
+        STATS.incr("detail.errors")
+        values = [None] * len(profile.metric_columns)
+    return dict(zip(profile.metric_columns, values))
+
+def _timed_extract(body, patterns=None):
+    with STATS.phase("extract_metrics_from_body_text"):
+        return extract_metric_values(body, patterns)
+
+def load_published_rows(profile=FIXED_INCOME):
+    """Rows of the funds.json the app reads for `profile` (None if there is none)."""
+    from batch_export_json import OUT_PATH, load_published
+    rows = load_published(OUT_PATH.with_name(profile.json_name))
+    return rows if isinstance(rows, list) else None
+
+def load_previous_snapshot(dir_path: pathlib.Path, columns=METRIC_COLUMNS, published=None):
+    """Metrics (+ "As Of") of the latest successful run, by ticker ({} if none).
+
+    Without an ok run in dir_path (data/ starts empty on CI), the `published`
+    funds.json rows are the previous snapshot; they carry no "As Of".
+    """
+    prev_csv = run_manifest.latest_file(dir_path, "metrics")
+    if not prev_csv:
+        return {
+            r["Ticker"]: {**{c: r.get(c) for c in columns}, "As Of": None}
+            for r in published or () if isinstance(r, dict) and r.get("Ticker")
+        }
+    with open(prev_csv, newline="", encoding="utf-8") as f:
+        return {
+            rec["Ticker"]: {
+                **{c: _parse_number(rec.get(c)) for c in columns},
+                "As Of": rec.get("As Of") or None,
             }
-            results.append(rec)
-            log(f"[{i}/{len(fund_rows)}] {ticker}: Close={rec['Closing Price']}  "
-                f"EffDur={rec['Effective Duration']} yrs  "
-                f"YTM={rec['Average Yield to Maturity']}%  "
-                f"OAS={rec['Option Adjusted Spread']} bps")
-            time.sleep(per_req_sleep)
+            for rec in csv.DictReader(f) if rec.get("Ticker")
+        }
+
+BASE_CSV_COLUMNS = ["Ticker", "Fund Name", "Detail URL", "Net Assets", "Listing Signature", "Product ID"]
+
+def _base_csv_row(fund):
+    return (fund["ticker"], fund["name"], fund.get("url", ""), fund.get("net_assets"),
+            fund.get("signature", ""), fund.get("product_id", ""))
+
+def load_fund_list(path: pathlib.Path):
+    """Fund rows (as scrape_fixed_income_list returns them) from a base list CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {"ticker": rec["Ticker"], "name": rec["Fund Name"], "url": rec.get("Detail URL", ""),
+             "product_id": rec.get("Product ID") or "",
+             "rank": i, "net_assets": _parse_number(rec.get("Net Assets")),
+             "signature": rec.get("Listing Signature", "")}
+            for i, rec in enumerate(csv.DictReader(f)) if rec.get("Ticker")
+        ]
+
+def load_previous_signatures(dir_path: pathlib.Path):
+    """Listing-row signatures of the latest successful run, by ticker."""
+    prev_csv = run_manifest.latest_file(dir_path, "base")
+    if not prev_csv:
+        return {}
+    with open(prev_csv, newline="", encoding="utf-8") as f:
+        return {rec["Ticker"]: rec.get("Listing Signature") or None
+                for rec in csv.DictReader(f) if rec.get("Ticker")}
+
+def _utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def iter_fund_metrics(fund_rows, headless=True, max_per_min=40, limiter=None,
+                      previous=None, max_attempts=3, deadline=None, profile=FIXED_INCOME, tabs=1,
+                      breaker=None, session=None, priority=None):
+    """Yield one metrics record per fund as soon as its page is scraped.
+
+    Records are fund_record.FundMetrics in the schema of `profile` (fixed
+    income by default).
+
+    Pacing comes from `limiter` (shared across workers); without one, an
+    AdaptiveRateLimiter starting at max_per_min is created for this call.
+    Failed funds are retried at the end of the run with backoff (up to
+    max_attempts); funds that still fail get their values from `previous`
+    (ticker -> metrics of the last good snapshot) with Stale=True.
+    With `deadline` (time.monotonic() value), nothing new is dispatched once
+    it passes (the page in flight still finishes); the funds not reached are
+    emitted from `previous` the same way, so pass fund_rows in priority order.
+    With tabs > 1, that many pages load at once in tabs of one Chrome
+    (tab_pool.py) and records come out in the order the pages finish.
+    fund_rows may also be a pipeline.FundFeed still being filled by the
+    listing; funds are then dispatched as they arrive. `priority` (fund ->
+    score, scheduling.priority_key) puts the funds waiting to be dispatched
+    in that order, so a deadline drops the least important ones.
+    `breaker` (shared like the limiter; default from env) pauses dispatching
+    after repeated walls / errors and can end it early (circuit_breaker.py);
+    the funds left are emitted from `previous` as with the deadline.
+    With a BrowserSession (opened with the same `tabs`), its warm driver and
+    tabs are used and left open for the next call.
+    """
+    if session is not None:
+        tabs = session.tabs
+    if tabs > 1 and BROWSER_BACKEND == "cdp":
+        log("--tabs needs the selenium backend; loading one page at a time.")
+        tabs = 1
+    if session is not None:
+        driver = session.driver
+    else:
+        driver = make_driver(headless=headless, tag="details", tabs=tabs)
+    if limiter is None:
+        limiter = AdaptiveRateLimiter.from_env(start_per_min=max_per_min, log=log)
+    if breaker is None:
+        breaker = CircuitBreaker.from_env(log=log)
+    previous = previous or {}
+    feed = fund_rows if isinstance(fund_rows, FundFeed) else None
+    sched = RetryScheduler([] if feed else fund_rows, key=lambda r: r["ticker"],
+                           max_attempts=max_attempts, deadline=deadline, priority=priority)
+    done = 0
+
+    columns = profile.metric_columns
+    schema = profile.schema
+
+    def fallback(row, reason):
+        m = previous.get(row["ticker"])
+        if m is None:
+            return schema.record(row["ticker"], row["name"], reason=reason, url=row.get("url", ""))
+        return schema.from_mapping(row["ticker"], row["name"], m, stale=True, reason=reason,
+                                   as_of=m.get("As Of") or "", url=row.get("url", ""))
+
+    def top_up(timeout=0):
+        # funds that have arrived from the listing go to the back of the queue
+        if feed is not None:
+            for row in feed.take(timeout):
+                sched.add(row)
+
+    def next_work(busy=False):
+        """Next (row, attempt) to start, or None when out of work or time,
+        or (busy: pages in flight) when nothing is due yet."""
+        while not sched.expired():
+            top_up()
+            wait = sched.ready_in()
+            listing = feed is not None and not feed.done
+            if wait == 0 or (wait is not None and not busy and not listing):
+                break
+            if busy or not listing:
+                return None
+            # idle: wait for the listing to deliver (or the next retry to come
+            # due), but not past the deadline
+            left = sched.time_left()
+            if left is not None:
+                wait = left if wait is None else min(wait, left)
+            top_up(timeout=wait)
+        try:
+            return next(sched)
+        except StopIteration:
+            return None
+
+    def finish(row, attempt, m=None, error=None):
+        """Record for a fund whose attempt ended; None if it goes back for a retry."""
+        nonlocal done
+        ticker = row["ticker"]
+        stale, reason = False, ""
+        if error is None or error.reason not in ("no_url", "driver_crash"):
+            breaker.record(refused=error is not None and error.reason in REFUSED_REASONS)
+        else:
+            breaker.release()   # says nothing about the site; a half-open probe must not hang
+        if error is None:
+            sched.succeeded(row)
+            rec = schema.record(row["ticker"], row["name"], m, as_of=_utc_now(), url=row.get("url", ""))
+        else:
+            STATS.incr(f"failure.{error.reason}")
+            if not sched.failed(row, error.reason, retry=error.reason != "no_url"):
+                log(f"{ticker}: {error} (attempt {attempt}/{sched.max_attempts}); retrying later")
+                return None
+            reason = error.reason
+            rec = fallback(row, reason)
+            stale = rec.stale
+            STATS.incr("retry.stale_fallbacks" if stale else "retry.final_failures")
+        done += 1
+        nulls = [c for c, v in zip(columns, rec.values) if v is None]
+        for c in nulls:
+            STATS.incr(f"null.{c}")
+        if len(nulls) == len(columns):
+            STATS.incr("detail.all_null")
+        STATS.incr("detail.funds")
+        log(f"[{done}/{feed.total if feed else len(fund_rows)}] {ticker}: "
+            + "  ".join(f"{label}={rec[c]}{unit}" for label, c, unit in profile.log_fields)
+            + (f"  [{reason}{', stale' if stale else ''}]" if reason else ""))
+        return rec
+
+    def restart():
+        log("Browser session lost; starting a new driver…")
+        if session is not None:
+            return session.restart()
+        close_driver(driver)
+        return make_driver(headless=headless, tag="details", tabs=tabs)
+
+    pool = None
+
+    try:
+        if tabs <= 1:
+            while True:
+                work = next_work() if breaker.allow(deadline) else None
+                if work is None:
+                    breaker.release()
+                    break
+                row, attempt = work
+                if attempt > 1:
+                    STATS.incr("retry.attempts")
+                limiter.acquire()
+                m, err = None, None
+                try:
+                    m = fetch_fund_metrics(driver, row.get("url", ""), limiter=limiter, profile=profile)
+                except FetchError as e:
+                    err = e
+                    if e.reason == "driver_crash":
+                        driver = restart()
+                rec = finish(row, attempt, m, err)
+                if rec is not None:
+                    yield rec
+        else:
+            # several pages loading at once, read in the order they finish
+            from selenium.common.exceptions import WebDriverException
+            pool = session.tab_pool() if session is not None else TabPool(driver, tabs)
+            while True:
+                try:
+                    # keep every tab busy with work that is due now (or wait for it when all are idle)
+                    while pool.idle():
+                        # while paused, keep reading the pages already in flight
+                        if pool.in_flight() and breaker.state != "closed":
+                            break
+                        if not breaker.allow(deadline):
+                            break
+                        work = next_work(busy=pool.in_flight() > 0)
+                        if work is None:
+                            breaker.release()
+                            break
+                        row, attempt = work
+                        if attempt > 1:
+                            STATS.incr("retry.attempts")
+                        if not row.get("url"):
+                            rec = finish(row, attempt, error=FetchError("no_url"))
+                            if rec is not None:
+                                yield rec
+                            continue
+                        limiter.acquire()
+                        pool.start(row["url"], (row, attempt))
+                    if not pool.in_flight():
+                        break
+                    for handle, (row, attempt), waited, state in pool.poll():
+                        m, err = None, None
+                        if state == "timeout":
+                            limiter.feedback(error=True)
+                            err = FetchError("timeout", f"no DOMContentLoaded after {waited:.0f}s")
+                        else:
+                            pool.switch(handle)
+                            try:
+                                m = read_loaded_page(driver, waited, limiter=limiter, profile=profile)
+                            except FetchError as e:
+                                err = e
+                        pool.release(handle)
+                        rec = finish(row, attempt, m, err)
+                        if rec is not None:
+                            yield rec
+                        if err is not None and err.reason == "driver_crash":
+                            raise WebDriverException("invalid session id")
+                except WebDriverException as e:
+                    # the tabs share one browser: when it goes, every page in flight goes with it
+                    reason = _classify_webdriver_error(e)
+                    for row, attempt in pool.items():
+                        rec = finish(row, attempt, error=FetchError(reason))
+                        if rec is not None:
+                            yield rec
+                    driver = restart()
+                    pool = session.tab_pool() if session is not None else TabPool(driver, tabs)
+        skipped = sched.drain()
+        if feed is not None:
+            skipped += feed.rest()
+        if skipped:
+            why = "circuit_open" if breaker.gave_up else "time_budget"
+            log(f"{'Site keeps refusing' if breaker.gave_up else 'Time budget reached'}; "
+                f"keeping previous values for {len(skipped)} funds.")
+            STATS.incr("breaker.skipped" if breaker.gave_up else "budget.skipped", len(skipped))
+            for row in skipped:
+                yield fallback(row, why)
     finally:
-        driver.quit()
-    return results
+        if session is None:
+            close_driver(driver, promote=True)
+        elif pool is not None and pool.in_flight():
+            session.close()     # left mid-flight: start the next call on a clean browser
+        s = limiter.summary()
+        log(f"Rate limiter: ended at {s['target_per_min']}/min "
+            f"(range {s['lowest_per_min']}–{s['highest_per_min']}, backoffs {s['backoffs']})")
+        STATS.incr("ratelimit.backoffs", s["backoffs"])
+        STATS.incr("retry.requeued", sched.retried)
+        STATS.incr("breaker.trips", breaker.trips)
+
+def scrape_details_for_funds(fund_rows, headless=True, max_per_min=40, limiter=None,
+                             previous=None, deadline=None, profile=FIXED_INCOME, tabs=1):
+    return list(iter_fund_metrics(fund_rows, headless=headless, max_per_min=max_per_min,
+                                  limiter=limiter, previous=previous, deadline=deadline,
+                                  profile=profile, tabs=tabs))
 
 # ----------------------- Save helpers -----------------------
-def choose_save_dir() -> pathlib.Path:
-    save_dir = PREFERRED_DIR
+def choose_save_dir(subdir="") -> pathlib.Path:
+    # subdir: per asset-class profile (fixed income writes to the data dir itself)
+    save_dir = PREFERRED_DIR / subdir
     try:
         save_dir.mkdir(parents=True, exist_ok=True)
         # quick write test to catch permission issues on CI
@@ -504,77 +1134,263 @@ def choose_save_dir() -> pathlib.Path:
         save_dir = pathlib.Path.cwd()
     return save_dir
 
-def prune_old_timestamped_files(dir_path: pathlib.Path, stem: str, keep: int = 5):
-    files = sorted(
-        dir_path.glob(f"{stem}_*.csv"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True
-    )
-    for old in files[keep:]:
-        try:
-            old.unlink()
-            print(f"Pruned old file: {old}")
-        except Exception as e:
-            print(f"Could not delete {old}: {e}")
-
-def write_csv(path: pathlib.Path, headers, rows_iterable):
+def write_csv(path: pathlib.Path, headers, rows_iterable, flush=False):
+    """Stream rows to CSV; flush=True pushes each row to disk as it arrives."""
+    n, spent = 0, 0.0   # time in the writer only, not in producing rows
     with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(headers)
         for row in rows_iterable:
+            t0 = time.perf_counter()
             w.writerow(row)
+            n += 1
+            if flush:
+                f.flush()
+            spent += time.perf_counter() - t0
+    STATS.add("csv.write", spent)
+    return n
+
+def stream_fund_list(profile, base_file, feed, funds, shard=None, headless=True):
+    """Listing side of a pipelined run: each fund goes onto `feed` and into the
+    base CSV as soon as it is read (all of them also appended to `funds`)."""
+    def rows():
+        for fund in iter_fund_list(profile, headless=headless):
+            funds.append(fund)
+            if shard is None or shard_of(fund["ticker"], shard[1]) == shard[0]:
+                feed.put(fund)
+            yield _base_csv_row(fund)
+    try:
+        write_csv(base_file, BASE_CSV_COLUMNS, rows(), flush=True)
+    except Exception as e:
+        log(f"Listing failed: {e}")
+        feed.close(e)
+    else:
+        feed.close()
+
+def metrics_dataframe(records, profile=FIXED_INCOME):
+    """DataFrame of scraped metrics (for interactive sessions); imports pandas."""
+    import pandas as pd
+    from normalize import normalize_frame
+    # Create DataFrame in the exact order requested (Convexity removed)
+    columns = [*profile.csv_columns, "Detail URL"]
+    df = pd.DataFrame(profile.schema.columns(records, columns), columns=columns)
+    # Typed float64 metric columns (NaN when missing)
+    return normalize_frame(df, profile.metric_columns)
+
+def _interactive_session():
+    # Spyder (%runfile), `python -i`, a REPL, or ISHARES_DATAFRAME=1
+    return (
+        hasattr(sys, "ps1") or bool(sys.flags.interactive)
+        or "spyder_kernels" in sys.modules
+        or os.getenv("ISHARES_DATAFRAME") == "1"
+    )
+
+def _parse_duration(text) -> float:
+    """Seconds from "2700", "45m", "1.5h" or "90s"."""
+    text = str(text).strip().lower()
+    mult = {"s": 1, "m": 60, "h": 3600}.get(text[-1:], None)
+    try:
+        return float(text[:-1]) * mult if mult else float(text)
+    except ValueError:
+        raise ValueError(f"not a duration: {text!r}") from None
+
+def _parse_args(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Scrape iShares fixed income funds and their metrics")
+    ap.add_argument("--time-budget", type=_parse_duration, default=os.getenv("ISHARES_TIME_BUDGET"),
+                    help="wall-clock budget for the whole run, e.g. 2700, 45m, 1h")
+    ap.add_argument("--budget-margin", type=_parse_duration, default="60s",
+                    help="stop starting detail pages this long before the budget ends")
+    ap.add_argument("--list-only", action="store_true", help="only scrape and save the fund list")
+    ap.add_argument("--base-csv", type=pathlib.Path,
+                    help="use this fund list instead of scraping the listing")
+    ap.add_argument("--shard", type=parse_shard_spec, metavar="INDEX/COUNT",
+                    help="scrape only this shard of the fund list, e.g. 0/4")
+    ap.add_argument("--run-id", help="run id for file names (default: from --base-csv, else now)")
+    ap.add_argument("--no-pipeline", dest="pipeline", action="store_false",
+                    default=os.getenv("ISHARES_PIPELINE", "1") != "0",
+                    help="read the whole listing before starting detail pages "
+                         "(default: start on each fund as soon as the listing yields it)")
+    ap.add_argument("--tabs", type=int, default=int(os.getenv("ISHARES_TABS", "1")),
+                    help="detail pages loading at once, as tabs of one Chrome (default 1)")
+    ap.add_argument("--browser", choices=("selenium", "cdp"), default=BROWSER_BACKEND,
+                    help="browser backend: chromedriver (default) or Chrome DevTools directly")
+    ap.add_argument("--chrome-profile", type=pathlib.Path, default=CHROME_PROFILE,
+                    help="reuse this Chrome profile between runs (consent, disk cache); copied per driver")
+    ap.add_argument("--reset-chrome-profile", action="store_true",
+                    help="delete the saved Chrome profile first")
+    ap.add_argument("--asset-class", type=get_profile, default=FIXED_INCOME, metavar="|".join(PROFILES),
+                    help="asset-class profile: listing filter + metric schema (default fixed_income)")
+    # parse_known_args: Spyder / `python -i` may pass their own arguments
+    args, _ = ap.parse_known_args(argv)   # string defaults go through type= too
+    return args
+
+def _refresh_report(records, budget_s=None):
+    """Which funds got fresh values this run and which kept previous ones."""
+    refreshed, stale, missing = [], [], []
+    for rec in records:
+        if not rec.reason:
+            refreshed.append(rec.ticker)
+        elif rec.stale:
+            stale.append(rec.ticker)
+        else:
+            missing.append(rec.ticker)
+    return {
+        "time_budget_s": budget_s,
+        "budget_exhausted": STATS.summary()["counters"].get("budget.skipped", 0) > 0,
+        "refreshed": refreshed,
+        "stale": stale,
+        "missing": missing,
+    }
 
 # ----------------------- Main (always details) -----------------------
 if __name__ == "__main__":
     headless = True  # flip to False for local debugging with a visible browser
+    args = _parse_args()
+    CHROME_PROFILE = args.chrome_profile
+    BROWSER_BACKEND = args.browser
+    if CHROME_PROFILE and args.reset_chrome_profile:
+        browser_profile.reset(CHROME_PROFILE)
+        print(f"Reset Chrome profile: {CHROME_PROFILE}")
+    # Budget counts from here; the detail phase stops dispatching at the deadline
+    deadline = None
+    if args.time_budget:
+        deadline = time.monotonic() + max(0.0, args.time_budget - args.budget_margin)
 
-    # 1) Scrape base list with URLs
-    funds = scrape_fixed_income_list(headless=headless)
-    print(f"Found {len(funds)} fixed income funds")
-    for r in funds[:10]:
-        print(f"{r['ticker']}\t{r['name']}  [{r.get('url','')}]")
-    if len(funds) > 10:
-        print(f"... ({len(funds)-10} more)")
-
-    # 2) Save base list CSV (in repo-local data/)
-    save_dir = choose_save_dir()
-    base_stem = "ishares_fixed_income"
-    prune_old_timestamped_files(save_dir, base_stem, keep=5)
-    base_file = save_dir / f"{base_stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    write_csv(
-        base_file,
-        headers=["Ticker", "Fund Name", "Detail URL"],
-        rows_iterable=((r["ticker"], r["name"], r.get("url","")) for r in funds)
-    )
-    print(f"Saved base list to: {base_file.resolve()}")
+    # Every run is tracked in data/runs_manifest.json (files, row counts, status).
+    # Shard workers may run side by side, so they leave the manifest to the merge
+    # step (sharding.py) and just name their files <name>.shard<i>of<n>.
+    profile = args.asset_class
+    save_dir = choose_save_dir(profile.subdir)
+    run_id = args.run_id or (run_id_from_path(args.base_csv) if args.base_csv else None)
+    suffix = shard_suffix(*args.shard) if args.shard else ""
+    if args.shard:
+        run = {"run_id": run_id or time.strftime("%Y%m%d_%H%M%S"), "files": {}, "rows": {}}
+    else:
+        run = run_manifest.start_run(save_dir, run_id)
+        run_manifest.prune_runs(save_dir, keep=5)
 
-    # 3) Always scrape details -> DataFrame `df` and CSV
-    metrics_rows = scrape_details_for_funds(funds, headless=headless, max_per_min=40)
+    def record(kind, path, rows=None):
+        if args.shard:
+            run["files"][kind] = pathlib.Path(path).name
+            if rows is not None:
+                run["rows"][kind] = rows
+        else:
+            run_manifest.record_file(save_dir, run, kind, path, rows=rows)
 
-    # Create DataFrame in the exact order requested (Convexity removed)
-    df = pd.DataFrame(metrics_rows, columns=[
-        "Ticker",
-        "Fund Name",
-        "Closing Price",
-        "Average Yield to Maturity",
-        "Weighted Avg Coupon",
-        "Effective Duration",
-        "Weighted Avg Maturity",
-        "Option Adjusted Spread",
-        "Detail URL",
-    ])
-
-    # Preview + shape
-    print(df.head(10).to_string(index=False))
-    print(f"DataFrame shape: {df.shape}")
-
-    # Save details CSV (keep only requested cols)
-    details_stem = "ishares_fixed_income_metrics"
-    details_file = save_dir / f"{details_stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    keep_cols = [
-        "Ticker","Fund Name","Closing Price","Average Yield to Maturity",
-        "Weighted Avg Coupon","Effective Duration","Weighted Avg Maturity",
-        "Option Adjusted Spread"
-    ]
-    df[keep_cols].to_csv(details_file, index=False)
-    print(f"Saved metrics to: {details_file.resolve()}")
+    # Per-phase timings/counters -> ishares_fixed_income_run_<run_id>.json
+    report_file = save_dir / f"{profile.stem}_run_{run['run_id']}{suffix}.json"
+    record("report", report_file)
+    # One adaptive limiter for every detail worker (floor/ceiling from env)
+    limiter = AdaptiveRateLimiter.from_env(start_per_min=40, log=log)
+    # ...and one circuit breaker: repeated walls / error pages pause them all
+    breaker = CircuitBreaker.from_env(log=log)
+    status = "failed"
+    refresh = None
+    health = None
+    listing = None
+    try:
+        prev_signatures = load_previous_signatures(save_dir)
+        base_file = save_dir / f"{profile.stem}_{run['run_id']}{suffix}.csv"
+        if args.base_csv:
+            # 1+2) Fund list from an earlier --list-only run (shared by all shards)
+            funds = load_fund_list(args.base_csv)
+            print(f"Loaded {len(funds)} funds from {args.base_csv}")
+        elif args.pipeline and not args.list_only:
+            # 1+2) Listing in its own thread, feeding the detail phase (and the
+            # base CSV) fund by fund; see pipeline.py
+            funds, feed = [], FundFeed()
+            listing = threading.Thread(target=stream_fund_list, name="listing", daemon=True,
+                                       args=(profile, base_file, feed, funds, args.shard, headless))
+            listing.start()
+        else:
+            # 1) Scrape base list with URLs
+            funds = scrape_fund_list(profile, headless=headless)
+            print(f"Found {len(funds)} {(profile.filter_label or 'iShares').lower()} funds")
+            for r in funds[:10]:
+                print(f"{r['ticker']}\t{r['name']}  [{r.get('url','')}]")
+            if len(funds) > 10:
+                print(f"... ({len(funds)-10} more)")
+
+            # 2) Save base list CSV (in repo-local data/)
+            write_csv(
+                base_file,
+                headers=BASE_CSV_COLUMNS,
+                rows_iterable=(_base_csv_row(r) for r in funds)
+            )
+            record("base", base_file, rows=len(funds))
+            print(f"Saved base list to: {base_file.resolve()}")
+        if args.list_only:
+            status = "listed"   # a fund list but no metrics yet: not the latest "ok" run
+        else:
+            if args.shard and listing is None:
+                funds = select_shard(funds, *args.shard)
+                print(f"Shard {args.shard[0]}/{args.shard[1]}: {len(funds)} funds")
+
+            # 3) Always scrape details, streaming each fund into the metrics CSV
+            details_stem = f"{profile.stem}_metrics"
+            details_file = save_dir / f"{details_stem}_{run['run_id']}{suffix}.csv"
+            want_df = _interactive_session()
+            # last good values, used (flagged Stale) for funds that keep failing or
+            # are not reached; the committed funds.json when data/ has no ok run
+            published = load_published_rows(profile)
+            previous = load_previous_snapshot(save_dir, profile.metric_columns, published)
+            if previous and not run_manifest.latest_file(save_dir, "metrics"):
+                print(f"No earlier run in {save_dir}; previous values from the published {profile.json_name}")
+            # biggest / stalest / changed funds first; funds streamed from the
+            # listing are queued by the same score as they arrive
+            if listing is None:
+                funds = order_by_priority(funds, previous, prev_signatures)
+            records = []    # FundMetrics per fund, for the refresh report (and `df`)
+
+            def _metrics_csv_rows():
+                for rec in iter_fund_metrics(feed if listing else funds, headless=headless, limiter=limiter,
+                                             previous=previous, deadline=deadline, profile=profile,
+                                             tabs=args.tabs, breaker=breaker,
+                                             priority=priority_key(previous, prev_signatures) if listing else None):
+                    records.append(rec)
+                    yield rec.csv_row()
+
+            n_rows = write_csv(details_file, profile.csv_columns, _metrics_csv_rows(), flush=True)
+            if listing is not None:
+                listing.join()
+                if feed.error is not None:
+                    raise feed.error
+                record("base", base_file, rows=len(funds))
+                print(f"Listed {len(funds)} {(profile.filter_label or 'iShares').lower()} funds; "
+                      f"saved base list to: {base_file.resolve()}")
+            record("metrics", details_file, rows=n_rows)
+            print(f"Saved metrics to: {details_file.resolve()}")
+            refresh = _refresh_report(records, budget_s=args.time_budget)
+            print(f"Refreshed {len(refresh['refreshed'])}/{len(records)} funds"
+                  + (f" (time budget reached; {len(refresh['stale'])} kept previous values)"
+                     if refresh["budget_exhausted"] else ""))
+
+            # DataFrame `df` only for interactive sessions (pandas stays off the nightly path)
+            if want_df:
+                df = metrics_dataframe(records, profile)
+                print(df.head(10).to_string(index=False))
+                print(f"DataFrame shape: {df.shape}")
+            status = "ok"
+
+            # Shards are checked once merged (sharding.py)
+            if not args.shard and health_gate.enabled():
+                health = health_gate.check(
+                    health_gate.csv_stats(details_file, profile.metric_columns),
+                    health_gate.previous_stats(run_manifest.latest_file(save_dir, "metrics"), published,
+                                               profile.metric_columns),
+                )
+                if not health["ok"]:
+                    status = "unhealthy"    # not latest_ok: the exporter keeps the previous snapshot
+                    print("WARNING: health gate failed (" + "; ".join(health["problems"])
+                          + "); previous snapshot stays published")
+    finally:
+        STATS.write(report_file, run_id=run["run_id"], status=status, rows=run["rows"],
+                    ratelimit=limiter.summary(), breaker=breaker.summary(), refresh=refresh, health=health,
+                    shard=args.shard, asset_class=profile.key, selectors=SELECTORS.summary(),
+                    identity=IDENTITY.summary())
+        SELECTORS.save()
+        IDENTITY.save()
+        if not args.shard:
+            run_manifest.finish_run(save_dir, run, status=status)
+        print(f"Saved run report to: {report_file.resolve()}")
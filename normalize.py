@@ -0,0 +1,55 @@
+# normalize.py
+# Vectorized number normalization shared by the scraper and the exporter.
+#
+# Instead of parsing one value at a time (str -> strip -> float in try/except),
+# a whole column goes through pandas' vectorized string ops once and comes back
+# as a float64 array plus a validity mask (True where the value parsed).
+#
+# Usage:
+#   values, valid = normalize_column(df["Effective Duration"])
+#   df = normalize_frame(df, METRIC_COLUMNS)   # float64 columns, NaN when missing
+
+import numpy as np
+import pandas as pd
+
+from ishares_extract import METRIC_COLUMNS
+
+__all__ = ["METRIC_COLUMNS", "normalize_column", "normalize_frame", "to_optional_floats"]
+
+# Leading "$", thousands separators, "%" and "bp"/"bps" units. A no-break
+# space becomes a plain space first, as in ishares_extract._parse_number
+# ("1\u00a0234" does not parse there either).
+_UNIT_RE = r"^\s*\$|[,%]|bps?\b"
+
+def normalize_column(values):
+    """Return (float64 ndarray, bool ndarray) for a column of raw values."""
+    s = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        out = s.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        # Plain numbers parse straight through; only the leftovers (units,
+        # "$", separators) pay for the string ops.
+        out = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        retry = np.isnan(out) & s.notna().to_numpy()
+        if retry.any():
+            cleaned = (
+                s[retry].astype("string")
+                 .str.replace("\u00a0", " ", regex=False)
+                 .str.replace(_UNIT_RE, "", regex=True)
+                 .str.strip()
+            )
+            out[retry] = pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return out, ~np.isnan(out)
+
+def normalize_frame(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Normalize the given columns of df in place to float64; returns df."""
+    for col in columns:
+        if col in df.columns:
+            df[col], _ = normalize_column(df[col])
+    return df
+
+def to_optional_floats(values, valid):
+    """float64 array + mask -> list of float/None (JSON-friendly)."""
+    obj = values.astype(object)
+    obj[~valid] = None
+    return obj.tolist()
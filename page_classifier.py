@@ -0,0 +1,73 @@
+# page_classifier.py
+# Says, right after navigation, whether a detail page is worth extracting.
+#
+# A bot challenge, consent gate or error page served with status 200 used to
+# go through the whole extraction (wait for body, three sleeps, every regex)
+# only to come back all-None. PROBE_JS collects status, title, final URL and
+# the start of the body text in one round trip, and classify_page() sorts
+# the page into:
+#   ok            looks like a product page (or too early to tell): extract
+#   bot_wall      challenge / access-denied interstitial
+#   consent_wall  cookie or site-entry gate in front of the page
+#   http_error    status >= 400
+#   error_page    error / not-found page, or redirected off the product pages
+# Text markers are only checked on short pages: a real detail page runs to
+# tens of KB and could mention "access denied" in a disclaimer.
+#
+#   status, title, url, text, n = driver.execute_script(PROBE_JS, 2000)
+#   kind, detail = classify_page(status, title, url, text, n)
+#
+# Standard library only.
+
+# arguments: how many characters of body text to return
+PROBE_JS = """
+const e = performance.getEntriesByType('navigation')[0];
+const text = document.body ? document.body.innerText || '' : '';
+return [e && e.responseStatus ? e.responseStatus : 0, document.title || '',
+        location.href, text.slice(0, arguments[0]), text.length];
+"""
+
+SHORT_PAGE_CHARS = 4000
+
+BOT_TITLE_MARKERS = ("access denied", "attention required", "just a moment",
+                     "are you a robot", "captcha", "too many requests",
+                     "pardon our interruption", "request rejected")
+BOT_TEXT_MARKERS = ("verify you are human", "checking your browser", "unusual traffic",
+                    "enable javascript and cookies to continue", "access denied",
+                    "request unsuccessful", "your support id is", "reference #")
+BOT_URL_MARKERS = ("captcha", "/cdn-cgi/challenge", "challenge-platform", "_incapsula_")
+
+CONSENT_URL_MARKERS = ("consent", "privacy-gateway", "site-entry")
+CONSENT_TEXT_MARKERS = ("before you continue", "please confirm your investor type",
+                        "select your investor type", "accept all cookies to continue")
+
+# (no bare status numbers: "iShares Core S&P 500 ETF")
+ERROR_TITLE_MARKERS = ("not found", "internal server error", "bad gateway", "gateway timeout",
+                       "service unavailable", "temporarily unavailable", "maintenance")
+ERROR_TEXT_MARKERS = ("page not found", "page you requested", "no longer available",
+                      "service unavailable", "temporarily unavailable", "something went wrong",
+                      "scheduled maintenance")
+
+def _has(haystack, markers):
+    return next((m for m in markers if m in haystack), None)
+
+def classify_page(status, title, url, text, text_len=None, expect_path="/products/"):
+    """(kind, detail) for a freshly loaded page; see the module comment for kinds."""
+    title = (title or "").lower()
+    url = (url or "").lower()
+    text = (text or "").lower()
+    short = (len(text) if text_len is None else text_len) < SHORT_PAGE_CHARS
+
+    m = _has(title, BOT_TITLE_MARKERS) or _has(url, BOT_URL_MARKERS)
+    if m or (short and _has(text, BOT_TEXT_MARKERS)):
+        return "bot_wall", m or _has(text, BOT_TEXT_MARKERS)
+    if status and status >= 400:
+        return "http_error", str(status)
+    m = _has(url, CONSENT_URL_MARKERS)
+    if m or (short and _has(text, CONSENT_TEXT_MARKERS)):
+        return "consent_wall", m or _has(text, CONSENT_TEXT_MARKERS)
+    if expect_path and url.startswith("http") and expect_path not in url:
+        return "error_page", f"redirected to {url}"
+    if short and text and (_has(title, ERROR_TITLE_MARKERS) or _has(text, ERROR_TEXT_MARKERS)):
+        return "error_page", _has(title, ERROR_TITLE_MARKERS) or _has(text, ERROR_TEXT_MARKERS)
+    return "ok", ""
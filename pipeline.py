@@ -0,0 +1,69 @@
+# pipeline.py
+# Hand-off queue between the listing and the detail phase.
+#
+# Without it the run is strictly sequential: read the whole listing, write
+# the base CSV, then start on detail pages. With a FundFeed the listing runs
+# in its own thread (own Chrome) and puts each fund on the feed as soon as
+# its row is read; iter_fund_metrics takes the feed instead of a list and
+# starts on the first fund seconds after the listing has loaded, topping up
+# its work queue as more funds arrive. The base CSV is written row by row
+# by the same listing thread.
+#
+#   feed = FundFeed()
+#   # listing thread: for fund in iter_fund_list(...): feed.put(fund)
+#   #                 then feed.close()  (or feed.close(error))
+#   for rec in iter_fund_metrics(feed, ...): ...
+#
+# Funds come out in listing order (by net assets); iter_fund_metrics queues
+# them by scheduling.priority_key as they arrive, so once the listing is done
+# (minutes into a run) the rest of the queue is in priority order and a time
+# budget still drops the least important funds.
+
+import queue
+
+_END = object()
+
+class FundFeed:
+    def __init__(self):
+        self._q = queue.Queue()
+        self._closed = False        # consumer side: end marker seen
+        self.total = 0              # funds put so far
+        self.error = None           # exception that ended the listing, if any
+
+    def put(self, fund):
+        self.total += 1
+        self._q.put(fund)
+
+    def close(self, error=None):
+        """Producer is done (error: what stopped it early)."""
+        self.error = error
+        self._q.put(_END)
+
+    @property
+    def done(self):
+        """True once every fund has been taken and the producer has closed."""
+        return self._closed
+
+    def take(self, timeout=0):
+        """Funds that have arrived. timeout=0: don't wait; None: wait for one (or the end)."""
+        out = []
+        if self._closed:
+            return out
+        try:
+            item = self._q.get(block=timeout != 0, timeout=timeout or None)
+            while True:
+                if item is _END:
+                    self._closed = True
+                    break
+                out.append(item)
+                item = self._q.get_nowait()
+        except queue.Empty:
+            pass
+        return out
+
+    def rest(self):
+        """Wait for the producer to finish; every fund not taken yet."""
+        out = []
+        while not self._closed:
+            out += self.take(timeout=None)
+        return out
@@ -0,0 +1,135 @@
+# rate_limit.py
+# Adaptive (AIMD) request pacing shared by every detail-page worker.
+#
+# The target rate grows additively while pages load cleanly (about
+# `increase_per_min` more requests/min per minute of clean traffic) and is cut
+# multiplicatively on 429/503 responses, bot-challenge pages, errors or slow
+# loads, always staying between the floor and ceiling. acquire() hands out
+# evenly spaced slots at the current rate, so parallel workers stay polite as
+# a group rather than each pacing itself.
+#
+#   limiter = AdaptiveRateLimiter.from_env(start_per_min=40)
+#   limiter.acquire()
+#   ... driver.get(url) ...
+#   limiter.feedback(latency=dt, status=200)
+#   limiter.feedback(status=429, retry_after=parse_retry_after(header))
+#
+# A Retry-After on a throttled response holds every worker off for that long
+# (capped at MAX_RETRY_AFTER_S so one header cannot eat a time budget).
+# By default the rate starts at the old fixed 40/min and moves between 10
+# and 60/min: at most 1.5x the old pace when the site keeps up, down to a
+# quarter of it under throttling.
+#
+# Config (env): ISHARES_MIN_PER_MIN (floor, default 10),
+#               ISHARES_MAX_PER_MIN (ceiling, default 60)
+
+import os, threading, time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+THROTTLE_STATUSES = {429, 503}
+MAX_RETRY_AFTER_S = 300.0
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if when is None:
+            return None
+        secs = when.timestamp() - (time.time() if now is None else now)
+    return min(max(secs, 0.0), MAX_RETRY_AFTER_S)
+
+class AdaptiveRateLimiter:
+    def __init__(self, start_per_min=40.0, min_per_min=10.0, max_per_min=60.0,
+                 increase_per_min=4.0, decrease_factor=0.5, slow_factor=0.8,
+                 slow_secs=8.0, log=None, log_every_s=60.0):
+        self.min_per_min = float(min_per_min)
+        self.max_per_min = float(max(max_per_min, min_per_min))
+        self.rate = min(self.max_per_min, max(self.min_per_min, float(start_per_min)))
+        self.increase_per_min = increase_per_min
+        self.decrease_factor = decrease_factor
+        self.slow_factor = slow_factor
+        self.slow_secs = slow_secs
+        self.log = log
+        self.log_every_s = log_every_s
+        self.backoffs = 0
+        self.lowest = self.highest = self.rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._done = deque()                 # completion times, last 60s
+        self._last_log = time.monotonic()
+
+    @classmethod
+    def from_env(cls, start_per_min=40.0, **kwargs):
+        return cls(
+            start_per_min=start_per_min,
+            min_per_min=float(os.getenv("ISHARES_MIN_PER_MIN", "10")),
+            max_per_min=float(os.getenv("ISHARES_MAX_PER_MIN", "60")),
+            **kwargs,
+        )
+
+    def acquire(self):
+        """Block until this caller's slot at the current target rate."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 60.0 / self.rate
+        wait = slot - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def feedback(self, latency=None, status=None, blocked=False, error=False, retry_after=None):
+        """Report how the last request went; adjusts the shared target rate."""
+        with self._lock:
+            now = time.monotonic()
+            self._done.append(now)
+            if blocked or error or status in THROTTLE_STATUSES:
+                self._set_rate(self.rate * self.decrease_factor)
+                self.backoffs += 1
+                # push everyone's next slot out by one interval (or Retry-After)
+                pause = min(retry_after, MAX_RETRY_AFTER_S) if retry_after else 60.0 / self.rate
+                self._next_slot = max(self._next_slot, now + pause)
+            elif latency is not None and latency > self.slow_secs:
+                self._set_rate(self.rate * self.slow_factor)
+                self.backoffs += 1
+            else:
+                # +increase_per_min over roughly one minute of clean responses
+                self._set_rate(self.rate + self.increase_per_min / self.rate)
+            self._maybe_log(now)
+
+    def _set_rate(self, r):
+        self.rate = min(self.max_per_min, max(self.min_per_min, r))
+        self.lowest = min(self.lowest, self.rate)
+        self.highest = max(self.highest, self.rate)
+
+    def effective_per_min(self, now=None):
+        """Completed requests over the last minute."""
+        now = now or time.monotonic()
+        while self._done and now - self._done[0] > 60.0:
+            self._done.popleft()
+        return float(len(self._done))
+
+    def _maybe_log(self, now):
+        if self.log and now - self._last_log >= self.log_every_s:
+            self._last_log = now
+            self.log(f"Rate limiter: target {self.rate:.1f}/min, "
+                     f"effective {self.effective_per_min(now):.0f}/min, backoffs {self.backoffs}")
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "target_per_min": round(self.rate, 2),
+                "lowest_per_min": round(self.lowest, 2),
+                "highest_per_min": round(self.highest, 2),
+                "floor_per_min": self.min_per_min,
+                "ceiling_per_min": self.max_per_min,
+                "backoffs": self.backoffs,
+            }
@@ -0,0 +1,363 @@
+# refresh_daemon.py
+# Service mode: Chrome kept warm, funds refreshed on a schedule, status over HTTP.
+#
+# The nightly workflow cold-starts Python, Chrome and chromedriver every day.
+# For a deployment of our own this process stays up instead:
+#   - one BrowserSession for the listing and one for detail pages stay open
+#     between refreshes (a lost browser is replaced on its next use);
+#   - jobs run on their own interval:
+#       prices  (default every 30m) re-reads the detail pages of the last fund
+#               list for the Closing Price only (no other regexes, no late-
+#               metric re-reads); the other metrics keep their values from
+#               the last snapshot
+#       full    (default every 24h) re-reads the listing and every metric,
+#               like the nightly run; it also counts as a prices refresh
+#     each job gets 90% of its interval as its time budget;
+#   - every job is a normal run: run manifest, fund list and metrics CSVs
+#     (each written to a .tmp file, then os.replace), health gate, run
+#     report. An ok run is exported to funds.json right away
+#     (batch_export_json.write_if_changed, atomic);
+#   - a small HTTP server on localhost answers
+#       GET /status    JSON: jobs (last run, next due), current job and queue
+#                      depth, per-phase latency, rate limiter, browsers
+#       GET /metrics   the same numbers in Prometheus text format
+#       GET /healthz   200 while the last run of every job was ok, else 503
+#
+# Usage:
+#   python refresh_daemon.py --port 8787 --prices-every 30m --full-every 24h --tabs 4
+#   curl -s localhost:8787/status
+#   # against the local mock site (benchmarks/mock_ishares.py), every job once:
+#   python refresh_daemon.py --mock 120 --once
+#
+# Config (env): ISHARES_DAEMON_PORT, ISHARES_PRICES_EVERY, ISHARES_FULL_EVERY
+# (plus the scraper's ISHARES_* settings).
+
+import argparse, json, os, pathlib, signal, sys, threading, time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ishares_fixed_income_scraper as scraper
+import batch_export_json
+import health_gate
+import run_manifest
+from asset_profiles import PROFILES, get_profile
+from circuit_breaker import CircuitBreaker
+from rate_limit import AdaptiveRateLimiter
+from run_report import STATS
+from scheduling import order_by_priority
+
+log = scraper.log
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class Job:
+    def __init__(self, name, every_s, columns=None, relist=False):
+        self.name = name
+        self.every_s = every_s
+        self.columns = columns          # metrics this job refreshes (None = all)
+        self.relist = relist            # read the listing again first
+        self.next_due = 0.0             # time.monotonic(); 0 = at startup
+        self.last = None                # summary of the last run
+
+class RefreshDaemon:
+    def __init__(self, profile, jobs, headless=True, tabs=1, out_path=None):
+        self.profile = profile
+        self.jobs = jobs
+        self.headless = headless
+        self.tabs = tabs
+        self.save_dir = scraper.choose_save_dir(profile.subdir)
+        self.out_path = pathlib.Path(out_path) if out_path else batch_export_json.OUT_PATH.with_name(profile.json_name)
+        self.listing = scraper.BrowserSession(headless, tag="listing")
+        self.details = scraper.BrowserSession(headless, tag="details", tabs=tabs)
+        self.limiter = AdaptiveRateLimiter.from_env(start_per_min=40, log=log)
+        self.started_at = _now()
+        self.t0 = time.monotonic()
+        self.current = None             # job in progress: name, run_id, queue counts
+        self._stop = threading.Event()
+
+    # --- scheduling ---
+    def stop(self):
+        self._stop.set()
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            # full before prices when both are due
+            job = min(self.jobs, key=lambda j: (j.next_due, j.columns is not None))
+            wait = job.next_due - time.monotonic()
+            if wait > 0:
+                self._stop.wait(min(wait, 60))
+                continue
+            self.run_once(job)
+
+    def run_once(self, job):
+        started = time.monotonic()
+        self.run_job(job)
+        job.next_due = started + job.every_s
+        if job.columns is None:
+            # a full refresh has new prices too
+            for other in self.jobs:
+                if other is not job:
+                    other.next_due = max(other.next_due, time.monotonic() + other.every_s)
+
+    # --- one refresh ---
+    def _fund_list(self, job, run, base_file):
+        base = run_manifest.latest_file(self.save_dir, "base")
+        if job.relist or base is None:
+            funds = scraper.scrape_fund_list(self.profile, headless=self.headless, session=self.listing)
+        else:
+            funds = scraper.load_fund_list(base)
+        # every run keeps its own copy: pruning an old run must not take this one's list
+        tmp = base_file.with_suffix(".csv.tmp")
+        scraper.write_csv(tmp, scraper.BASE_CSV_COLUMNS, (scraper._base_csv_row(f) for f in funds))
+        os.replace(tmp, base_file)
+        run_manifest.record_file(self.save_dir, run, "base", base_file, rows=len(funds))
+        return funds
+
+    def _new_run_id(self):
+        # run ids are per second; two quick jobs must not share one
+        taken = {r["run_id"] for r in run_manifest.load(self.save_dir)["runs"]}
+        while True:
+            run_id = time.strftime("%Y%m%d_%H%M%S")
+            if run_id not in taken:
+                return run_id
+            time.sleep(0.2)
+
+    def run_job(self, job):
+        profile = self.profile
+        STATS.reset()
+        run = run_manifest.start_run(self.save_dir, self._new_run_id())
+        run_manifest.prune_runs(self.save_dir, keep=5)
+        run_id = run["run_id"]
+        report_file = self.save_dir / f"{profile.stem}_run_{run_id}.json"
+        run_manifest.record_file(self.save_dir, run, "report", report_file)
+        self.current = {"job": job.name, "run_id": run_id, "started_at": _now(), "queue_total": None, "done": 0}
+        log(f"[{job.name}] run {run_id} starting")
+        deadline = time.monotonic() + 0.9 * job.every_s
+        breaker = CircuitBreaker.from_env(log=log)
+        status, error, refresh, health, exported = "failed", None, None, None, None
+        t0 = time.monotonic()
+        try:
+            prev_signatures = scraper.load_previous_signatures(self.save_dir)
+            published = batch_export_json.load_published(self.out_path)
+            previous = scraper.load_previous_snapshot(self.save_dir, profile.metric_columns, published)
+            base_file = self.save_dir / f"{profile.stem}_{run_id}.csv"
+            funds = order_by_priority(self._fund_list(job, run, base_file), previous, prev_signatures)
+            self.current["queue_total"] = len(funds)
+
+            # a partial job reads only its columns; the rest come from the last snapshot
+            scrape_profile = profile if job.columns is None else profile.subset(job.columns)
+            records = []
+
+            def rows():
+                for rec in scraper.iter_fund_metrics(funds, headless=self.headless, limiter=self.limiter,
+                                                     previous=previous, deadline=deadline, profile=scrape_profile,
+                                                     breaker=breaker, session=self.details):
+                    if scrape_profile is not profile:
+                        # As Of stays at the last full refresh: only some columns are new
+                        prev = previous.get(rec.ticker, {})
+                        rec = profile.schema.from_mapping(
+                            rec.ticker, rec.name, {**prev, **rec.metrics},
+                            stale=rec.stale, reason=rec.reason, as_of=prev.get("As Of") or "", url=rec.url)
+                    records.append(rec)
+                    self.current["done"] += 1
+                    yield rec.csv_row()
+
+            details_file = self.save_dir / f"{profile.stem}_metrics_{run_id}.csv"
+            tmp = details_file.with_suffix(".csv.tmp")
+            n_rows = scraper.write_csv(tmp, profile.csv_columns, rows())
+            os.replace(tmp, details_file)
+            run_manifest.record_file(self.save_dir, run, "metrics", details_file, rows=n_rows)
+            refresh = scraper._refresh_report(records, budget_s=0.9 * job.every_s)
+
+            status = "ok"
+            if health_gate.enabled():
+                health = health_gate.check(
+                    health_gate.csv_stats(details_file, profile.metric_columns),
+                    health_gate.previous_stats(run_manifest.latest_file(self.save_dir, "metrics"),
+                                               published, profile.metric_columns),
+                )
+                if not health["ok"]:
+                    status = "unhealthy"
+                    log(f"[{job.name}] health gate failed: " + "; ".join(health["problems"]))
+            if status == "ok":
+                with STATS.phase("export"):
+                    data = batch_export_json.convert(details_file, profile.metric_columns)
+                    exported = batch_export_json.write_if_changed(
+                        batch_export_json.canonical_json(data), details_file, self.out_path,
+                        self.save_dir / "export_manifest.json")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            log(f"[{job.name}] run {run_id} failed: {error}")
+            # a browser in an unknown state is not worth keeping warm
+            self.listing.close()
+            self.details.close()
+        finally:
+            STATS.write(report_file, run_id=run_id, status=status, job=job.name, rows=run["rows"],
+                        ratelimit=self.limiter.summary(), breaker=breaker.summary(), refresh=refresh,
+                        health=health, asset_class=profile.key, selectors=scraper.SELECTORS.summary(),
+                        identity=scraper.IDENTITY.summary())
+            scraper.SELECTORS.save()
+            scraper.IDENTITY.save()
+            run_manifest.finish_run(self.save_dir, run, status=status)
+            job.last = {
+                "run_id": run_id,
+                "status": status,
+                "started_at": self.current["started_at"],
+                "finished_at": _now(),
+                "seconds": round(time.monotonic() - t0, 1),
+                "rows": run["rows"].get("metrics"),
+                "refreshed": len(refresh["refreshed"]) if refresh else None,
+                "stale": len(refresh["stale"]) if refresh else None,
+                "health_problems": health["problems"] if health else None,
+                "exported": exported,
+                "error": error,
+                "finished_ts": time.time(),
+            }
+            self.current = None
+            log(f"[{job.name}] run {run_id} {status} in {job.last['seconds']}s"
+                + (f"; funds.json {'updated' if exported else 'unchanged'}" if status == "ok" else ""))
+
+    def close(self):
+        self.listing.close(promote=True)
+        self.details.close(promote=True)
+
+    # --- status ---
+    def status(self) -> dict:
+        now = time.monotonic()
+        cur = self.current          # run_job clears it from another thread: read it once
+        cur = dict(cur) if cur else None
+        if cur and cur["queue_total"] is not None:
+            cur["queue_depth"] = max(0, cur["queue_total"] - cur["done"])
+        summary = STATS.summary()
+        return {
+            "started_at": self.started_at,
+            "uptime_s": round(now - self.t0, 1),
+            "asset_class": self.profile.key,
+            "state": f"running {cur['job']}" if cur else "idle",
+            "current": cur,
+            "jobs": {
+                j.name: {
+                    "every_s": j.every_s,
+                    "columns": j.columns,
+                    "next_due_in_s": round(max(0.0, j.next_due - now), 1),
+                    "last": j.last,
+                }
+                for j in self.jobs
+            },
+            "phases": summary["phases"],
+            "counters": summary["counters"],
+            "ratelimit": self.limiter.summary(),
+            "browsers": {"listing_starts": self.listing.starts, "details_starts": self.details.starts},
+        }
+
+    def healthy(self) -> bool:
+        return all(j.last is None or j.last["status"] == "ok" for j in self.jobs)
+
+    def metrics_text(self) -> str:
+        st = self.status()
+        lines = [f"ishares_daemon_uptime_seconds {st['uptime_s']}"]
+        cur = st["current"] or {}
+        lines.append(f"ishares_queue_depth {cur.get('queue_depth') or 0}")
+        for name, j in st["jobs"].items():
+            last = j["last"] or {}
+            lines.append(f'ishares_job_next_due_seconds{{job="{name}"}} {j["next_due_in_s"]}')
+            if last:
+                lines.append(f'ishares_job_last_ok{{job="{name}"}} {int(last["status"] == "ok")}')
+                lines.append(f'ishares_job_last_duration_seconds{{job="{name}"}} {last["seconds"]}')
+                lines.append(f'ishares_job_last_finished_timestamp{{job="{name}"}} {last["finished_ts"]:.0f}')
+                lines.append(f'ishares_job_last_rows{{job="{name}"}} {last["rows"] or 0}')
+        for phase, p in st["phases"].items():
+            for key in ("count", "p50_s", "p95_s"):
+                metric = "count" if key == "count" else f"{key[:-2]}_seconds"
+                lines.append(f'ishares_phase_{metric}{{phase="{phase}"}} {p[key]}')
+        lines.append(f"ishares_ratelimit_target_per_min {st['ratelimit']['target_per_min']}")
+        return "\n".join(lines) + "\n"
+
+def start_status_server(daemon, host="127.0.0.1", port=8787):
+    """Serve /status, /metrics and /healthz in a daemon thread; returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path in ("/", "/status"):
+                code, ctype, body = 200, "application/json", json.dumps(daemon.status(), indent=2)
+            elif path == "/metrics":
+                code, ctype, body = 200, "text/plain; version=0.0.4", daemon.metrics_text()
+            elif path == "/healthz":
+                ok = daemon.healthy()
+                code, ctype, body = (200 if ok else 503), "text/plain", "ok\n" if ok else "unhealthy\n"
+            else:
+                code, ctype, body = 404, "text/plain", "not found\n"
+            data = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="status", daemon=True).start()
+    return server
+
+def _parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Keep Chrome warm and refresh funds on a schedule")
+    ap.add_argument("--asset-class", type=get_profile, default="fixed_income", metavar="|".join(PROFILES))
+    ap.add_argument("--prices-every", type=scraper._parse_duration,
+                    default=os.getenv("ISHARES_PRICES_EVERY", "30m"), help="e.g. 15m (0 = off)")
+    ap.add_argument("--full-every", type=scraper._parse_duration,
+                    default=os.getenv("ISHARES_FULL_EVERY", "24h"), help="e.g. 24h")
+    ap.add_argument("--tabs", type=int, default=int(os.getenv("ISHARES_TABS", "1")))
+    ap.add_argument("--host", default="127.0.0.1", help="status server address")
+    ap.add_argument("--port", type=int, default=int(os.getenv("ISHARES_DAEMON_PORT", "8787")),
+                    help="status server port (0 = any free port)")
+    ap.add_argument("--out", type=pathlib.Path, help="funds.json to keep current (default public/<profile json>)")
+    ap.add_argument("--once", action="store_true", help="run every job once (full first), then exit")
+    ap.add_argument("--mock", type=int, metavar="FUNDS",
+                    help="serve a local mock site with this many funds and scrape that")
+    ap.add_argument("--browser", choices=("selenium", "cdp"), default=scraper.BROWSER_BACKEND)
+    ap.add_argument("--chrome-profile", type=pathlib.Path, default=scraper.CHROME_PROFILE,
+                    help="persistent Chrome profile (browser_profile.py)")
+    ap.add_argument("--headed", action="store_true")
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.mock:
+        sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent / "benchmarks"))
+        import mock_ishares
+        mock, base = mock_ishares.start_server(mock_ishares.synthesize_funds(args.mock))
+        mock_ishares.point_scraper_at(base)
+        log(f"Mock site at {base}")
+
+    scraper.BROWSER_BACKEND = args.browser
+    scraper.CHROME_PROFILE = args.chrome_profile
+    profile = args.asset_class
+    jobs = [Job("full", args.full_every, relist=True)]
+    if args.prices_every:
+        jobs.append(Job("prices", args.prices_every, columns=["Closing Price"]))
+    daemon = RefreshDaemon(profile, jobs, headless=not args.headed, tabs=args.tabs, out_path=args.out)
+    server = start_status_server(daemon, args.host, args.port)
+    log(f"Status at http://{args.host}:{server.server_address[1]}/status")
+    try:
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    except (ValueError, AttributeError):
+        pass
+    try:
+        if args.once:
+            for job in jobs:
+                daemon.run_once(job)
+        else:
+            daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        server.shutdown()
+    return 0 if daemon.healthy() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# retry_queue.py
+# Work queue for the detail phase with deferred, backed-off retries.
+#
+# Items are handed out in their original order first (or highest priority(item)
+# first, ties in arrival order, when a priority function is given; items
+# added later are slotted in by it too). A failed item goes to a
+# deferred queue and comes back only after the first pass, once its backoff has
+# elapsed (exponential, capped, with jitter), so a transient timeout on one
+# fund does not stall the rest of the run. After max_attempts the item is
+# given up and its last failure reason is kept in `final_failures`.
+# With a `deadline` (clock() value), iteration stops early once it has passed,
+# or when the next retry would only be ready after it; drain() then returns
+# whatever was left. add() queues items that arrive while iterating (e.g.
+# funds streamed from the listing).
+#
+#   sched = RetryScheduler(funds, key=lambda r: r["ticker"], max_attempts=3)
+#   for row, attempt in sched:
+#       try:
+#           ...
+#           sched.succeeded(row)
+#       except FetchError as e:
+#           if sched.failed(row, e.reason):   # True -> no attempts left
+#               ...
+
+import heapq, itertools, random, time
+
+class RetryScheduler:
+    def __init__(self, items, key, max_attempts=3, base_delay=5.0, max_delay=120.0,
+                 jitter=0.5, rng=None, clock=time.monotonic, sleep=time.sleep, deadline=None,
+                 priority=None):
+        self._pending = []                      # heap of (-priority, seq, item)
+        self._deferred = []                     # heap of (ready_at, seq, item)
+        self._seq = itertools.count()
+        self.priority = priority
+        self.key = key
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._sleep = sleep
+        self.deadline = deadline
+        self.attempts = {}                      # key -> attempts started
+        self.reasons = {}                       # key -> [reason, ...]
+        self.final_failures = {}                # key -> last reason
+        self.retried = 0
+        for item in items:
+            self.add(item)
+
+    def __iter__(self):
+        return self
+
+    def expired(self) -> bool:
+        return self.deadline is not None and self._clock() >= self.deadline
+
+    def time_left(self):
+        """Seconds until the deadline (0 once past), or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self._clock())
+
+    def __next__(self):
+        if self.expired():
+            raise StopIteration
+        if self._pending:
+            item = heapq.heappop(self._pending)[2]
+        elif self._deferred:
+            if self.deadline is not None and self._deferred[0][0] >= self.deadline:
+                raise StopIteration
+            ready_at, _, item = heapq.heappop(self._deferred)
+            wait = ready_at - self._clock()
+            if wait > 0:
+                self._sleep(wait)
+        else:
+            raise StopIteration
+        k = self.key(item)
+        self.attempts[k] = self.attempts.get(k, 0) + 1
+        return item, self.attempts[k]
+
+    def add(self, item):
+        """Queue one more item (work arriving while iterating): behind the pending
+        ones, or among them by priority."""
+        rank = -self.priority(item) if self.priority else 0
+        heapq.heappush(self._pending, (rank, next(self._seq), item))
+
+    def ready_in(self):
+        """Seconds until next() has an item without sleeping (0 = now); None when empty."""
+        if self._pending:
+            return 0.0
+        if self._deferred:
+            return max(0.0, self._deferred[0][0] - self._clock())
+        return None
+
+    def backoff(self, attempt):
+        """Delay before retry number `attempt` (1 = first retry)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    def succeeded(self, item):
+        self.final_failures.pop(self.key(item), None)
+
+    def failed(self, item, reason, retry=True) -> bool:
+        """Record a failure; re-queue unless out of attempts (or retry=False).
+
+        Returns True when the failure is final.
+        """
+        k = self.key(item)
+        self.reasons.setdefault(k, []).append(reason)
+        n = self.attempts.get(k, 1)
+        if not retry or n >= self.max_attempts:
+            self.final_failures[k] = reason
+            return True
+        self.retried += 1
+        ready_at = self._clock() + self.backoff(n)
+        heapq.heappush(self._deferred, (ready_at, next(self._seq), item))
+        return False
+
+    def drain(self):
+        """Remove and return every item not yet handed out (pending, then deferred)."""
+        items = [item for _, _, item in sorted(self._pending)] + [item for _, _, item in sorted(self._deferred)]
+        self._pending, self._deferred = [], []
+        return items
+
+    def remaining(self):
+        return len(self._pending) + len(self._deferred)
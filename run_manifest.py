@@ -0,0 +1,111 @@
+# run_manifest.py
+# Small JSON manifest of scraper runs, kept next to the CSVs (data/runs_manifest.json).
+#
+# Each run records its id, timestamps, status and the files it wrote (with row
+# counts). "latest_ok" points at the newest successful run, so the exporter
+# finds the latest snapshot without globbing or stat-ing the directory, and
+# pruning deletes whole runs in manifest order instead of sorting by mtime.
+#
+#   run = start_run(save_dir)
+#   record_file(save_dir, run, "metrics", path, rows=len(rows))
+#   finish_run(save_dir, run, status="ok")
+#   latest_file(save_dir, "metrics")   # -> pathlib.Path or None
+
+import json, os, pathlib
+from datetime import datetime, timezone
+
+MANIFEST_NAME = "runs_manifest.json"
+
+def manifest_path(dir_path: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(dir_path) / MANIFEST_NAME
+
+def load(dir_path: pathlib.Path) -> dict:
+    try:
+        m = json.loads(manifest_path(dir_path).read_text(encoding="utf-8"))
+    except Exception:
+        m = {}
+    m.setdefault("latest_ok", None)
+    m.setdefault("runs", [])
+    return m
+
+def save(dir_path: pathlib.Path, m: dict):
+    p = manifest_path(dir_path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(m, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _update(dir_path, run):
+    m = load(dir_path)
+    m["runs"] = [r for r in m["runs"] if r["run_id"] != run["run_id"]] + [run]
+    if run["status"] == "ok":
+        m["latest_ok"] = run["run_id"]
+    save(dir_path, m)
+
+def start_run(dir_path: pathlib.Path, run_id: str = None) -> dict:
+    run = {
+        "run_id": run_id or datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "started_at": _now(),
+        "finished_at": None,
+        "status": "running",
+        "files": {},
+        "rows": {},
+    }
+    _update(dir_path, run)
+    return run
+
+def record_file(dir_path: pathlib.Path, run: dict, kind: str, path: pathlib.Path, rows: int = None):
+    # Stored relative to the manifest so the data dir can move (CI workspaces)
+    path = pathlib.Path(path)
+    try:
+        rel = path.resolve().relative_to(pathlib.Path(dir_path).resolve())
+    except ValueError:
+        rel = path
+    run["files"][kind] = rel.as_posix()
+    if rows is not None:
+        run["rows"][kind] = rows
+    _update(dir_path, run)
+
+def finish_run(dir_path: pathlib.Path, run: dict, status: str = "ok"):
+    run["status"] = status
+    run["finished_at"] = _now()
+    _update(dir_path, run)
+
+def latest_ok(dir_path: pathlib.Path):
+    m = load(dir_path)
+    want = m["latest_ok"]
+    for r in reversed(m["runs"]):
+        if r["run_id"] == want:
+            return r
+    return None
+
+def run_file(dir_path: pathlib.Path, run: dict, kind: str):
+    if not run or kind not in run["files"]:
+        return None
+    p = pathlib.Path(dir_path) / run["files"][kind]
+    return p if p.exists() else None
+
+def latest_file(dir_path: pathlib.Path, kind: str):
+    return run_file(dir_path, latest_ok(dir_path), kind)
+
+def prune_runs(dir_path: pathlib.Path, keep: int = 5):
+    """Delete files of all but the newest `keep` runs (never the latest ok run)."""
+    m = load(dir_path)
+    keep_ids = {r["run_id"] for r in m["runs"][-keep:]} | {m["latest_ok"]}
+    kept = []
+    for r in m["runs"]:
+        if r["run_id"] in keep_ids:
+            kept.append(r)
+            continue
+        for rel in r["files"].values():
+            old = pathlib.Path(dir_path) / rel
+            try:
+                old.unlink(missing_ok=True)
+                print(f"Pruned old file: {old}")
+            except Exception as e:
+                print(f"Could not delete {old}: {e}")
+    m["runs"] = kept
+    save(dir_path, m)
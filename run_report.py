@@ -0,0 +1,88 @@
+# run_report.py
+# Per-phase timing and counters for a scraper run, written as JSON next to the CSVs.
+#
+#   from run_report import STATS
+#   with STATS.phase("detail.get"):
+#       driver.get(url)
+#   STATS.incr("detail.body_rereads")
+#   STATS.write(save_dir / f"ishares_fixed_income_run_{run_id}.json", run_id=run_id)
+#
+# Each phase keeps every duration, so the report can give count/total/p50/p95/max.
+# Stdlib only and thread-safe (detail workers share the process-wide STATS).
+
+import json, math, os, pathlib, threading, time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+def percentile(sorted_vals, q):
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+class RunStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.t_start = time.time()
+            self.phases = defaultdict(list)
+            self.counters = Counter()
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.phases[name].append(seconds)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def summary(self) -> dict:
+        with self._lock:
+            phases = {k: sorted(v) for k, v in self.phases.items()}
+            counters = dict(self.counters)
+        out = {}
+        for name, vals in sorted(phases.items()):
+            out[name] = {
+                "count": len(vals),
+                "total_s": round(sum(vals), 4),
+                "p50_s": round(percentile(vals, 50), 4),
+                "p95_s": round(percentile(vals, 95), 4),
+                "max_s": round(vals[-1], 4),
+            }
+        return {
+            "wall_s": round(time.time() - self.t_start, 3),
+            "phases": out,
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def write(self, path: pathlib.Path, **meta):
+        report = {**meta, **self.summary()}
+        path = pathlib.Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return report
+
+# Process-wide instance used by the scraper
+STATS = RunStats()
+
+def count_webdriver_calls(driver, stats: RunStats = STATS):
+    """Count every WebDriver command (each one is an HTTP round-trip to chromedriver)."""
+    execute = driver.execute
+    def counted(driver_command, params=None):
+        stats.incr("webdriver.calls")
+        return execute(driver_command, params)
+    driver.execute = counted
+    return driver
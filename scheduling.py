@@ -0,0 +1,73 @@
+# scheduling.py
+# Orders the detail phase so the most important funds are scraped first.
+#
+# Priority mixes three signals, each scaled to 0..1:
+#   - size:      net assets parsed from the listing row (falls back to the
+#                listing rank, which is sorted by totalNetAssets)
+#   - staleness: hours since the fund's metrics were last fetched fresh
+#                ("As Of" in the previous snapshot), saturating at STALE_HOURS
+#   - change:    the fund's listing signature (ticker, name, product link;
+#                not the daily-moving NAV / yield columns) differs from the
+#                previous run's (a new fund always counts as changed)
+# With a time budget, the run stops dispatching when it runs out and the
+# funds it never reached keep their previous values, so the budget is spent
+# on the biggest / stalest / changed funds first.
+#
+#   ordered = order_by_priority(funds, previous, prev_signatures)
+#   score = priority_key(previous, prev_signatures)   # funds arriving one by one
+#   RetryScheduler([], key=..., priority=score)        # (pipelined listing)
+
+import math
+from datetime import datetime, timezone
+
+WEIGHTS = {"size": 0.5, "staleness": 0.3, "change": 0.2}
+STALE_HOURS = 72.0
+_AUM_LOG_RANGE = (7.0, 11.5)        # log10 of $10M .. ~$300B
+
+def _size_score(fund, n_funds):
+    aum = fund.get("net_assets")
+    if aum:
+        lo, hi = _AUM_LOG_RANGE
+        return min(1.0, max(0.0, (math.log10(aum) - lo) / (hi - lo)))
+    rank = fund.get("rank")
+    if rank is not None and n_funds:
+        return max(0.0, 1.0 - rank / max(1, n_funds))
+    return 0.0
+
+def _age_hours(as_of, now):
+    if not as_of:
+        return None
+    try:
+        t = datetime.fromisoformat(as_of)
+    except ValueError:
+        return None
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - t).total_seconds() / 3600.0)
+
+def priority_score(fund, prev_metrics, prev_signature, n_funds, now, weights=WEIGHTS):
+    age = _age_hours((prev_metrics or {}).get("As Of"), now)
+    staleness = 1.0 if age is None else min(1.0, age / STALE_HOURS)
+    sig = fund.get("signature")
+    changed = 1.0 if prev_signature is None or (sig and sig != prev_signature) else 0.0
+    return (
+        weights["size"] * _size_score(fund, n_funds)
+        + weights["staleness"] * staleness
+        + weights["change"] * changed
+    )
+
+def priority_key(previous=None, prev_signatures=None, n_funds=None, now=None, weights=WEIGHTS):
+    """fund -> priority score. Without n_funds (funds still arriving from the
+    listing), the previous listing's size stands in for the rank fallback."""
+    previous = previous or {}
+    prev_signatures = prev_signatures or {}
+    n = n_funds or len(prev_signatures)
+    now = now or datetime.now(timezone.utc)
+    return lambda f: priority_score(f, previous.get(f["ticker"]), prev_signatures.get(f["ticker"]), n, now, weights)
+
+def order_by_priority(funds, previous=None, prev_signatures=None, now=None, weights=WEIGHTS):
+    """Funds sorted by descending priority (stable for ties)."""
+    score = priority_key(previous, prev_signatures, len(funds), now, weights)
+    scored = [(score(f), i, f) for i, f in enumerate(funds)]
+    scored.sort(key=lambda t: (-t[0], t[1]))
+    return [f for _, _, f in scored]
@@ -0,0 +1,137 @@
+# selector_cache.py
+# Remembers which candidate selector worked at each call site, across runs.
+#
+# safe_click and the element lookups in the scraper try a list of fallback
+# selectors. Tried one by one, every stale candidate costs a WebDriver round
+# trip, or for clicks a full WebDriverWait timeout. Two things cut that down:
+#   - memoization: in sequential lookups the candidate that won last time is
+#     tried first (the cache is a small JSON file next to the CSVs, so it
+#     carries over between runs);
+#   - race mode: race_find() evaluates all candidates in one injected script
+#     and returns the first one present, so a poll costs one round trip no
+#     matter how many candidates are stale. A race keeps the declared order:
+#     the list is a priority, and a remembered fallback must not shadow a
+#     better selector that matches too.
+# Per call site it counts calls, cache hits and time spent, and estimates the
+# time saved against trying the candidates in their original order (a click
+# miss = its timeout, a lookup miss = one more round trip).
+#
+#   cache = SelectorCache(data_dir / "selector_cache.json")
+#   ordered = cache.order("show_all", candidates, race=RACE_ENABLED)
+#   ... (index into ordered, elapsed) ...
+#   cache.record("show_all", candidates, winner, elapsed, miss_cost_s=timeout)
+#   cache.save(); cache.summary()
+#
+# Config (env): ISHARES_SELECTOR_RACE=0 turns race mode off (sequential waits,
+# cached winner first with a short timeout).
+
+import json, os, pathlib, threading
+
+RACE_ENABLED = os.getenv("ISHARES_SELECTOR_RACE", "1") != "0"
+
+# arguments: [[by, selector], ...], visible_only, root element (or null = document)
+RACE_JS = """
+const cands = arguments[0], visibleOnly = arguments[1], root = arguments[2] || document;
+for (let i = 0; i < cands.length; i++) {
+  const by = cands[i][0], sel = cands[i][1];
+  let els = [];
+  try {
+    if (by === "xpath") {
+      const r = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      for (let j = 0; j < r.snapshotLength; j++) els.push(r.snapshotItem(j));
+    } else if (by === "id") {
+      const e = document.getElementById(sel);
+      if (e) els = [e];
+    } else if (by === "css selector") {
+      els = Array.from(root.querySelectorAll(sel));
+    }
+  } catch (e) {
+    continue;
+  }
+  if (visibleOnly) els = els.filter(e => e.getClientRects().length > 0 && !e.disabled);
+  if (els.length) return [i, els];
+}
+return null;
+"""
+
+def _key(cand):
+    return f"{cand[0]}|{cand[1]}"
+
+def race_find(driver, candidates, visible_only=False, root=None):
+    """(index, [elements]) of the first candidate present, in one round trip; None if none."""
+    try:
+        hit = driver.execute_script(RACE_JS, [[c[0], c[1]] for c in candidates], visible_only, root)
+    except Exception:
+        return None
+    if not hit:
+        return None
+    return int(hit[0]), hit[1]
+
+class SelectorCache:
+    def __init__(self, path=None):
+        self.path = pathlib.Path(path) if path else None
+        self._winners = None            # site -> selector key, loaded lazily
+        self._stats = {}                # site -> counters for this run
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._winners is None:
+            try:
+                self._winners = json.loads(self.path.read_text(encoding="utf-8"))["winners"]
+            except Exception:
+                self._winners = {}
+        return self._winners
+
+    def winner(self, site, candidates):
+        """Index of last run's winning candidate for this site, or None."""
+        key = self._load().get(site)
+        for i, c in enumerate(candidates):
+            if _key(c) == key:
+                return i
+        return None
+
+    def order(self, site, candidates, race=False):
+        """Candidates with the remembered winner moved to the front (as declared for a race)."""
+        i = None if race else self.winner(site, candidates)
+        if not i:
+            return list(candidates)
+        return [candidates[i]] + candidates[:i] + candidates[i + 1:]
+
+    def record(self, site, candidates, winner, elapsed, miss_cost_s=None):
+        """Record one call; `winner` is the candidate used (or None if none matched).
+
+        miss_cost_s: what a stale candidate costs when tried in order (click
+        timeout); defaults to `elapsed` (one lookup round trip).
+        """
+        with self._lock:
+            st = self._stats.setdefault(site, {"calls": 0, "cache_hits": 0, "misses": 0,
+                                               "total_s": 0.0, "saved_s": 0.0})
+            st["calls"] += 1
+            st["total_s"] += elapsed
+            if winner is None:
+                st["misses"] += 1
+                return
+            keys = [_key(c) for c in candidates]
+            orig = keys.index(_key(winner))
+            if self._load().get(site) == keys[orig]:
+                st["cache_hits"] += 1
+            self._winners[site] = keys[orig]
+            # in the original order, the `orig` candidates ahead of the winner miss first
+            cost = elapsed if miss_cost_s is None else miss_cost_s
+            st["saved_s"] += orig * cost
+
+    def save(self):
+        if not self.path or self._winners is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # per process: shard workers on one host save the same file side by side
+        tmp = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"winners": self._winners}, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                site: {**st, "total_s": round(st["total_s"], 3), "saved_s": round(st["saved_s"], 3)}
+                for site, st in sorted(self._stats.items())
+            }
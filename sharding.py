@@ -0,0 +1,228 @@
+# sharding.py
+# Splits the fund list into deterministic shards and merges shard outputs back
+# into the single metrics CSV that batch_export_json.py reads.
+#
+# A fund's shard depends only on its ticker (sha1, not Python's salted hash),
+# so every process / CI matrix job computes the same split from the same list.
+# Shard workers write <metrics>.shard<i>of<n>.csv and leave the run manifest
+# alone; the merge step checks that every shard is there, that every fund of
+# the base list came back exactly once from the shard that owns it, then
+# writes ishares_fixed_income_metrics_<run_id>.csv and records the run (as
+# "unhealthy" when health_gate.py says it is much emptier than the last one).
+#
+# Across runners (one shared listing, then a matrix of shard jobs):
+#   python ishares_fixed_income_scraper.py --list-only
+#   python ishares_fixed_income_scraper.py --base-csv data/ishares_fixed_income_<run_id>.csv --shard 0/4
+#   ...                                                                              --shard 3/4
+#   python sharding.py merge --base data/ishares_fixed_income_<run_id>.csv data/*.shard*of4.csv
+#
+# On one machine, the same thing with N local processes:
+#   python sharding.py run --shards 4
+# Other asset classes: pass the same --asset-class to the scraper and the merge.
+
+import argparse, csv, glob, hashlib, pathlib, re, shutil, subprocess, sys
+from datetime import datetime
+
+SHARD_RE = re.compile(r"\.shard(\d+)of(\d+)\.csv$")
+BASE_RE = re.compile(r"^(ishares_[a-z_]+?)_(\d{8}_\d{6})")
+
+class ShardMergeError(Exception):
+    pass
+
+def shard_of(ticker: str, count: int) -> int:
+    digest = hashlib.sha1(ticker.strip().upper().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+def parse_shard_spec(spec: str):
+    """"2/4" -> (2, 4); shard indexes are 0-based."""
+    try:
+        index, count = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected INDEX/COUNT, got {spec!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}, got {spec!r}")
+    return index, count
+
+def select_shard(funds, index: int, count: int):
+    return [f for f in funds if shard_of(f["ticker"], count) == index]
+
+def shard_suffix(index: int, count: int) -> str:
+    return f".shard{index}of{count}"
+
+def run_id_from_path(path) -> str:
+    m = BASE_RE.match(pathlib.Path(path).name)
+    return m.group(2) if m else None
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        r = csv.reader(f)
+        return next(r, []), list(r)
+
+def merge_shards(base_csv, shard_csvs, out_path, columns, previous=None, allow_missing=False):
+    """Combine shard CSVs into one metrics CSV in base-list order.
+
+    Raises ShardMergeError when a shard is missing or inconsistent, or when a
+    fund is missing (unless allow_missing: then its `previous` values are used,
+    flagged Stale, Failure Reason "shard_missing").
+    """
+    base_header, base_rows = _read_rows(base_csv)
+    ti, ni = base_header.index("Ticker"), base_header.index("Fund Name")
+    expected = [(r[ti], r[ni]) for r in base_rows if r and r[ti]]
+
+    shards, count = {}, None
+    for p in shard_csvs:
+        m = SHARD_RE.search(pathlib.Path(p).name)
+        if not m:
+            raise ShardMergeError(f"not a shard file: {p}")
+        index, n = int(m.group(1)), int(m.group(2))
+        if count is not None and n != count:
+            raise ShardMergeError(f"shard counts disagree: {n} vs {count} ({p})")
+        if index in shards:
+            raise ShardMergeError(f"shard {index} given twice: {shards[index]} and {p}")
+        count, shards[index] = n, p
+    if not count:
+        raise ShardMergeError("no shard files given")
+    missing_shards = sorted(set(range(count)) - set(shards))
+    if missing_shards and not allow_missing:
+        raise ShardMergeError(f"missing shards {missing_shards} of {count}")
+
+    by_ticker, problems = {}, []
+    for index, p in sorted(shards.items()):
+        header, rows = _read_rows(p)
+        if header != list(columns):
+            raise ShardMergeError(f"{p}: unexpected columns {header}")
+        for r in rows:
+            ticker = r[0]
+            if ticker in by_ticker:
+                problems.append(f"{ticker}: duplicated in shard {index}")
+            elif shard_of(ticker, count) != index:
+                problems.append(f"{ticker}: belongs to shard {shard_of(ticker, count)}, found in {index}")
+            by_ticker[ticker] = r
+    extra = set(by_ticker) - {t for t, _ in expected}
+    problems += [f"{t}: not in the base list" for t in sorted(extra)]
+    if problems:
+        raise ShardMergeError("; ".join(problems[:20]) + (" …" if len(problems) > 20 else ""))
+
+    previous = previous or {}
+    missing = [t for t, _ in expected if t not in by_ticker]
+    if missing and not allow_missing:
+        raise ShardMergeError(f"{len(missing)} funds missing from the shards: {', '.join(missing[:20])}")
+
+    fill_cols = columns[2:columns.index("Stale")]
+    out_path = pathlib.Path(out_path)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(columns)
+        for ticker, name in expected:
+            row = by_ticker.get(ticker)
+            if row is None:
+                prev = previous.get(ticker) or {}
+                rec = {"Ticker": ticker, "Fund Name": name, **{c: prev.get(c) for c in fill_cols},
+                       "Stale": bool(prev), "Failure Reason": "shard_missing", "As Of": prev.get("As Of") or ""}
+                row = [rec.get(c) for c in columns]
+            w.writerow(row)
+    tmp.replace(out_path)
+    return {
+        "funds": len(expected),
+        "shards": count,
+        "missing_shards": missing_shards,
+        "missing_funds": missing,
+    }
+
+def _expand(patterns):
+    # pwsh on the Windows runner does not expand globs for us
+    out = []
+    for p in patterns:
+        out += sorted(glob.glob(p)) or [p]
+    return out
+
+def cmd_merge(args):
+    import health_gate, run_manifest
+    import ishares_fixed_income_scraper as scraper
+    from asset_profiles import get_profile
+
+    profile = get_profile(args.asset_class)
+    save_dir = pathlib.Path(args.out_dir) if args.out_dir else scraper.choose_save_dir(profile.subdir)
+    base = pathlib.Path(args.base)
+    run = run_manifest.start_run(save_dir, args.run_id or run_id_from_path(base))
+    status = "failed"
+    try:
+        # the manifest prunes by recorded path, so keep the base list inside save_dir
+        if base.resolve().parent != save_dir.resolve():
+            base = pathlib.Path(shutil.copy2(base, save_dir / base.name))
+        published = scraper.load_published_rows(profile)
+        previous = (scraper.load_previous_snapshot(save_dir, profile.metric_columns, published)
+                    if args.allow_missing else None)
+        out = save_dir / f"{profile.stem}_metrics_{run['run_id']}.csv"
+        summary = merge_shards(base, _expand(args.shards), out, profile.csv_columns,
+                               previous=previous, allow_missing=args.allow_missing)
+        run_manifest.record_file(save_dir, run, "base", base, rows=summary["funds"])
+        run_manifest.record_file(save_dir, run, "metrics", out, rows=summary["funds"])
+        status = "ok"
+        if health_gate.enabled():
+            health = health_gate.check(
+                health_gate.csv_stats(out, profile.metric_columns),
+                health_gate.previous_stats(run_manifest.latest_file(save_dir, "metrics"), published,
+                                           profile.metric_columns),
+            )
+            if not health["ok"]:
+                status = "unhealthy"
+                print("WARNING: health gate failed (" + "; ".join(health["problems"])
+                      + "); previous snapshot stays published")
+    except ShardMergeError as e:
+        print(f"Merge failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        run_manifest.finish_run(save_dir, run, status=status)
+    print(f"Merged {summary['shards']} shards ({summary['funds']} funds) into {out.resolve()}")
+    if summary["missing_funds"]:
+        print(f"WARNING: {len(summary['missing_funds'])} funds missing, kept previous values")
+    return 0
+
+def cmd_run(args):
+    import ishares_fixed_income_scraper as scraper
+    from asset_profiles import get_profile
+
+    profile = get_profile(args.asset_class)
+    save_dir = scraper.choose_save_dir(profile.subdir)
+    scraper_py = str(pathlib.Path(__file__).resolve().parent / "ishares_fixed_income_scraper.py")
+    passthrough = ["--asset-class", profile.key]
+    if args.time_budget:
+        passthrough += ["--time-budget", str(args.time_budget)]
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    subprocess.run([sys.executable, scraper_py, "--list-only", "--run-id", run_id, *passthrough], check=True)
+    base = str(save_dir / f"{profile.stem}_{run_id}.csv")
+    procs = [
+        subprocess.Popen([sys.executable, scraper_py, "--base-csv", base,
+                          "--shard", f"{i}/{args.shards}", *passthrough])
+        for i in range(args.shards)
+    ]
+    failed = [i for i, p in enumerate(procs) if p.wait() != 0]
+    if failed:
+        print(f"Shards {failed} exited with errors", file=sys.stderr)
+    shard_files = [str(p) for p in save_dir.glob(f"{profile.stem}_metrics_{run_id}.shard*of{args.shards}.csv")]
+    return cmd_merge(argparse.Namespace(base=base, shards=shard_files, out_dir=str(save_dir), run_id=run_id,
+                                        allow_missing=args.allow_missing, asset_class=profile.key))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Merge (or run locally) sharded scraper output")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("merge", help="combine shard CSVs into the metrics CSV")
+    m.add_argument("--base", required=True, help="base list CSV the shards were cut from")
+    m.add_argument("--out-dir", help="data directory (default: the scraper's)")
+    m.add_argument("--run-id", help="defaults to the base list's run id")
+    m.add_argument("--allow-missing", action="store_true",
+                   help="fill missing funds from the previous snapshot instead of failing")
+    m.add_argument("--asset-class", default="fixed_income")
+    m.add_argument("shards", nargs="+", help="shard CSVs (globs ok)")
+    r = sub.add_parser("run", help="list, scrape N shards as local processes, merge")
+    r.add_argument("--shards", type=int, default=2)
+    r.add_argument("--time-budget", help="passed to each shard worker")
+    r.add_argument("--allow-missing", action="store_true")
+    r.add_argument("--asset-class", default="fixed_income")
+    args = ap.parse_args(argv)
+    return cmd_merge(args) if args.cmd == "merge" else cmd_run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
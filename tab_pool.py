@@ -0,0 +1,83 @@
+# tab_pool.py
+# Several detail pages loading at once in one Chrome, one tab each.
+#
+# A second Chrome for parallelism costs another browser, GPU and network
+# process (300-500 MB on the runners); another tab in the same Chrome costs a
+# renderer, and same-site tabs often share one. TabPool opens `tabs` tabs in
+# one WebDriver session, starts a navigation in each without waiting for it
+# (the driver must use page_load_strategy "none", or chromedriver blocks on
+# the pending load), and polls them, so the scraper extracts from whichever
+# page finishes first while the others keep loading.
+#
+#   pool = TabPool(driver, tabs=4)
+#   handle = pool.start(url, item)              # into an idle tab
+#   for handle, item, waited_s, state in pool.poll():   # state: "ready" | "timeout"
+#       pool.switch(handle)
+#       ... read the page ...
+#       pool.release(handle)
+#
+# A new document does not carry the marker set before navigating away, so a
+# tab still showing the previous page is never mistaken for a loaded one.
+
+import time
+
+START_JS = "window.__ishPending = true; window.location.assign(arguments[0]);"
+# "interactive" = DOMContentLoaded, what the sequential path waits for ("eager")
+STATE_JS = "return window.__ishPending ? 'pending' : document.readyState;"
+READY_STATES = {"interactive", "complete"}
+
+class TabPool:
+    def __init__(self, driver, tabs=4, load_timeout=30.0, poll_interval=0.1):
+        self.driver = driver
+        self.load_timeout = load_timeout
+        self.poll_interval = poll_interval
+        self.handles = [driver.current_window_handle]
+        for _ in range(max(1, int(tabs)) - 1):
+            driver.switch_to.new_window("tab")
+            self.handles.append(driver.current_window_handle)
+        self._current = self.handles[-1]
+        self._busy = {}                 # handle -> (item, started)
+
+    def switch(self, handle):
+        if handle != self._current:
+            self.driver.switch_to.window(handle)
+            self._current = handle
+
+    def idle(self):
+        return [h for h in self.handles if h not in self._busy]
+
+    def in_flight(self):
+        return len(self._busy)
+
+    def start(self, url, item):
+        """Start loading `url` in an idle tab; returns its handle."""
+        handle = self.idle()[0]
+        self.switch(handle)
+        self._busy[handle] = (item, time.monotonic())
+        self.driver.execute_script(START_JS, url)
+        return handle
+
+    def release(self, handle):
+        self._busy.pop(handle, None)
+
+    def items(self):
+        return [item for item, _ in self._busy.values()]
+
+    def poll(self, block=True):
+        """Tabs whose page finished (or timed out): [(handle, item, waited_s, state)].
+
+        With block=True, polls until at least one is done (or none are busy).
+        """
+        while self._busy:
+            done = []
+            for handle, (item, started) in list(self._busy.items()):
+                self.switch(handle)
+                waited = time.monotonic() - started
+                if self.driver.execute_script(STATE_JS) in READY_STATES:
+                    done.append((handle, item, waited, "ready"))
+                elif waited > self.load_timeout:
+                    done.append((handle, item, waited, "timeout"))
+            if done or not block:
+                return done
+            time.sleep(self.poll_interval)
+        return []